@@ -0,0 +1,106 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Per-process analyzer, created once by the pool initializer
+_worker_analyzer = None
+
+
+def _init_worker(analyzer_kwargs):
+    """Build a warm analyzer in the worker: references mapped, numba kernels compiled"""
+    global _worker_analyzer
+    from pitch import EnhancedPitchAnalyzer
+
+    _worker_analyzer = EnhancedPitchAnalyzer(**analyzer_kwargs)
+    _worker_analyzer.warm_up()
+
+
+def _analyze_in_worker(target, audio, pitch_engine):
+    _worker_analyzer.refresh_references()
+    return _worker_analyzer.analyze_pronunciation_audio(target, audio, pitch_engine=pitch_engine)
+
+
+def _ping():
+    return multiprocessing.current_process().pid
+
+
+class AnalysisPool:
+    """
+    Pool of pre-started analysis processes, each holding its own warm analyzer.
+
+    Workers are replaced after `max_jobs_per_worker` jobs to bound memory
+    growth, and the whole pool is rebuilt if a worker dies mid-job.
+    """
+
+    def __init__(self, size, max_jobs_per_worker=200, analyzer_kwargs=None):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.analyzer_kwargs = analyzer_kwargs or {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Fork the workers and wait until every one of them is warm"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+                executor = self._executor
+            else:
+                return
+        pids = {f.result() for f in [executor.submit(_ping) for _ in range(self.size)]}
+        logger.info(f"🏊 Analysis pool ready: {self.size} workers ({len(pids)} started)")
+
+    def analyze(self, target, audio, pitch_engine=None, timeout=None):
+        """Run analyze_pronunciation_audio in a worker and wait for the result"""
+        try:
+            return self.submit(target, audio, pitch_engine).result(timeout)
+        except BrokenProcessPool:
+            # A worker died mid-job; the pool has been replaced, so retry once
+            return self.submit(target, audio, pitch_engine).result(timeout)
+
+    def submit(self, target, audio, pitch_engine=None):
+        """Queue an analysis and return its Future"""
+        if self._executor is None:
+            self.start()
+        executor = self._executor
+        try:
+            future = executor.submit(_analyze_in_worker, target, audio, pitch_engine)
+        except BrokenProcessPool:
+            executor = self._restart(executor)
+            future = executor.submit(_analyze_in_worker, target, audio, pitch_engine)
+        future.add_done_callback(lambda f: self._check_broken(f, executor))
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _check_broken(self, future, executor):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._restart(executor)
+
+    def _restart(self, broken):
+        """Replace `broken` with a fresh executor, unless another thread already did"""
+        with self._lock:
+            if self._executor is broken:
+                logger.warning("⚠️ Analysis pool broken, restarting workers")
+                self._executor = self._new_executor()
+            executor = self._executor
+        broken.shutdown(wait=False, cancel_futures=True)
+        return executor
+
+    def _new_executor(self):
+        # spawn: workers must not inherit the web server's threads and sockets
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.analyzer_kwargs,),
+            max_tasks_per_child=self.max_jobs_per_worker
+        )
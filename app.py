@@ -1,9 +1,26 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-from pitch import EnhancedPitchAnalyzer
+from pitch import FAST_RESAMPLE_TYPE, EnhancedPitchAnalyzer
+from pitch_engines import PITCH_ENGINES, available_pitch_engines
+from audio_decode import AudioDecodeError, UnsupportedAudioFormat, check_format, decode_audio
+from jobs import JobQueueFull, JobRunner, JobStore
+from analysis_pool import AnalysisPool
+from streaming import StreamSession, StreamSessionStore
+from result_cache import ResultCache, cache_key
+from reference_audio import ReferenceAudioLibrary
+from metrics import MetricsRegistry, StageTimer
+from recognizer import RecognizerService, RecognizerUnavailable, get_recognizer_backend
+from recognizer import SAMPLE_RATE as RECOGNIZER_SAMPLE_RATE
+from classifier import DEFAULT_MODEL_PATH, ClassifierUnavailable, LetterClassifier
+from attempt_store import FEATURE_COLUMNS, PYARROW_AVAILABLE, AttemptStore, decode_contour, safe_id
+from progress_db import ProgressDB
+from concurrent.futures import Future, ThreadPoolExecutor
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+import atexit
 import os
-from pydub import AudioSegment
 import logging
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,7 +29,222 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes to allow Flutter web access
 
-analyzer = EnhancedPitchAnalyzer("hindi_pitch_dataset.csv")
+ANALYZER_OPTIONS = {
+    'reference_csv_path': "hindi_pitch_dataset.csv",
+    'pitch_engine': os.environ.get('PITCH_ENGINE', 'piptrack'),
+    # Silence trimming before analysis; VAD=0 analyzes every sample
+    'vad': os.environ.get('VAD', '1') != '0',
+    'vad_padding': float(os.environ.get('VAD_PADDING', 0.15)),
+    'vad_threshold_db': float(os.environ.get('VAD_THRESHOLD_DB', -35.0)),
+    # Uploads are resampled with the fast soxr mode; RESAMPLE_TYPE=soxr_hq matches offline builds
+    'resample_type': os.environ.get('RESAMPLE_TYPE', FAST_RESAMPLE_TYPE)
+}
+analyzer = EnhancedPitchAnalyzer(**ANALYZER_OPTIONS)
+
+# ANALYSIS_POOL_SIZE > 0 moves CPU work to warm worker processes; 0 analyzes on the request thread
+ANALYSIS_POOL_SIZE = int(os.environ.get('ANALYSIS_POOL_SIZE', 0))
+analysis_pool = AnalysisPool(
+    ANALYSIS_POOL_SIZE,
+    max_jobs_per_worker=int(os.environ.get('ANALYSIS_POOL_MAX_JOBS', 200)),
+    analyzer_kwargs=ANALYZER_OPTIONS
+) if ANALYSIS_POOL_SIZE > 0 else None
+
+# The DSP stack is imported lazily; warm it (or spawn and warm the pool's workers) in the
+# background so startup stays fast and the first analysis does not pay for it.
+# ANALYZER_WARMUP=0 disables.
+if os.environ.get('ANALYZER_WARMUP', '1') != '0':
+    threading.Thread(target=analysis_pool.start if analysis_pool is not None else analyzer.warm_up,
+                     name='analyzer-warmup', daemon=True).start()
+
+# Reference clips are read once here and served from memory with validators
+REFERENCE_AUDIO_MAX_AGE = int(os.environ.get('REFERENCE_AUDIO_MAX_AGE', 86400))
+reference_audio = ReferenceAudioLibrary("data")
+
+# Retries of the same upload are answered from this cache instead of re-analyzing
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 512)),
+    ttl=int(os.environ.get('RESULT_CACHE_TTL', 3600)),
+    disk_dir=os.environ.get('RESULT_CACHE_DIR') or None,
+    version=analyzer.version
+)
+
+# Batch requests decode and analyze their clips concurrently on this pool
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 32))
+
+# Upload limits: bodies over the endpoint's limit are refused with 413 (from Content-Length
+# when sent, else as soon as the streamed body passes it), and decoding stops after
+# MAX_AUDIO_SECONDS so a long recording costs no more than a short one
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+MAX_AUDIO_SECONDS = float(os.environ.get('MAX_AUDIO_SECONDS', 30))
+UPLOAD_ENDPOINTS = {'analyze', 'analyze_batch', 'check_pronunciation', 'classify'}
+# Hard cap for the other routes' bodies; werkzeug streams multipart parts into spooled files
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES * BATCH_MAX_ITEMS
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BATCH_WORKERS', 4)),
+    thread_name_prefix='analysis-batch'
+)
+
+# Streaming sessions: PCM chunks in, partial contours and a running score out
+stream_sessions = StreamSessionStore(idle_timeout=int(os.environ.get('STREAM_IDLE_TIMEOUT', 60)))
+
+# Opt-in async mode: jobs run on a bounded local pool and are polled via /jobs/<job_id>
+JOB_MAX_WAIT = 30
+job_store = JobStore(ttl=int(os.environ.get('ANALYSIS_JOB_TTL', 300)))
+job_runner = JobRunner(
+    job_store,
+    max_workers=int(os.environ.get('ANALYSIS_JOB_WORKERS', 2)),
+    max_pending=int(os.environ.get('ANALYSIS_JOB_QUEUE', 32))
+)
+
+# Transcript check: the recognizer model loads once, on first use (or at startup with
+# RECOGNIZER_PRELOAD=1), and concurrent checks share batched forward passes.
+# A check gives up after RECOGNIZER_TIMEOUT seconds, which must cover that first load
+RECOGNIZER_TOLERANCE = int(os.environ.get('RECOGNIZER_TOLERANCE', 1))
+RECOGNIZER_TIMEOUT = float(os.environ.get('RECOGNIZER_TIMEOUT', 120))
+recognizer = RecognizerService(
+    get_recognizer_backend(os.environ.get('RECOGNIZER_BACKEND', 'whisper'),
+                           model_name=os.environ.get('RECOGNIZER_MODEL', 'medium')),
+    max_batch_size=int(os.environ.get('RECOGNIZER_BATCH_SIZE', 8)),
+    max_wait=float(os.environ.get('RECOGNIZER_BATCH_WAIT', 0.02)),
+    timeout=RECOGNIZER_TIMEOUT
+)
+if os.environ.get('RECOGNIZER_PRELOAD', '0') != '0':
+    threading.Thread(target=recognizer.load, name='recognizer-load', daemon=True).start()
+
+# Letter classifier trained by audiopitch.py; the bundle is memory-mapped once per worker
+# on first use (or at startup with CLASSIFIER_PRELOAD=1) and predictions are micro-batched
+letter_classifier = LetterClassifier(
+    os.environ.get('CLASSIFIER_MODEL_PATH', DEFAULT_MODEL_PATH),
+    max_batch_size=int(os.environ.get('CLASSIFIER_BATCH_SIZE', 16)),
+    max_wait=float(os.environ.get('CLASSIFIER_BATCH_WAIT', 0.005))
+)
+if os.environ.get('CLASSIFIER_PRELOAD', '0') != '0' and letter_classifier.available:
+    threading.Thread(target=letter_classifier.load, name='classifier-load', daemon=True).start()
+
+# Per-child attempt history (features + float16 contour) in partitioned Parquet; '' disables
+ATTEMPT_STORE_DIR = os.environ.get('ATTEMPT_STORE_DIR', 'attempt_store')
+attempt_store = None
+if ATTEMPT_STORE_DIR and PYARROW_AVAILABLE:
+    attempt_store = AttemptStore(
+        ATTEMPT_STORE_DIR,
+        flush_rows=int(os.environ.get('ATTEMPT_FLUSH_ROWS', 64)),
+        compact_segments=int(os.environ.get('ATTEMPT_COMPACT_SEGMENTS', 16))
+    )
+    attempt_store.start_background_flush(float(os.environ.get('ATTEMPT_FLUSH_INTERVAL', 30)))
+    atexit.register(attempt_store.close)
+elif ATTEMPT_STORE_DIR:
+    logger.warning("⚠️ pyarrow not available, attempt history disabled. Install with: pip install pyarrow")
+
+# Per-letter progress (count, best, moving average) in SQLite, updated with every recorded
+# attempt; PROGRESS_DB_PATH='' disables
+PROGRESS_DB_PATH = os.environ.get('PROGRESS_DB_PATH', 'progress.db')
+progress_db = ProgressDB(PROGRESS_DB_PATH) if PROGRESS_DB_PATH else None
+
+# Per-stage latency and request gauges, scraped from /metrics
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    'voiceshiksha_analysis_stage_seconds',
+    'Time spent in each analysis stage (upload, queue, decode, preprocess, pitch_tracking, dtw, ...)',
+    ('stage', 'letter', 'outcome')
+)
+ANALYSES = metrics.counter('voiceshiksha_analyses_total', 'Finished analyses', ('letter', 'outcome'))
+HTTP_REQUESTS = metrics.counter('voiceshiksha_http_requests_total', 'HTTP requests handled', ('endpoint', 'status'))
+HTTP_SECONDS = metrics.histogram('voiceshiksha_http_request_seconds', 'End-to-end request latency', ('endpoint',))
+AUDIO_SECONDS = metrics.counter(
+    'voiceshiksha_audio_seconds_total', 'Seconds of audio received vs. left after silence trimming', ('kind',))
+CLASSIFY_SECONDS = metrics.summary(
+    'voiceshiksha_classify_seconds', 'Recent /classify latency quantiles per stage (decode, features, inference, total)',
+    ('stage',))
+IN_FLIGHT = metrics.gauge('voiceshiksha_http_requests_in_flight', 'HTTP requests being handled', ('endpoint',))
+metrics.gauge('voiceshiksha_job_queue_pending', 'Async analysis jobs queued or running').set_function(
+    lambda: job_runner.pending)
+metrics.gauge('voiceshiksha_stream_sessions', 'Open streaming sessions').set_function(lambda: len(stream_sessions))
+metrics.gauge('voiceshiksha_result_cache_entries', 'Entries in the result cache').set_function(
+    lambda: result_cache.stats()['entries'])
+
+# Letters outside the reference set share one label so clients cannot blow up cardinality
+METRIC_LETTERS = set(analyzer.hindi_to_english.values())
+
+@app.before_request
+def _track_in_flight():
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    g.metrics_started = time.perf_counter()
+    IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+@app.before_request
+def _reject_bad_uploads():
+    """Refuse oversize or non-multipart uploads by their headers, then cap the body as it is parsed"""
+    if request.method != 'POST' or request.endpoint not in UPLOAD_ENDPOINTS:
+        return None
+    rejection = _upload_rejection(request.endpoint, request.content_length, request.mimetype)
+    if rejection is not None:
+        payload, status_code = rejection
+        return jsonify(payload), status_code
+
+    # Chunked uploads carry no Content-Length, so count the bytes instead; parsing the form
+    # here makes an overflow surface as a 413 from _upload_too_large, not inside the view
+    request.environ['wsgi.input'] = _LimitedInput(request.environ['wsgi.input'], _upload_body_limit(request.endpoint))
+    request.files
+    return None
+
+class _LimitedInput:
+    """wsgi.input wrapper that raises RequestEntityTooLarge once more than `limit` bytes were read"""
+
+    def __init__(self, stream, limit):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def _count(self, data):
+        self._read += len(data)
+        if self._read > self._limit:
+            raise RequestEntityTooLarge(f"Upload too large (maximum {self._limit} bytes)")
+        return data
+
+    def read(self, *args):
+        return self._count(self._stream.read(*args))
+
+    def readline(self, *args):
+        return self._count(self._stream.readline(*args))
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+def _upload_body_limit(endpoint):
+    return MAX_UPLOAD_BYTES * BATCH_MAX_ITEMS if endpoint == 'analyze_batch' else MAX_UPLOAD_BYTES
+
+def _upload_rejection(endpoint, content_length, mimetype):
+    """Payload and status refusing an upload by its headers, or None if it may be read"""
+    limit = _upload_body_limit(endpoint)
+    if content_length is not None and content_length > limit:
+        logger.warning(f"📦 Rejecting {content_length} byte upload to {endpoint}")
+        return {"success": False, "message": f"Upload too large (maximum {limit} bytes)"}, 413
+    # A plain form still gets the route's own "missing audio file" answer
+    if mimetype not in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        return {"success": False, "message": "Upload audio as multipart/form-data"}, 415
+    return None
+
+@app.errorhandler(RequestEntityTooLarge)
+def _upload_too_large(e):
+    return jsonify({"success": False, "message": "Upload too large"}), 413
+
+@app.after_request
+def _count_request(response):
+    endpoint = g.get('metrics_endpoint', 'unknown')
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if 'metrics_started' in g:
+        HTTP_SECONDS.observe(time.perf_counter() - g.metrics_started, endpoint=endpoint)
+    return response
+
+@app.teardown_request
+def _untrack_in_flight(exc):
+    if 'metrics_endpoint' in g:
+        IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of the counters, gauges and stage histograms"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def home():
@@ -21,10 +253,28 @@ def home():
         "status": "healthy",
         "endpoints": {
             "practice": "/practice",
-            "analyze": "/analyze_pronunciation"
+            "analyze": "/analyze_pronunciation",
+            "analyze_batch": "/analyze_batch",
+            "check_pronunciation": "/check_pronunciation",
+            "classify": "/classify",
+            "attempts": "/attempts/<child_id>",
+            "progress": "/progress/<child_id>",
+            "pitch_engines": "/pitch_engines",
+            "jobs": "/jobs/<job_id>",
+            "stream": "/stream/start",
+            "cache_stats": "/cache/stats",
+            "metrics": "/metrics"
         }
     })
 
+@app.route('/pitch_engines')
+def pitch_engines():
+    """List the selectable pitch engines and their cost profiles"""
+    return jsonify({
+        "default": analyzer.pitch_engine.name,
+        "engines": available_pitch_engines()
+    })
+
 @app.route('/practice')
 def practice():
     return jsonify({
@@ -38,36 +288,37 @@ def get_reference_audio(letter):
     """Serve reference audio files for the Listen button functionality"""
     try:
         # Map Hindi characters to English equivalents for file lookup
-        hindi_to_english = {
-            'अ': 'A',
-            'आ': 'Aaa', 
-            'इ': 'e',
-            'ई': 'eee',
-            'उ': 'u',
-            'ऊ': 'Uuu',
-            'ए': 'Ea',
-            'ऐ': 'Eaa',
-            'ओ': 'O',
-            'औ': 'Oo',
-            'अं': 'angg',
-            'री': 'rii',
-            'हहा': 'hahaa'
-        }
-        
-        # Get the English equivalent for file lookup
-        english_letter = hindi_to_english.get(letter, letter)
-        audio_file_path = f"data/{english_letter}.mpeg"
+        english_letter = analyzer.hindi_to_english.get(letter, letter)
+        audio_format = request.args.get('format', 'mpeg')
         
-        if os.path.exists(audio_file_path):
-            logger.info(f"🔊 Serving reference audio: {audio_file_path} for letter: {letter}")
-            return send_file(audio_file_path, mimetype='audio/mpeg')
-        else:
-            logger.warning(f"❌ Reference audio not found: {audio_file_path}")
+        if english_letter not in reference_audio:
+            logger.warning(f"❌ Reference audio not found: {english_letter} for letter: {letter}")
             return jsonify({
                 "success": False,
                 "message": f"Reference audio not available for '{letter}'"
             }), 404
+        
+        # A variant that has not been transcoded is refused rather than swapped for another format
+        clip = reference_audio.get(english_letter, audio_format)
+        if clip is None:
+            logger.warning(f"❌ No '{audio_format}' copy of reference audio: {english_letter}")
+            return jsonify({
+                "success": False,
+                "message": f"Reference audio for '{letter}' is not available as '{audio_format}'",
+                "formats": reference_audio.formats(english_letter)
+            }), 406
+        logger.info(f"🔊 Serving reference audio: {english_letter} ({clip.mimetype}) for letter: {letter}")
+        
+        response = Response(clip.data, mimetype=clip.mimetype)
+        response.set_etag(clip.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = REFERENCE_AUDIO_MAX_AGE
+        # Handles If-None-Match (304) and Range (206) against the in-memory bytes
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(clip.data))
             
+    except HTTPException:
+        # e.g. 416 with Content-Range for a range past the end of the clip
+        raise
     except Exception as e:
         logger.error(f"❌ Error serving reference audio: {str(e)}")
         return jsonify({
@@ -98,66 +349,664 @@ def analyze():
 
         file = request.files["audio"]
         target = request.form["target"]
+        pitch_engine = request.form.get("pitch_engine") or None
+        child_id = request.form.get("child_id") or None
+        
+        invalid = _invalid_analysis_options(pitch_engine, child_id)
+        if invalid is not None:
+            payload, status_code = invalid
+            return jsonify(payload), status_code
         
         logger.info(f"🎯 Target letter: {target}")
         logger.info(f"📁 Audio file: {file.filename}")
 
-        # Create uploads directory
-        os.makedirs("uploads", exist_ok=True)
+        # Read the upload into memory; nothing is written to disk
+        timer = StageTimer()
+        with timer.stage('upload'):
+            audio_bytes = file.read()
+        logger.info(f"💾 Received audio upload, size: {len(audio_bytes)} bytes")
 
-        # Save uploaded file
-        webm_path = f"uploads/{target}.webm"
-        file.save(webm_path)
-        
-        # Get actual file size after saving
-        actual_file_size = os.path.getsize(webm_path)
-        logger.info(f"💾 Saved audio file to: {webm_path}, Actual size: {actual_file_size} bytes")
+        # Cheap checks before any job is queued or DSP work starts
+        invalid = _invalid_upload(audio_bytes)
+        if invalid is not None:
+            payload, status_code = invalid
+            return jsonify(payload), status_code
 
-        # Convert webm → wav
-        try:
-            audio = AudioSegment.from_file(webm_path)
-            wav_path = f"uploads/{target}.wav"
-            audio.export(wav_path, format="wav")
-            logger.info(f"🔄 Converted audio to: {wav_path}")
-        except Exception as e:
-            logger.error(f"❌ Audio conversion failed: {e}")
-            return jsonify({
-                "success": False, 
-                "message": f"Audio conversion failed: {str(e)}"
-            }), 500
+        if _wants_async():
+            payload, status_code = _submit_analysis_job(audio_bytes, target, pitch_engine, timer, child_id)
+            return jsonify(payload), status_code
 
-        # Analyze pronunciation
-        logger.info("🔍 Starting pronunciation analysis...")
-        results = analyzer.analyze_pronunciation(target, audio_path=wav_path)
+        payload, status_code = _analyze_upload(audio_bytes, target, pitch_engine, timer, child_id=child_id)
+        return jsonify(payload), status_code
 
-        if results:
-            logger.info("✅ Analysis completed successfully")
+    except Exception as e:
+        logger.error(f"❌ Unexpected error during analysis: {str(e)}")
+        return jsonify({
+            "success": False, 
+            "message": f"Server error: {str(e)}"
+        }), 500
+
+@app.route('/check_pronunciation', methods=['POST'])
+def check_pronunciation():
+    """Transcribe the upload and accept it if it is within `tolerance` edits of the expected text"""
+    if "audio" not in request.files:
+        return jsonify({"success": False, "message": "Missing audio file"}), 400
+
+    # Explicit expected text, else the latin spelling of the target letter
+    target = request.form.get("target", "")
+    expected = request.form.get("expected") or analyzer.hindi_to_english.get(target, target)
+    if not expected:
+        return jsonify({"success": False, "message": "Missing expected text or target parameter"}), 400
+    tolerance = request.form.get("tolerance", type=int, default=RECOGNIZER_TOLERANCE)
+
+    payload, status_code = _check_upload(request.files["audio"].read(), expected, tolerance)
+    return jsonify(payload), status_code
+
+def _check_upload(audio_bytes, expected, tolerance):
+    """Decode and transcribe one upload; returns the /check_pronunciation payload and status code"""
+    try:
+        audio = decode_audio(audio_bytes, sr=RECOGNIZER_SAMPLE_RATE,
+                             res_type=analyzer.resample_type, max_duration=MAX_AUDIO_SECONDS)
+    except UnsupportedAudioFormat as e:
+        return {"success": False, "message": str(e)}, 415
+    except AudioDecodeError as e:
+        logger.error(f"❌ Audio conversion failed: {e}")
+        return {"success": False, "message": f"Audio conversion failed: {str(e)}"}, 500
+
+    try:
+        result = recognizer.check(audio, expected, tolerance)
+    except RecognizerUnavailable as e:
+        logger.error(f"❌ Recognizer unavailable: {e}")
+        return {"success": False, "message": str(e)}, 503
+    except TimeoutError:
+        logger.error(f"⏱️ Transcription timed out after {recognizer.timeout}s")
+        return {"success": False, "message": "Transcription timed out"}, 504
+    except Exception as e:
+        logger.error(f"❌ Transcription failed: {str(e)}")
+        return {"success": False, "message": f"Server error: {str(e)}"}, 500
+
+    logger.info(f"🗣️ Transcribed '{result['transcript']}' for '{result['expected']}' (distance {result['distance']})")
+    return dict(result, success=True, backend=recognizer.name), 200
+
+@app.route('/classify', methods=['POST'])
+def classify():
+    """Predict which letter the uploaded clip sounds like"""
+    if "audio" not in request.files:
+        return jsonify({"success": False, "message": "Missing audio file"}), 400
+    payload, status_code = _classify_upload(request.files["audio"].read())
+    return jsonify(payload), status_code
+
+def _classify_upload(audio_bytes):
+    """Decode, featurize and classify one upload; returns the /classify payload and status code"""
+    if not letter_classifier.available:
+        return {
+            "success": False,
+            "message": f"No classifier model at {letter_classifier.model_path}; train one with python audiopitch.py"
+        }, 503
+
+    timer = StageTimer()
+    started = time.perf_counter()
+    try:
+        with timer.stage('decode'):
+            audio = decode_audio(audio_bytes, sr=letter_classifier.sample_rate,
+                                 res_type=analyzer.resample_type, max_duration=MAX_AUDIO_SECONDS)
+        with timer.stage('features'):
+            features = letter_classifier.features(audio)
+        # Waits for the micro-batch this row joins, so it includes time queued behind other requests
+        with timer.stage('inference'):
+            prediction = letter_classifier.predict(features, timeout=JOB_MAX_WAIT)
+    except UnsupportedAudioFormat as e:
+        return {"success": False, "message": str(e)}, 415
+    except AudioDecodeError as e:
+        logger.error(f"❌ Audio conversion failed: {e}")
+        return {"success": False, "message": f"Audio conversion failed: {str(e)}"}, 500
+    except ClassifierUnavailable as e:
+        return {"success": False, "message": str(e)}, 503
+    except Exception as e:
+        logger.error(f"❌ Classification failed: {str(e)}")
+        return {"success": False, "message": f"Server error: {str(e)}"}, 500
+
+    timer.add('total', time.perf_counter() - started)
+    for stage, seconds in timer.durations.items():
+        CLASSIFY_SECONDS.observe(seconds, stage=stage)
+
+    english_to_hindi = {english: hindi for hindi, english in analyzer.hindi_to_english.items()}
+    return dict(
+        prediction,
+        success=True,
+        target=english_to_hindi.get(prediction['letter'], prediction['letter']),
+        latency_ms={stage: round(seconds * 1000, 2) for stage, seconds in timer.durations.items()}
+    ), 200
+
+@app.route('/classify/stats')
+def classify_stats():
+    """p50/p99 latency per /classify stage over recent requests, and micro-batching counters"""
+    stages = {}
+    for stage in ('decode', 'features', 'inference', 'total'):
+        count = CLASSIFY_SECONDS.count(stage=stage)
+        if count:
+            stages[stage] = {
+                "p50_ms": CLASSIFY_SECONDS.quantile(0.5, stage=stage) * 1000,
+                "p99_ms": CLASSIFY_SECONDS.quantile(0.99, stage=stage) * 1000,
+                "count": count
+            }
+    return jsonify({
+        "model_path": letter_classifier.model_path,
+        "available": letter_classifier.available,
+        "latency": stages,
+        "batches": letter_classifier.batches,
+        "mean_batch_size": letter_classifier.mean_batch_size
+    })
+
+@app.route('/analyze_batch', methods=['POST', 'OPTIONS'])
+def analyze_batch():
+    """Analyze several (audio, target) pairs from one multipart request"""
+    # Handle CORS preflight requests
+    if request.method == 'OPTIONS':
+        response = jsonify({'status': 'ok'})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Methods', 'POST')
+        return response
+
+    try:
+        # Parts are paired by position: the i-th "audio" file goes with the i-th "target"
+        files = request.files.getlist("audio")
+        targets = request.form.getlist("target")
+        pitch_engine = request.form.get("pitch_engine") or None
+        child_id = request.form.get("child_id") or None
+        logger.info(f"📥 Received batch analysis request with {len(files)} clips")
+
+        if not files or len(files) != len(targets):
+            logger.error("❌ Batch needs one target per audio file")
             return jsonify({
-                "success": True,
-                "feedback": results['feedback']['overall'],
-                "score": results['feedback']['composite_score'],
-                "level": results['feedback']['level'],
-                "detailed_feedback": {
-                    "pitch_level": results['feedback'].get('pitch_level', ''),
-                    "stability": results['feedback'].get('stability', ''),
-                    "similarities": results['similarities'],
-                    "voice_characteristics": results.get('voice_characteristics', {})
-                }
-            })
-        else:
-            logger.error("❌ Analysis returned no results")
+                "success": False,
+                "message": "Batch needs one or more audio files and exactly one target per file"
+            }), 400
+
+        if len(files) > BATCH_MAX_ITEMS:
             return jsonify({
-                "success": False, 
-                "message": "Analysis failed - no results returned"
-            }), 500
+                "success": False,
+                "message": f"Batch too large: {len(files)} clips (maximum {BATCH_MAX_ITEMS})"
+            }), 400
+
+        invalid = _invalid_analysis_options(pitch_engine, child_id)
+        if invalid is not None:
+            payload, status_code = invalid
+            return jsonify(payload), status_code
+
+        items = [(file.read(), target) for file, target in zip(files, targets)]
+        futures = _submit_batch(items, pitch_engine, child_id)
+        results = [_batch_item_result(index, target, future)
+                   for index, (future, (_, target)) in enumerate(zip(futures, items))]
+        return jsonify(_batch_payload(results))
 
     except Exception as e:
-        logger.error(f"❌ Unexpected error during analysis: {str(e)}")
+        logger.error(f"❌ Unexpected error during batch analysis: {str(e)}")
         return jsonify({
             "success": False, 
             "message": f"Server error: {str(e)}"
         }), 500
 
+def _submit_batch(items, pitch_engine=None, child_id=None):
+    """
+    Queue each (audio bytes, target) on the batch pool. Clips that
+    /analyze_pronunciation would refuse (oversize, empty, unsupported) are not
+    queued; their future is already resolved with that same rejection.
+    """
+    submitted_at = time.perf_counter()
+    futures = []
+    for audio_bytes, target in items:
+        invalid = _invalid_upload(audio_bytes)
+        if invalid is None:
+            futures.append(batch_executor.submit(_analyze_upload, audio_bytes, target, pitch_engine,
+                                                 queued_at=submitted_at, child_id=child_id))
+        else:
+            rejected = Future()
+            rejected.set_result(invalid)
+            futures.append(rejected)
+    return futures
+
+def _batch_item_result(index, target, future):
+    """One entry of the /analyze_batch results list; waits for the future if it is still running"""
+    try:
+        payload, status_code = future.result()
+    except Exception as e:
+        logger.error(f"❌ Batch item {index} failed: {str(e)}")
+        payload, status_code = {
+            "success": False,
+            "message": f"Server error: {str(e)}"
+        }, 500
+    return dict(payload, index=index, target=target, status=status_code)
+
+def _batch_payload(results):
+    succeeded = sum(1 for item in results if item["status"] == 200)
+    logger.info(f"✅ Batch completed: {succeeded}/{len(results)} clips analyzed")
+    return {
+        "success": True,
+        "count": len(results),
+        "succeeded": succeeded,
+        "results": results
+    }
+
+@app.route('/attempts/<child_id>')
+def get_attempts(child_id):
+    """A child's recent attempts, oldest first; ?letter= narrows to one letter, ?contour=1 adds contours"""
+    if attempt_store is None:
+        return jsonify({"success": False, "message": "Attempt history is disabled"}), 503
+
+    letter = request.args.get("letter")
+    if letter is not None:
+        letter = analyzer.hindi_to_english.get(letter, letter)
+    limit = request.args.get("limit", type=int, default=100)
+    since = request.args.get("since", type=float)
+    with_contour = request.args.get("contour", "0").lower() in ('1', 'true', 'yes')
+
+    # Only the columns the response needs are decoded
+    columns = ['attempt_id', 'letter', 'timestamp', 'score', 'level', 'duration'] + list(FEATURE_COLUMNS)
+    if with_contour:
+        columns.append('contour')
+    try:
+        table = attempt_store.read(child_id, letter, columns=columns, since=since, limit=limit)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    attempts = []
+    for row in table.to_pylist():
+        attempt = {
+            "attempt_id": row['attempt_id'],
+            "letter": row['letter'],
+            "timestamp": row['timestamp'].isoformat(),
+            "score": row['score'],
+            "level": row['level'],
+            "duration": row['duration'],
+            "features": {name: row[name] for name in FEATURE_COLUMNS}
+        }
+        if with_contour:
+            attempt["contour"] = decode_contour(row['contour']).tolist()
+        attempts.append(attempt)
+
+    return jsonify({"success": True, "child_id": child_id, "count": len(attempts), "attempts": attempts})
+
+def _progress_entry(row):
+    english_to_hindi = {english: hindi for hindi, english in analyzer.hindi_to_english.items()}
+    return {
+        "letter": row['letter'],
+        "target": english_to_hindi.get(row['letter'], row['letter']),
+        "attempts": row['attempts'],
+        "best_score": row['best_score'],
+        "last_score": row['last_score'],
+        "average_score": row['ema_score'],
+        "first_attempt_at": _isoformat(row['first_at']),
+        "last_attempt_at": _isoformat(row['last_at'])
+    }
+
+def _isoformat(timestamp):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+@app.route('/progress/<child_id>')
+def get_progress(child_id):
+    """Per-letter attempt count, best, last and moving-average score for one child"""
+    if progress_db is None:
+        return jsonify({"success": False, "message": "Progress tracking is disabled"}), 503
+    try:
+        safe_id(child_id, 'child id')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    letters = [_progress_entry(row) for row in progress_db.child_progress(child_id)]
+    return jsonify({
+        "success": True,
+        "child_id": child_id,
+        "total_attempts": sum(entry["attempts"] for entry in letters),
+        "letters": letters
+    })
+
+@app.route('/progress/<child_id>/<letter>')
+def get_letter_progress(child_id, letter):
+    """One letter's aggregates plus its most recent attempts (?limit=, default 20)"""
+    if progress_db is None:
+        return jsonify({"success": False, "message": "Progress tracking is disabled"}), 503
+    try:
+        safe_id(child_id, 'child id')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    letter = _metric_letter(letter)
+    row = progress_db.letter_progress(child_id, letter)
+    if row is None:
+        return jsonify({"success": False, "message": f"No attempts at '{letter}' for {child_id}"}), 404
+
+    recent = progress_db.recent_attempts(child_id, letter, request.args.get("limit", type=int, default=20))
+    return jsonify(dict(
+        _progress_entry(row),
+        success=True,
+        child_id=child_id,
+        recent=[{
+            "score": attempt['score'],
+            "level": attempt['level'],
+            "attempt_id": attempt['attempt_id'],
+            "timestamp": _isoformat(attempt['created_at'])
+        } for attempt in recent]
+    ))
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Result of an async analysis; ?wait=<seconds> long-polls until the job finishes"""
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOB_MAX_WAIT)
+    except ValueError:
+        wait = 0
+
+    job = job_store.wait(job_id, wait) if wait > 0 else job_store.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": f"Unknown or expired job '{job_id}'"
+        }), 404
+
+    if not job.done:
+        return jsonify({
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status
+        }), 202
+
+    return jsonify({
+        "success": job.status == 'done',
+        "job_id": job.job_id,
+        "status": job.status,
+        "result": job.payload
+    }), job.status_code
+
+@app.route('/stream/start', methods=['POST'])
+def stream_start():
+    """Open a streaming session for one recording; PCM must be mono at the analyzer rate"""
+    target = request.values.get("target")
+    pitch_engine = request.values.get("pitch_engine") or None
+    sample_rate = request.values.get("sample_rate", type=int, default=analyzer.sr)
+
+    if not target:
+        return jsonify({"success": False, "message": "Missing target parameter"}), 400
+    if sample_rate != analyzer.sr:
+        return jsonify({
+            "success": False,
+            "message": f"Streaming expects {analyzer.sr} Hz mono PCM, got {sample_rate} Hz"
+        }), 400
+    if pitch_engine is not None and pitch_engine not in PITCH_ENGINES:
+        return jsonify({"success": False, "message": f"Unknown pitch engine '{pitch_engine}'"}), 400
+    if not analyzer._lookup_reference(target)['success']:
+        return jsonify({"success": False, "message": f"No reference data available for '{target}'"}), 404
+
+    session = stream_sessions.add(StreamSession(analyzer, target, pitch_engine, max_seconds=MAX_AUDIO_SECONDS))
+    logger.info(f"🎙️ Opened stream {session.session_id} for '{target}'")
+    return jsonify({
+        "success": True,
+        "session_id": session.session_id,
+        "sample_rate": analyzer.sr,
+        "chunk_url": f"/stream/{session.session_id}/chunk",
+        "finish_url": f"/stream/{session.session_id}/finish"
+    })
+
+@app.route('/stream/<session_id>/chunk', methods=['POST'])
+def stream_chunk(session_id):
+    """Append raw PCM (s16le by default, ?format=f32le) and return newly tracked frames"""
+    payload, status_code = _stream_chunk(session_id, request.get_data(), request.args.get('format', 's16le'))
+    return jsonify(payload), status_code
+
+def _stream_chunk(session_id, data, pcm_format='s16le'):
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return {"success": False, "message": f"Unknown or expired stream '{session_id}'"}, 404
+
+    try:
+        with session.lock:
+            update = session.add_pcm(data, pcm_format)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}, 400
+
+    return dict(update, success=True, session_id=session_id), 200
+
+@app.route('/stream/<session_id>/finish', methods=['POST'])
+def stream_finish(session_id):
+    """Close the stream and return the same result as /analyze_pronunciation for the full clip"""
+    payload, status_code = _finish_stream(session_id)
+    return jsonify(payload), status_code
+
+def _finish_stream(session_id):
+    session = stream_sessions.pop(session_id)
+    if session is None:
+        return {"success": False, "message": f"Unknown or expired stream '{session_id}'"}, 404
+
+    try:
+        with session.lock:
+            audio = session.audio()
+        logger.info(f"🏁 Finishing stream {session_id}: {len(audio) / analyzer.sr:.2f}s")
+        timer = StageTimer()
+        try:
+            return _format_results(_run_analysis(session.target, audio, session.pitch_engine, timer), timer)
+        finally:
+            _record_analysis(session.target, timer)
+    except Exception as e:
+        logger.error(f"❌ Unexpected error finishing stream: {str(e)}")
+        return {
+            "success": False, 
+            "message": f"Server error: {str(e)}"
+        }, 500
+
+def _wants_async():
+    return _is_truthy(request.args.get('async') or request.form.get('async'))
+
+def _is_truthy(value):
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+def _invalid_analysis_options(pitch_engine, child_id):
+    """Payload and status for a bad pitch_engine or child_id form field, else None"""
+    if pitch_engine is not None and pitch_engine not in PITCH_ENGINES:
+        logger.error(f"❌ Unknown pitch engine: {pitch_engine}")
+        return {
+            "success": False,
+            "message": f"Unknown pitch engine '{pitch_engine}'"
+        }, 400
+    if child_id is not None:
+        try:
+            safe_id(child_id, 'child id')
+        except ValueError as e:
+            return {"success": False, "message": str(e)}, 400
+    return None
+
+def _invalid_upload(audio_bytes):
+    """Payload and status for an oversize, empty or unsupported clip, else None"""
+    if len(audio_bytes) > MAX_UPLOAD_BYTES:
+        return {
+            "success": False,
+            "message": f"Audio file too large (maximum {MAX_UPLOAD_BYTES} bytes)"
+        }, 413
+    try:
+        check_format(audio_bytes)
+    except UnsupportedAudioFormat as e:
+        logger.error(f"❌ {e}")
+        return {"success": False, "message": str(e)}, 415
+    except AudioDecodeError as e:
+        return {"success": False, "message": str(e)}, 400
+    return None
+
+def _submit_analysis_job(audio_bytes, target, pitch_engine=None, timer=None, child_id=None):
+    """Queue an analysis on the job runner; returns the 202 payload (or 503 when the queue is full)"""
+    try:
+        job = job_runner.submit(_analyze_upload, audio_bytes, target, pitch_engine, timer,
+                                queued_at=time.perf_counter(), child_id=child_id)
+    except JobQueueFull as e:
+        logger.warning(f"⏳ Rejecting async analysis: {e}")
+        return {
+            "success": False,
+            "message": "Server busy - please retry shortly"
+        }, 503
+    logger.info(f"🧾 Queued analysis job {job.job_id}")
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "status": job.status,
+        "result_url": f"/jobs/{job.job_id}"
+    }, 202
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Hit/miss counters and size of the analysis result cache"""
+    return jsonify(result_cache.stats())
+
+def _analyze_upload(audio_bytes, target, pitch_engine=None, timer=None, queued_at=None, child_id=None):
+    """Decode and analyze one upload; returns the /analyze_pronunciation payload and status code"""
+    timer = timer or StageTimer()
+    if queued_at is not None:
+        timer.add('queue', time.perf_counter() - queued_at)
+    try:
+        # Identical retries are served from the cache; a reference change bumps the version.
+        # Attempts by a known child are always analyzed, so every one is recorded with its features.
+        with timer.stage('cache_lookup'):
+            result_cache.set_version(analyzer.refresh_references())
+            key = cache_key(audio_bytes, target, result_cache.version, pitch_engine or analyzer.pitch_engine.name)
+            cached = result_cache.get(key) if child_id is None else None
+        if cached is not None:
+            logger.info("♻️ Returning cached analysis result")
+            timer.outcome = 'cached'
+            return cached, 200
+
+        payload, status_code = _decode_and_analyze(audio_bytes, target, pitch_engine, timer, child_id)
+        # Only successful analyses are cached; a failure is retried on the next identical upload
+        if status_code == 200 and payload.get('success'):
+            result_cache.put(key, payload)
+        return payload, status_code
+    finally:
+        _record_analysis(target, timer)
+
+def _decode_and_analyze(audio_bytes, target, pitch_engine=None, timer=None, child_id=None):
+    timer = timer or StageTimer()
+    # Decode to a float32 buffer at the analyzer's sample rate
+    try:
+        with timer.stage('decode'):
+            audio = decode_audio(audio_bytes, sr=analyzer.sr, res_type=analyzer.resample_type,
+                                 max_duration=MAX_AUDIO_SECONDS)
+        logger.info(f"🔄 Decoded audio: {len(audio) / analyzer.sr:.2f}s")
+        if len(audio) >= int(MAX_AUDIO_SECONDS * analyzer.sr):
+            logger.warning(f"✂️ Recording truncated to the first {MAX_AUDIO_SECONDS:g}s")
+    except UnsupportedAudioFormat as e:
+        logger.error(f"❌ {e}")
+        timer.outcome = 'decode_error'
+        return {"success": False, "message": str(e)}, 415
+    except AudioDecodeError as e:
+        logger.error(f"❌ Audio conversion failed: {e}")
+        timer.outcome = 'decode_error'
+        return {
+            "success": False, 
+            "message": f"Audio conversion failed: {str(e)}"
+        }, 500
+
+    # Analyze pronunciation
+    logger.info("🔍 Starting pronunciation analysis...")
+    results = _run_analysis(target, audio, pitch_engine, timer)
+    _record_attempt(child_id, target, results, pitch_engine)
+    return _format_results(results, timer)
+
+def _format_results(results, timer=None):
+    """Shape analyzer output into the /analyze_pronunciation payload and status code"""
+    if timer is not None:
+        timer.outcome = 'success' if results and results.get('success') else 'analysis_failed'
+    if results and results.get('success'):
+        logger.info("✅ Analysis completed successfully")
+        return {
+            "success": True,
+            "feedback": results['feedback']['overall'],
+            "score": results['feedback']['composite_score'],
+            "level": results['feedback']['level'],
+            "detailed_feedback": {
+                "pitch_level": results['feedback'].get('pitch_level', ''),
+                "stability": results['feedback'].get('stability', ''),
+                "similarities": results['similarities'],
+                "voice_characteristics": results.get('voice_characteristics', {})
+            },
+            "audio": {
+                "original_duration": results.get('vad', {}).get('original_duration'),
+                "analyzed_duration": results.get('vad', {}).get('trimmed_duration')
+            }
+        }, 200
+
+    if results:
+        # The analyzer ran but could not score the clip (no voiced audio, no reference data, ...)
+        logger.error(f"❌ Analysis failed: {results.get('error')}")
+        return {
+            "success": False,
+            "message": results.get('error', 'Analysis failed'),
+            "feedback": results['feedback']['overall'],
+            "level": results['feedback']['level']
+        }, 422
+
+    logger.error("❌ Analysis returned no results")
+    return {
+        "success": False, 
+        "message": "Analysis failed - no results returned"
+    }, 500
+
+def _run_analysis(target, audio, pitch_engine=None, timer=None):
+    """Analyze decoded audio in the worker pool when one is configured, else in-process"""
+    timer = timer or StageTimer()
+    with timer.stage('analysis'):
+        if analysis_pool is not None:
+            results = analysis_pool.analyze(target, audio, pitch_engine)
+        else:
+            results = analyzer.analyze_pronunciation_audio(target, audio, pitch_engine=pitch_engine)
+    # Stage breakdown measured inside the analyzer (possibly in a worker process)
+    for stage, seconds in (results or {}).get('timings', {}).items():
+        timer.add(stage, seconds)
+    vad_report = (results or {}).get('vad')
+    if vad_report:
+        AUDIO_SECONDS.inc(vad_report['original_duration'], kind='received')
+        AUDIO_SECONDS.inc(vad_report['trimmed_duration'], kind='analyzed')
+    return results
+
+def _record_attempt(child_id, target, results, pitch_engine=None):
+    """Add a successful analysis to the child's history and progress (cached retries are not re-recorded)"""
+    if child_id is None or not results or not results.get('success'):
+        return None
+    letter = _metric_letter(target)
+    score = results['feedback']['composite_score']
+    level = results['feedback'].get('level', '')
+
+    attempt_id = None
+    if attempt_store is not None:
+        try:
+            attempt_id = attempt_store.append(
+                child_id, letter,
+                score=score,
+                features=results['features'],
+                contour=results.get('contour', []),
+                level=level,
+                pitch_engine=pitch_engine or analyzer.pitch_engine.name,
+                analyzer_version=analyzer.version,
+                duration=results.get('vad', {}).get('trimmed_duration', results.get('audio_duration'))
+            )
+        except Exception as e:
+            logger.error(f"❌ Could not record attempt for {child_id}: {e}")
+
+    if progress_db is not None:
+        try:
+            progress_db.record(child_id, letter, score, level, attempt_id)
+        except Exception as e:
+            logger.error(f"❌ Could not update progress for {child_id}: {e}")
+    return attempt_id
+
+def _metric_letter(target):
+    letter = analyzer.hindi_to_english.get(target, target)
+    return letter if letter in METRIC_LETTERS else 'other'
+
+def _record_analysis(target, timer):
+    """Observe every stage timing of one finished analysis, labelled by letter and outcome"""
+    letter = _metric_letter(target)
+    outcome = timer.outcome or 'error'
+    for stage, seconds in timer.durations.items():
+        STAGE_SECONDS.observe(seconds, stage=stage, letter=letter, outcome=outcome)
+    ANALYSES.inc(letter=letter, outcome=outcome)
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,273 @@
+"""
+ASGI variant of the API, for uvicorn.
+Usage: uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+
+Serves the same routes as app.py and shares its analyzer, reference data,
+caches and stores: importing app builds them once per process, and every
+request on the event loop uses those instances. The routes that take uploads
+are native here. Their bodies are received on the event loop, so a slow
+mobile connection holds a coroutine rather than a worker, and only the
+finished bytes are handed to the analysis executor for decoding and DSP
+(which runs in the warm process pool instead when ANALYSIS_POOL_SIZE is set).
+The remaining routes are cheap reads and are served by the Flask app through
+a WSGI adapter.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    # Deprecated in Starlette 1.x in favour of a2wsgi, but still shipped
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        from starlette.middleware.wsgi import WSGIMiddleware
+
+import app as api
+from metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Decoding and DSP run on these threads, never on the event loop; the pool
+# lives for one lifespan so the app can be started again after a shutdown
+ANALYSIS_EXECUTOR_WORKERS = int(os.environ.get('ANALYSIS_EXECUTOR_WORKERS', os.cpu_count() or 4))
+analysis_executor = None
+
+
+class UploadTooLarge(Exception):
+    """Raised while receiving a body that has grown past its endpoint's limit"""
+
+
+def _limited_receive(receive, limit):
+    """Wrap an ASGI receive callable so the body is refused as soon as it passes `limit` bytes"""
+    received = 0
+
+    async def receive_within_limit():
+        nonlocal received
+        message = await receive()
+        if message['type'] == 'http.request':
+            received += len(message.get('body', b''))
+            if received > limit:
+                raise UploadTooLarge(f"Upload too large (maximum {limit} bytes)")
+        return message
+
+    return receive_within_limit
+
+
+def _json(result):
+    payload, status_code = result
+    return JSONResponse(payload, status_code=status_code)
+
+
+def _error(message, status_code):
+    return JSONResponse({"success": False, "message": message}, status_code=status_code)
+
+
+async def _offload(fn, *args, **kwargs):
+    """
+    Run blocking work on the analysis executor and await its (payload, status_code).
+    Outside a lifespan (a server started with lifespan off) the loop's default executor is used.
+    """
+    return await asyncio.get_running_loop().run_in_executor(analysis_executor, partial(fn, *args, **kwargs))
+
+
+async def _read_form(request, endpoint):
+    """
+    Parse the multipart body as it arrives. Returns (form, None), or
+    (None, (payload, status_code)) when the headers or the body size refuse it.
+    """
+    content_length = request.headers.get('content-length')
+    mimetype = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    try:
+        content_length = int(content_length) if content_length else None
+    except ValueError:
+        return None, ({"success": False, "message": "Invalid Content-Length header"}, 400)
+    rejection = api._upload_rejection(endpoint, content_length, mimetype)
+    if rejection is not None:
+        return None, rejection
+
+    # Files are streamed into spooled temporary files by python-multipart
+    limited = Request(request.scope, _limited_receive(request.receive, api._upload_body_limit(endpoint)))
+    try:
+        return await limited.form(), None
+    except UploadTooLarge as e:
+        logger.warning(f"📦 Rejecting upload to {endpoint}: {e}")
+        return None, ({"success": False, "message": str(e)}, 413)
+
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _instrumented(name, handler):
+    """Record the same request metrics the Flask hooks record for the routes they serve"""
+    async def endpoint(request):
+        api.IN_FLIGHT.inc(endpoint=name)
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await handler(request)
+            status_code = response.status_code
+            return response
+        finally:
+            api.IN_FLIGHT.dec(endpoint=name)
+            api.HTTP_REQUESTS.inc(endpoint=name, status=status_code)
+            api.HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=name)
+    return endpoint
+
+
+async def analyze(request):
+    form, rejection = await _read_form(request, 'analyze')
+    if rejection is not None:
+        return _json(rejection)
+    try:
+        upload = form.get("audio")
+        target = form.get("target")
+        if not isinstance(upload, UploadFile) or target is None:
+            return _error("Missing audio file or target parameter", 400)
+
+        pitch_engine = form.get("pitch_engine") or None
+        child_id = form.get("child_id") or None
+        invalid = api._invalid_analysis_options(pitch_engine, child_id)
+        if invalid is not None:
+            return _json(invalid)
+
+        timer = StageTimer()
+        with timer.stage('upload'):
+            audio_bytes = await upload.read()
+        invalid = api._invalid_upload(audio_bytes)
+        if invalid is not None:
+            return _json(invalid)
+
+        if api._is_truthy(request.query_params.get('async') or form.get('async')):
+            return _json(api._submit_analysis_job(audio_bytes, target, pitch_engine, timer, child_id))
+        return _json(await _offload(api._analyze_upload, audio_bytes, target, pitch_engine, timer,
+                                    queued_at=time.perf_counter(), child_id=child_id))
+    except Exception as e:
+        logger.error(f"❌ Unexpected error during analysis: {str(e)}")
+        return _error(f"Server error: {str(e)}", 500)
+    finally:
+        await form.close()
+
+
+async def analyze_batch(request):
+    form, rejection = await _read_form(request, 'analyze_batch')
+    if rejection is not None:
+        return _json(rejection)
+    try:
+        files = [upload for upload in form.getlist("audio") if isinstance(upload, UploadFile)]
+        targets = form.getlist("target")
+        pitch_engine = form.get("pitch_engine") or None
+        child_id = form.get("child_id") or None
+
+        if not files or len(files) != len(targets):
+            return _error("Batch needs one or more audio files and exactly one target per file", 400)
+        if len(files) > api.BATCH_MAX_ITEMS:
+            return _error(f"Batch too large: {len(files)} clips (maximum {api.BATCH_MAX_ITEMS})", 400)
+        invalid = api._invalid_analysis_options(pitch_engine, child_id)
+        if invalid is not None:
+            return _json(invalid)
+
+        items = [(await upload.read(), target) for upload, target in zip(files, targets)]
+        futures = api._submit_batch(items, pitch_engine, child_id)
+        await asyncio.wait([asyncio.wrap_future(future) for future in futures])
+        results = [api._batch_item_result(index, target, future)
+                   for index, (future, (_, target)) in enumerate(zip(futures, items))]
+        return JSONResponse(api._batch_payload(results))
+    except Exception as e:
+        logger.error(f"❌ Unexpected error during batch analysis: {str(e)}")
+        return _error(f"Server error: {str(e)}", 500)
+    finally:
+        await form.close()
+
+
+async def check_pronunciation(request):
+    form, rejection = await _read_form(request, 'check_pronunciation')
+    if rejection is not None:
+        return _json(rejection)
+    try:
+        upload = form.get("audio")
+        if not isinstance(upload, UploadFile):
+            return _error("Missing audio file", 400)
+        target = form.get("target", "")
+        expected = form.get("expected") or api.analyzer.hindi_to_english.get(target, target)
+        if not expected:
+            return _error("Missing expected text or target parameter", 400)
+        tolerance = _int(form.get("tolerance"), api.RECOGNIZER_TOLERANCE)
+        return _json(await _offload(api._check_upload, await upload.read(), expected, tolerance))
+    finally:
+        await form.close()
+
+
+async def classify(request):
+    form, rejection = await _read_form(request, 'classify')
+    if rejection is not None:
+        return _json(rejection)
+    try:
+        upload = form.get("audio")
+        if not isinstance(upload, UploadFile):
+            return _error("Missing audio file", 400)
+        return _json(await _offload(api._classify_upload, await upload.read()))
+    finally:
+        await form.close()
+
+
+async def stream_chunk(request):
+    limited = Request(request.scope, _limited_receive(request.receive, api.app.config['MAX_CONTENT_LENGTH']))
+    try:
+        data = await limited.body()
+    except UploadTooLarge as e:
+        return _error(str(e), 413)
+    return _json(await _offload(api._stream_chunk, request.path_params['session_id'], data,
+                                request.query_params.get('format', 's16le')))
+
+
+async def stream_finish(request):
+    return _json(await _offload(api._finish_stream, request.path_params['session_id']))
+
+
+@asynccontextmanager
+async def lifespan(application):
+    global analysis_executor
+    executor = ThreadPoolExecutor(max_workers=ANALYSIS_EXECUTOR_WORKERS, thread_name_prefix='asgi-analysis')
+    analysis_executor = executor
+    try:
+        yield
+    finally:
+        analysis_executor = None
+        executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route('/analyze_pronunciation', _instrumented('analyze', analyze), methods=['POST']),
+        Route('/analyze_batch', _instrumented('analyze_batch', analyze_batch), methods=['POST']),
+        Route('/check_pronunciation', _instrumented('check_pronunciation', check_pronunciation), methods=['POST']),
+        Route('/classify', _instrumented('classify', classify), methods=['POST']),
+        Route('/stream/{session_id}/chunk', _instrumented('stream_chunk', stream_chunk), methods=['POST']),
+        Route('/stream/{session_id}/finish', _instrumented('stream_finish', stream_finish), methods=['POST']),
+        # Everything else (and GETs on the paths above) is answered by the Flask app as-is
+        Mount('/', app=WSGIMiddleware(api.app)),
+    ],
+    # Matches flask-cors in app.py, which answers the requests that fall through to Flask
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
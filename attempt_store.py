@@ -0,0 +1,285 @@
+"""
+Append-only columnar history of analysis attempts, for progress dashboards.
+
+Each attempt's score, pitch features and a float16 downsampled contour are
+buffered in memory and written as small Parquet segments under a Hive-style
+layout:
+
+    <root>/child=<child_id>/letter=<letter>/<segment>.parquet
+
+Reads for one child (and optionally one letter) only open that child's
+directories and only decode the requested columns. Partitions that collect
+many small segments are compacted into one sorted file.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# The 11 fields of EnhancedPitchAnalyzer._extract_advanced_features
+FEATURE_COLUMNS = (
+    'mean_pitch', 'median_pitch', 'std_pitch', 'pitch_range', 'pitch_variance', 'pitch_skewness',
+    'pitch_kurtosis', 'pitch_slope', 'jitter', 'shimmer', 'voiced_frames_ratio'
+)
+
+# Child ids and letters become directory names, so only a safe alphabet is accepted
+_SAFE_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Compaction lock files older than this are assumed abandoned by a crashed process
+STALE_LOCK_SECONDS = 600
+
+
+def safe_id(value, kind='id'):
+    """`value` if it is usable as a partition name, else ValueError"""
+    value = str(value)
+    if not _SAFE_ID.match(value):
+        raise ValueError(f"Invalid {kind} '{value}': use 1-64 letters, digits, '_' or '-'")
+    return value
+
+
+def encode_contour(contour):
+    """Little-endian float16 bytes; 2 bytes per point"""
+    return np.asarray(contour, dtype='<f2').tobytes()
+
+
+def decode_contour(data):
+    return np.frombuffer(data, dtype='<f2').astype(np.float32)
+
+
+def _schema():
+    fields = [
+        ('attempt_id', pa.string()),
+        ('child_id', pa.string()),
+        ('letter', pa.string()),
+        ('timestamp', pa.timestamp('ms', tz='UTC')),
+        ('score', pa.float32()),
+        ('level', pa.string()),
+        ('pitch_engine', pa.string()),
+        ('analyzer_version', pa.string()),
+        ('duration', pa.float32()),
+    ]
+    fields += [(name, pa.float32()) for name in FEATURE_COLUMNS]
+    # Parquet has no portable float16 column type, so the contour is stored as raw float16 bytes
+    fields.append(('contour', pa.binary()))
+    return pa.schema(fields)
+
+
+class AttemptStore:
+    """
+    Buffered, partitioned Parquet writer and reader for attempts.
+
+    append() only touches memory; a partition is written out as a new
+    segment once it buffers `flush_rows` attempts, on flush(), or from the
+    background flusher. A partition is compacted once it holds
+    `compact_segments` segment files.
+    """
+
+    def __init__(self, root, flush_rows=64, compact_segments=16, compression='zstd'):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for the attempt store. Install with: pip install pyarrow")
+        self.root = root
+        self.flush_rows = flush_rows
+        self.compact_segments = compact_segments
+        self.compression = compression
+        self.schema = _schema()
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+
+    def partition_dir(self, child_id, letter=None):
+        path = os.path.join(self.root, f"child={safe_id(child_id, 'child id')}")
+        if letter is not None:
+            path = os.path.join(path, f"letter={safe_id(letter, 'letter')}")
+        return path
+
+    def append(self, child_id, letter, score, features, contour, level='', pitch_engine='',
+               analyzer_version='', duration=0.0, timestamp=None):
+        """Buffer one attempt; returns its attempt_id"""
+        key = (safe_id(child_id, 'child id'), safe_id(letter, 'letter'))
+        row = {
+            'attempt_id': uuid.uuid4().hex,
+            'child_id': key[0],
+            'letter': key[1],
+            'timestamp': int((time.time() if timestamp is None else timestamp) * 1000),
+            'score': float(score),
+            'level': level,
+            'pitch_engine': pitch_engine,
+            'analyzer_version': analyzer_version,
+            'duration': float(duration or 0.0),
+            'contour': encode_contour(contour)
+        }
+        for name in FEATURE_COLUMNS:
+            row[name] = float(features.get(name, np.nan))
+
+        with self._lock:
+            buffer = self._buffers.setdefault(key, [])
+            buffer.append(row)
+            full = len(buffer) >= self.flush_rows
+        if full:
+            self.flush(*key)
+        return row['attempt_id']
+
+    def flush(self, child_id=None, letter=None):
+        """Write buffered attempts (all, one child's, or one partition's) as new segments"""
+        with self._lock:
+            keys = [key for key in self._buffers
+                    if (child_id is None or key[0] == child_id) and (letter is None or key[1] == letter)]
+            pending = {key: self._buffers.pop(key) for key in keys}
+
+        for (child, letter_key), rows in pending.items():
+            if rows:
+                self._write_segment(child, letter_key, rows)
+
+    def _write_segment(self, child_id, letter, rows):
+        directory = self.partition_dir(child_id, letter)
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+
+        name = f"seg-{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+        if len(self._segments(directory)) >= self.compact_segments:
+            self.compact(child_id, letter)
+
+    @staticmethod
+    def _segments(directory):
+        try:
+            return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                          if name.endswith('.parquet') and not name.startswith('.'))
+        except FileNotFoundError:
+            return []
+
+    def compact(self, child_id, letter):
+        """Merge a partition's segments into one file sorted by time; returns False if another process holds it"""
+        directory = self.partition_dir(child_id, letter)
+        lock_path = os.path.join(directory, '.compact.lock')
+        try:
+            if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+
+        try:
+            segments = self._segments(directory)
+            if len(segments) < 2:
+                return True
+            table = pa.concat_tables([pq.read_table(path, schema=self.schema) for path in segments])
+            table = table.sort_by('timestamp')
+
+            # Named after the newest input so it keeps sorting among later segments
+            name = f"cmp-{os.path.basename(segments[-1])[4:]}"
+            tmp_path = os.path.join(directory, f".{name}.tmp")
+            pq.write_table(table, tmp_path, compression=self.compression, row_group_size=64 * 1024)
+            os.replace(tmp_path, os.path.join(directory, name))
+            for path in segments:
+                if os.path.basename(path) != name:
+                    os.remove(path)
+            logger.info(f"🗜️ Compacted {len(segments)} segments ({table.num_rows} attempts) in {directory}")
+            return True
+        finally:
+            os.remove(lock_path)
+
+    def read(self, child_id, letter=None, columns=None, since=None, limit=None):
+        """
+        Attempts for one child (and letter) as a pyarrow Table, oldest first.
+        Only that child's partitions are opened and only `columns` are decoded.
+        """
+        self.flush(safe_id(child_id, 'child id'), letter)
+        if letter is not None:
+            directories = [self.partition_dir(child_id, letter)]
+        else:
+            child_dir = self.partition_dir(child_id)
+            try:
+                directories = [os.path.join(child_dir, name) for name in sorted(os.listdir(child_dir))
+                               if name.startswith('letter=')]
+            except FileNotFoundError:
+                directories = []
+
+        # timestamp orders the result and filters `since`; attempt_id removes duplicates
+        wanted = list(columns) if columns is not None else self.schema.names
+        wanted = wanted + [name for name in ('timestamp', 'attempt_id') if name not in wanted]
+        table = self._deduplicate(self._read_partitions(directories, wanted))
+
+        if since is not None:
+            cutoff = pa.scalar(int(since * 1000), type=pa.timestamp('ms', tz='UTC'))
+            table = table.filter(pc.greater_equal(table['timestamp'], cutoff))
+        if table.num_rows:
+            table = table.sort_by('timestamp')
+        if columns is not None:
+            table = table.select(list(columns))
+        if limit is not None:
+            table = table.slice(max(0, table.num_rows - limit))
+        return table
+
+    @staticmethod
+    def _deduplicate(table):
+        """
+        Keep one row per attempt_id. A reader that lists a partition after
+        compaction wrote its merged file, but before it removed the inputs,
+        sees those attempts twice.
+        """
+        ids = table['attempt_id'].to_numpy(zero_copy_only=False)
+        _, first = np.unique(ids, return_index=True)
+        if len(first) == table.num_rows:
+            return table
+        return table.take(np.sort(first))
+
+    def _read_partitions(self, directories, columns, attempts=3):
+        """
+        Every segment of `directories` as one table. Raises FileNotFoundError if
+        segments keep vanishing under compaction, rather than reporting no attempts.
+        """
+        for attempt in range(attempts):
+            paths = [path for directory in directories for path in self._segments(directory)]
+            try:
+                tables = [pq.read_table(path, columns=columns, schema=self.schema) for path in paths]
+            except FileNotFoundError:
+                # A segment was compacted away after listing; list again to pick up the merged file
+                if attempt == attempts - 1:
+                    raise
+                continue
+            if tables:
+                return pa.concat_tables(tables)
+            break
+        return pa.schema([self.schema.field(name) for name in columns]).empty_table()
+
+    def start_background_flush(self, interval=30.0):
+        """Flush every `interval` seconds so a quiet worker does not sit on buffered attempts"""
+        if self._flusher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"❌ Attempt store flush failed: {e}")
+
+        self._flusher = threading.Thread(target=run, name='attempt-store-flush', daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
@@ -0,0 +1,113 @@
+import io
+
+import librosa
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+# Containers libsndfile can read directly, without starting ffmpeg
+SNDFILE_FORMATS = {'wav', 'flac', 'ogg', 'aiff'}
+
+# Everything else that is accepted goes through ffmpeg; unrecognised uploads are refused up front
+SUPPORTED_FORMATS = SNDFILE_FORMATS | {'mp3', 'mp4', 'webm', 'amr'}
+
+
+class AudioDecodeError(Exception):
+    """Raised when an upload cannot be turned into samples"""
+
+
+class UnsupportedAudioFormat(AudioDecodeError):
+    """Raised before any decoding when the upload is not a supported container"""
+
+
+def sniff_format(data):
+    """Guess the container from the first bytes of an upload"""
+    header = bytes(data[:12])
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'FORM' and header[8:12] in (b'AIFF', b'AIFC'):
+        return 'aiff'
+    if header[:5] == b'#!AMR':
+        return 'amr'
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if header[4:8] == b'ftyp':
+        return 'mp4'
+    if header[:3] == b'ID3' or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def check_format(data):
+    """Sniffed container of an upload; raises UnsupportedAudioFormat for anything not in SUPPORTED_FORMATS"""
+    if not data:
+        raise AudioDecodeError("Empty audio upload")
+    audio_format = sniff_format(data)
+    if audio_format not in SUPPORTED_FORMATS:
+        raise UnsupportedAudioFormat(
+            f"Unsupported audio format; send one of: {', '.join(sorted(SUPPORTED_FORMATS))}")
+    return audio_format
+
+
+def decode_audio(data, sr=16000, res_type='soxr_hq', max_duration=None):
+    """
+    Decode an uploaded clip straight into a mono float32 buffer at `sr`.
+
+    WAV/FLAC/OGG/AIFF are read in-process with libsndfile; the other
+    supported formats are transcoded by ffmpeg via pydub. Either way the
+    result is downmixed here and resampled with librosa's `res_type`.
+    Nothing is written to disk. With `max_duration` (seconds) decoding stops
+    there, so an over-long recording costs no more than a clip of that length.
+    """
+    audio_format = check_format(data)
+    audio = native_sr = None
+
+    if audio_format in SNDFILE_FORMATS:
+        try:
+            with sf.SoundFile(io.BytesIO(data)) as f:
+                frames = -1 if max_duration is None else int(max_duration * f.samplerate)
+                audio = f.read(frames, dtype='float32', always_2d=True)
+                native_sr = f.samplerate
+            audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+        except (RuntimeError, sf.LibsndfileError):
+            audio = None
+
+    if audio is None:
+        audio, native_sr = _decode_with_ffmpeg(data, max_duration)
+        if max_duration is not None:
+            # Backstop in case the container misreports its duration to ffmpeg
+            audio = audio[:int(max_duration * native_sr)]
+
+    if native_sr != sr:
+        audio = librosa.resample(audio, orig_sr=native_sr, target_sr=sr, res_type=res_type)
+
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _decode_with_ffmpeg(data, max_duration=None):
+    """
+    Pipe the upload through ffmpeg and return (mono samples, native rate);
+    with `max_duration`, ffmpeg stops transcoding after that many seconds.
+    ffmpeg only transcodes to WAV; downmixing happens here and resampling in
+    decode_audio (pydub appends `parameters` after the output, where ffmpeg
+    ignores them, so -ac/-ar cannot be pushed into ffmpeg this way).
+    """
+    try:
+        # No explicit format: ffmpeg probes the stream itself
+        # `duration` becomes an output -t, placed before the output so ffmpeg honours it
+        segment = AudioSegment.from_file(io.BytesIO(data), duration=max_duration)
+    except Exception as e:
+        raise AudioDecodeError(f"Could not decode audio: {e}") from e
+
+    # pydub hands back signed samples for every width (8-bit WAV is unsigned on
+    # the wire and is re-biased by pydub), so read them through its own array type
+    samples = np.array(segment.get_array_of_samples())
+    scale = float(1 << (8 * segment.sample_width - 1))
+    audio = samples.astype(np.float32) / scale
+    if segment.channels > 1:
+        audio = audio.reshape(-1, segment.channels).mean(axis=1)
+    return audio, segment.frame_rate
@@ -1,77 +1,20 @@
-'''import librosa
-import pandas as pd
+import argparse
+import json
 import os
-import numpy as np
-import time
-
-audio_dir = 'E:/code/deaf and dumb/data/data/audio'
-wav_dir = 'E:/code/deaf and dumb/data/data/audio/wav'
-data = []
-
-start_time = time.time()
-
-for file in os.listdir(audio_dir):
-    if file.endswith('.mpeg'):
-        path = os.path.join(audio_dir, file)
-        label = file.split('.')[0]  
-
-        y, sr = librosa.load(path)
-        duration = librosa.get_duration(y=y, sr=sr)
-
-        f0, voiced_flag, _ = librosa.pyin(y, fmin=75, fmax=300, sr=sr)
-        f0 = f0[~np.isnan(f0)]
-
-        if len(f0) > 0:
-            avg = np.mean(f0)
-            minp = np.min(f0)
-            maxp = np.max(f0)
-        else:
-            avg = minp = maxp = 0
-
-        data.append([label, avg, minp, maxp, duration])
-
-for file in os.listdir(wav_dir):
-    if file.endswith('.wav'):
-        path = os.path.join(wav_dir, file)
-        label = file.split('.')[0]
-
-        y, sr = librosa.load(path)
-        duration = librosa.get_duration(y=y, sr=sr)
-
-        f0, voiced_flag, _ = librosa.pyin(y, fmin=75, fmax=300, sr=sr)
-        f0 = f0[~np.isnan(f0)]
-
-        if len(f0) > 0:
-            avg = np.mean(f0)
-            minp = np.min(f0)
-            maxp = np.max(f0)
-        else:
-            avg = minp = maxp = 0
-
-        data.append([label, avg, minp, maxp, duration])
-
-df = pd.DataFrame(data, columns=["Alphabet", "Avg_Pitch_Hz", "Min_Pitch", "Max_Pitch", "Duration_s"])
-df.to_csv("hindi_pitch_dataset.csv", index=False)
-
-end_time = time.time()
-print(f"Execution time: {end_time - start_time} seconds")'''
-
-
-
-
-
-
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score, StratifiedKFold
+from joblib import Memory
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401  (enables HalvingRandomSearchCV)
+from sklearn.model_selection import (train_test_split, GridSearchCV, HalvingRandomSearchCV, ParameterGrid,
+                                     RandomizedSearchCV, StratifiedKFold)
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.svm import SVC
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.feature_selection import SelectKBest, f_classif, RFE
-import matplotlib.pyplot as plt
-import seaborn as sns
+from sklearn.pipeline import Pipeline
+from classifier import DEFAULT_MODEL_PATH, export_model_bundle
 try:
     from xgboost import XGBClassifier
     XGBOOST_AVAILABLE = True
@@ -88,11 +31,46 @@ except ImportError:
 import warnings
 warnings.filterwarnings('ignore')
 
+SEARCH_MODES = ('halving', 'random', 'grid')
+
+# Successive halving keeps the best 1/HALVING_FACTOR of the candidates each round
+HALVING_FACTOR = 3
+
+# Ensembles are halved over trees instead of samples
+ENSEMBLE_MODELS = ('Random Forest', 'XGBoost')
+
+# Models trained on standardized features
+SCALED_MODELS = ('SVM', 'Logistic Regression')
+
+
+def _fit_selector(selector, X, y):
+    """Fit a feature selector; memoized on disk by AudioClassificationPipeline"""
+    return selector.fit(X, y)
+
+
+def _fit_search(search, X, y):
+    """Fit a hyper-parameter search (every candidate and fold); the call as a whole is memoized on disk"""
+    return search.fit(X, y)
+
+
 class AudioClassificationPipeline:
-    def __init__(self, data_path):
+    def __init__(self, data_path, search='halving', search_budget=20, cache_dir='.audiopitch_cache',
+                 random_state=42):
+        """
+        search: 'halving' (successive halving), 'random' or 'grid' (exhaustive)
+        search_budget: candidates sampled per model by the halving/random searches
+        cache_dir: fitted searches and feature selections are memoized here; None disables
+        """
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search}'. Available: {', '.join(SEARCH_MODES)}")
         self.data_path = data_path
+        self.search = search
+        self.search_budget = search_budget
+        self.random_state = random_state
+        self.memory = Memory(cache_dir, verbose=0)
         self.models = {}
         self.best_model = None
+        self.best_model_name = None
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.feature_selector = None
@@ -123,6 +101,12 @@ class AudioClassificationPipeline:
         """Perform feature selection"""
         print(f"\nPerforming feature selection using {method}...")
         
+        n_features = self.X.shape[1]
+        if k >= n_features:
+            print(f"Requested {k} features but only {n_features} available, keeping all")
+            self.feature_selector = None
+            return self.X
+        
         if method == 'univariate':
             self.feature_selector = SelectKBest(score_func=f_classif, k=k)
         elif method == 'rfe':
@@ -130,7 +114,8 @@ class AudioClassificationPipeline:
             rf = RandomForestClassifier(n_estimators=100, random_state=42)
             self.feature_selector = RFE(estimator=rf, n_features_to_select=k)
         
-        X_selected = self.feature_selector.fit_transform(self.X, self.y_encoded)
+        self.feature_selector = self.memory.cache(_fit_selector)(self.feature_selector, self.X, self.y_encoded)
+        X_selected = self.feature_selector.transform(self.X)
         
         # Get selected feature names
         if hasattr(self.feature_selector, 'get_support'):
@@ -202,11 +187,12 @@ class AudioClassificationPipeline:
                 }
             },
             'Logistic Regression': {
-                'model': LogisticRegression(random_state=42, max_iter=1000),
+                # saga is the one solver that fits both l1 and l2 with the multinomial loss,
+                # so the search only has to vary C and penalty
+                'model': LogisticRegression(random_state=42, max_iter=1000, solver='saga'),
                 'params': {
                     'C': [0.1, 1, 10, 100],
-                    'penalty': ['l1', 'l2'],
-                    'solver': ['liblinear', 'saga']
+                    'penalty': ['l1', 'l2']
                 }
             }
         })
@@ -220,66 +206,82 @@ class AudioClassificationPipeline:
         for name, config in model_configs.items():
             print(f"\nTraining {name}...")
             
-            # Grid search for hyperparameter tuning
-            grid_search = GridSearchCV(
-                config['model'], 
-                config['params'], 
-                cv=cv, 
-                scoring='accuracy',
-                n_jobs=-1,
-                verbose=0
-            )
-            
             # Use scaled data for SVM and Logistic Regression
-            if name in ['SVM', 'Logistic Regression']:
-                grid_search.fit(X_train_scaled, y_train)
-                if use_holdout:
-                    y_pred = grid_search.predict(X_test_scaled)
-                    test_accuracy = accuracy_score(y_test, y_pred)
-                else:
-                    # For small datasets, use cross-validation score as test score
-                    cv_scores = cross_val_score(grid_search.best_estimator_, X_train_scaled, y_train, cv=cv, scoring='accuracy')
-                    y_pred = None
-                    test_accuracy = cv_scores.mean()
-            else:
-                grid_search.fit(X_train, y_train)
-                if use_holdout:
-                    y_pred = grid_search.predict(X_test)
-                    test_accuracy = accuracy_score(y_test, y_pred)
-                else:
-                    # For small datasets, use cross-validation score as test score
-                    cv_scores = cross_val_score(grid_search.best_estimator_, X_train, y_train, cv=cv, scoring='accuracy')
-                    y_pred = None
-                    test_accuracy = cv_scores.mean()
+            scaled = name in SCALED_MODELS
+            X_fit = X_train_scaled if scaled else X_train
+            
+            # The whole search call is memoized on disk: re-running with unchanged data and settings
+            # loads the fitted search; any change refits every candidate and fold
+            search = self._make_search(name, config, cv, len(X_fit), n_classes)
+            search = self.memory.cache(_fit_search)(search, X_fit, y_train)
+            
+            # The search already cross-validated the winning candidate; no need to do it again
+            cv_mean = search.cv_results_['mean_test_score'][search.best_index_]
+            cv_std = search.cv_results_['std_test_score'][search.best_index_]
             
-            # Get cross-validation scores for model comparison
-            cv_scores = cross_val_score(grid_search.best_estimator_, 
-                                      X_train_scaled if name in ['SVM', 'Logistic Regression'] else X_train, 
-                                      y_train, cv=cv, scoring='accuracy')
+            if use_holdout:
+                y_pred = search.predict(X_test_scaled if scaled else X_test)
+                test_accuracy = accuracy_score(y_test, y_pred)
+            else:
+                # For small datasets, use cross-validation score as test score
+                y_pred = None
+                test_accuracy = cv_mean
             
             # Store results
             results[name] = {
-                'model': grid_search.best_estimator_,
+                'model': search.best_estimator_,
                 'accuracy': test_accuracy,
-                'cv_mean': cv_scores.mean(),
-                'cv_std': cv_scores.std(),
-                'best_params': grid_search.best_params_,
+                'cv_mean': cv_mean,
+                'cv_std': cv_std,
+                'best_params': search.best_params_,
                 'predictions': y_pred
             }
             
-            print(f"{name} - Test Accuracy: {test_accuracy:.4f}, CV: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+            print(f"{name} - Test Accuracy: {test_accuracy:.4f}, CV: {cv_mean:.4f} (+/- {cv_std * 2:.4f})")
         
         # Find best model
         best_model_name = max(results, key=lambda x: results[x]['cv_mean'])
         self.best_model = results[best_model_name]['model']
+        self.best_model_name = best_model_name
         
         print(f"\nBest model: {best_model_name}")
         print(f"Best CV accuracy: {results[best_model_name]['cv_mean']:.4f}")
         
         return results, X_test, y_test, use_holdout
     
+    def _make_search(self, name, config, cv, n_samples, n_classes):
+        """Unfitted search for one model, according to self.search and self.search_budget"""
+        model, params = config['model'], config['params']
+        common = dict(cv=cv, scoring='accuracy', n_jobs=-1, verbose=0)
+        
+        if self.search == 'grid':
+            return GridSearchCV(model, params, **common)
+        
+        n_candidates = min(self.search_budget, len(ParameterGrid(params)))
+        if self.search == 'halving':
+            if name in ENSEMBLE_MODELS and 'n_estimators' in params:
+                # Early rounds score many candidates with few trees, the last round the survivors with all of them
+                trees = params['n_estimators']
+                params = {key: values for key, values in params.items() if key != 'n_estimators'}
+                return HalvingRandomSearchCV(
+                    model, params, n_candidates=min(self.search_budget, len(ParameterGrid(params))),
+                    resource='n_estimators', min_resources=min(trees), max_resources=max(trees),
+                    factor=HALVING_FACTOR, random_state=self.random_state, **common)
+            
+            # Halving over samples needs room for more than one round
+            min_samples = 2 * cv.get_n_splits() * n_classes
+            if n_samples >= min_samples * HALVING_FACTOR:
+                return HalvingRandomSearchCV(
+                    model, params, n_candidates=n_candidates, min_resources=min_samples,
+                    factor=HALVING_FACTOR, random_state=self.random_state, **common)
+        
+        return RandomizedSearchCV(model, params, n_iter=n_candidates, random_state=self.random_state, **common)
+    
     def evaluate_model(self, results, X_test, y_test, use_holdout):
         """Detailed evaluation of the best model"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         print("\n" + "="*50)
         print("DETAILED EVALUATION")
         print("="*50)
@@ -341,6 +343,9 @@ class AudioClassificationPipeline:
     
     def feature_importance_analysis(self):
         """Analyze feature importance"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         if hasattr(self.best_model, 'feature_importances_'):
             if self.feature_selector:
                 selected_features = self.X.columns[self.feature_selector.get_support()]
@@ -373,6 +378,35 @@ class AudioClassificationPipeline:
             print("Selected model doesn't provide feature importance")
             return None
     
+    def export_model(self, path=DEFAULT_MODEL_PATH):
+        """Save the fitted selector, scaler and best model as one bundle for the backend's /classify"""
+        if self.best_model is None:
+            raise ValueError("No trained model to export; run train_models first")
+        
+        pipeline = Pipeline([
+            ('select', self.feature_selector if self.feature_selector is not None else 'passthrough'),
+            ('scale', self.scaler if self.best_model_name in SCALED_MODELS else 'passthrough'),
+            ('model', self.best_model)
+        ])
+        
+        # Inference must extract features exactly like the build that produced the CSV
+        from build_dataset import manifest_path
+        feature_settings = {}
+        manifest = manifest_path(self.data_path)
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as f:
+                settings = json.load(f).get('settings', {})
+            feature_settings = {key: settings[key] for key in ('sr', 'fmin', 'fmax') if key in settings}
+        
+        export_model_bundle(path, pipeline, self.X.columns, self.label_encoder.classes_, feature_settings, {
+            'model': self.best_model_name,
+            'search': self.search,
+            'training_data': os.path.basename(self.data_path),
+            'samples': len(self.X)
+        })
+        print(f"\n📦 Exported {self.best_model_name} to {path}")
+        return path
+    
     def run_complete_pipeline(self, use_feature_selection=True, n_features=50):
         """Run the complete ML pipeline"""
         print("Starting Audio Classification Pipeline...")
@@ -399,14 +433,28 @@ class AudioClassificationPipeline:
 
 # Usage example
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and compare alphabet classifiers")
+    parser.add_argument('--data', default="hindi_pitch_dataset.csv")
+    parser.add_argument('--search', choices=SEARCH_MODES, default='halving',
+                        help="Hyper-parameter search: successive halving, randomized or exhaustive grid")
+    parser.add_argument('--budget', type=int, default=20, help="Candidates sampled per model (halving/random)")
+    parser.add_argument('--cache-dir', default='.audiopitch_cache', help="On-disk cache of fitted searches")
+    parser.add_argument('--no-cache', action='store_true', help="Fit everything from scratch")
+    parser.add_argument('--n-features', type=int, default=50)
+    parser.add_argument('--export', default=DEFAULT_MODEL_PATH, help="Where to write the model bundle served by /classify")
+    args = parser.parse_args()
+    
     # Initialize pipeline
-    pipeline = AudioClassificationPipeline("hindi_pitch_dataset.csv")
+    pipeline = AudioClassificationPipeline(args.data, search=args.search, search_budget=args.budget,
+                                           cache_dir=None if args.no_cache else args.cache_dir)
     
     # Run complete pipeline
     best_result = pipeline.run_complete_pipeline(
         use_feature_selection=True, 
-        n_features=50
+        n_features=args.n_features
     )
     
+    pipeline.export_model(args.export)
+    
     print("\nPipeline completed successfully!")
     print(f"Best model achieved {best_result['accuracy']:.4f} accuracy on test set")
@@ -0,0 +1,89 @@
+"""
+Micro-batching: concurrent callers each submit one item and a single
+background thread runs them together, so a model pays one forward pass for
+whatever arrived within a few milliseconds of each other.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesces submit() calls into calls of `fn(items)`, which must return one
+    result per item in order. A batch is cut when it reaches `max_batch_size`
+    or `max_wait` seconds after its first item arrived.
+    """
+
+    def __init__(self, fn, max_batch_size=8, max_wait=0.01, name='micro-batcher'):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one item; returns a Future for its result"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def run(self, item, timeout=None):
+        """
+        Submit one item and wait for its result. Raises TimeoutError after
+        `timeout` seconds; the item is then dropped if its batch has not started.
+        """
+        future = self.submit(item)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_batches, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batches(self):
+        while True:
+            # Items whose caller gave up waiting are skipped
+            batch = [(item, future) for item, future in self._next_batch() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items, futures = zip(*batch)
+            self.batches += 1
+            self.items += len(items)
+            try:
+                results = list(self.fn(list(items)))
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: got {len(results)} results for a batch of {len(items)}")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the analysis pipeline on a synthetic vowel corpus
+Usage: python bench_analysis.py run [--durations 1 3 10 30] [--repeats 5] [--out bench.json]
+       python bench_analysis.py compare baseline.json bench.json [--threshold 0.15]
+
+The corpus is generated deterministically (glottal pulse train through
+formant resonators plus aspiration noise), so two runs on the same machine
+time exactly the same audio. Each stage is timed separately:
+load_and_preprocess_audio, extract_pitch_features,
+advanced_similarity_analysis and a full POST /analyze_pronunciation through
+the Flask test client. `compare` flags stages whose median got slower.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+SR = 16000
+
+# First three formants as (centre Hz, bandwidth Hz), adult averages
+VOWEL_FORMANTS = {
+    'a': ((730, 90), (1090, 110), (2440, 170)),
+    'i': ((270, 60), (2290, 100), (3010, 120)),
+    'u': ((300, 60), (870, 90), (2240, 120)),
+    'e': ((530, 70), (1840, 100), (2480, 120)),
+    'o': ((570, 80), (840, 90), (2410, 120)),
+}
+VOWEL_TARGETS = {'a': 'अ', 'i': 'इ', 'u': 'उ', 'e': 'ए', 'o': 'ओ'}
+
+DEFAULT_DURATIONS = (1, 3, 10, 30)
+STAGES = ('load_and_preprocess_audio', 'extract_pitch_features', 'advanced_similarity_analysis', 'end_to_end')
+
+
+def glottal_pulses(n, f0, sr, rng, jitter=0.01, vibrato_hz=5.0, vibrato_depth=0.02):
+    """Differentiated Rosenberg pulse train with vibrato, declination and cycle jitter"""
+    t = np.arange(n) / sr
+    declination = 1 - 0.1 * t / max(t[-1], 1e-9)
+    wander = np.repeat(rng.standard_normal(n // int(sr / f0) + 1), int(sr / f0))[:n]
+    frequency = f0 * declination * (1 + vibrato_depth * np.sin(2 * np.pi * vibrato_hz * t)) * (1 + jitter * wander)
+
+    phase = np.cumsum(frequency) / sr % 1.0
+    rise, fall = 0.4, 0.16
+    pulse = np.where(phase < rise, 0.5 * (1 - np.cos(np.pi * phase / rise)), 0.0)
+    closing = (phase >= rise) & (phase < rise + fall)
+    pulse[closing] = np.cos(np.pi * (phase[closing] - rise) / (2 * fall))
+    return np.diff(pulse, prepend=0.0)
+
+
+def formant_vowel(seconds, f0=220.0, vowel='a', sr=SR, seed=0, snr_db=30.0):
+    """Deterministic vowel-like clip: glottal source, cascade formant filter, noise and fades"""
+    from scipy import signal
+
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    audio = glottal_pulses(n, f0, sr, rng)
+
+    for centre, bandwidth in VOWEL_FORMANTS[vowel]:
+        r = np.exp(-np.pi * bandwidth / sr)
+        a = [1.0, -2 * r * np.cos(2 * np.pi * centre / sr), r * r]
+        audio = signal.lfilter([sum(a)], a, audio)
+
+    noise = rng.standard_normal(n)
+    audio = audio + noise * np.std(audio) / np.std(noise) * 10 ** (-snr_db / 20)
+
+    fade = min(int(0.05 * sr), n // 2)
+    envelope = np.ones(n)
+    envelope[:fade] = np.linspace(0, 1, fade)
+    envelope[n - fade:] = np.linspace(1, 0, fade)
+    audio = audio * envelope
+    return (0.8 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def build_corpus(durations=DEFAULT_DURATIONS, sr=SR, seed=0):
+    """One clip per duration, cycling through vowels and child-range pitches"""
+    vowels = sorted(VOWEL_FORMANTS)
+    corpus = []
+    for i, seconds in enumerate(durations):
+        vowel = vowels[i % len(vowels)]
+        f0 = (220.0, 260.0, 300.0, 240.0)[i % 4]
+        corpus.append({
+            'name': f"{vowel}_{f0:.0f}hz_{seconds}s",
+            'seconds': seconds,
+            'vowel': vowel,
+            'f0': f0,
+            'target': VOWEL_TARGETS[vowel],
+            'audio': formant_vowel(seconds, f0, vowel, sr, seed + i)
+        })
+    return corpus
+
+
+def time_calls(fn, repeats):
+    """Run fn `repeats` times (after one untimed warm-up call); returns timings in ms"""
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    return {
+        'median_ms': float(np.median(timings)),
+        'min_ms': float(np.min(timings)),
+        'mean_ms': float(np.mean(timings)),
+        'max_ms': float(np.max(timings)),
+        'repeats': len(timings)
+    }
+
+
+def run_benchmarks(durations=DEFAULT_DURATIONS, repeats=5, pitch_engine='piptrack', stages=STAGES):
+    """Time every stage on every corpus clip; returns the JSON-ready report"""
+    import app as app_module
+    from result_cache import ResultCache
+
+    # Every request must run the full pipeline: the app gets a cache that keeps nothing,
+    # and timing starts only once its background warm-up has finished
+    app_module.result_cache = ResultCache(max_entries=0, version=app_module.analyzer.version)
+    for thread in threading.enumerate():
+        if thread.name == 'analyzer-warmup':
+            thread.join()
+
+    analyzer = app_module.analyzer
+    client = app_module.app.test_client()
+    corpus = build_corpus(durations)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for clip in corpus:
+            path = os.path.join(tmp_dir, f"{clip['name']}.wav")
+            sf.write(path, clip['audio'], SR)
+            with open(path, 'rb') as f:
+                wav_bytes = f.read()
+
+            audio = analyzer.load_and_preprocess_audio(path)
+            track, features = analyzer.extract_pitch_features(audio, pitch_engine)
+            reference = analyzer._lookup_reference(clip['target'])
+            contour = reference['contour']
+            if contour is None:
+                contour = np.full(len(track), reference['avg_pitch'])
+
+            def post():
+                response = client.post('/analyze_pronunciation', data={
+                    'audio': (io.BytesIO(wav_bytes), 'clip.wav'),
+                    'target': clip['target'],
+                    'pitch_engine': pitch_engine
+                }, content_type='multipart/form-data')
+                assert response.status_code == 200, response.get_json()
+
+            calls = {
+                'load_and_preprocess_audio': lambda: analyzer.load_and_preprocess_audio(path),
+                'extract_pitch_features': lambda: analyzer.extract_pitch_features(audio, pitch_engine),
+                'advanced_similarity_analysis': lambda: analyzer.advanced_similarity_analysis(
+                    features, reference['features'], track.f0, contour),
+                'end_to_end': post
+            }
+            for stage in stages:
+                summary = summarize(time_calls(calls[stage], repeats))
+                results[f"{stage}@{clip['seconds']}s"] = summary
+                print(f"⏱️  {stage:<30} {clip['seconds']:>4}s  median {summary['median_ms']:9.2f} ms")
+
+    import librosa
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'analyzer_version': analyzer.version,
+            'pitch_engine': pitch_engine,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'librosa': librosa.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'results': results
+    }
+
+
+def compare_reports(baseline, current, threshold=0.15, min_delta_ms=1.0):
+    """
+    Per-stage comparison of two reports. A stage regresses when its median is
+    more than `threshold` (relative) and `min_delta_ms` (absolute) slower.
+    """
+    rows = []
+    for key in sorted(set(baseline['results']) & set(current['results'])):
+        old = baseline['results'][key]['median_ms']
+        new = current['results'][key]['median_ms']
+        ratio = new / old if old else float('inf')
+        rows.append({
+            'stage': key,
+            'baseline_ms': old,
+            'current_ms': new,
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold and new - old > min_delta_ms
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pronunciation analysis pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Time each stage on the synthetic corpus")
+    run_parser.add_argument('--durations', type=float, nargs='+', default=list(DEFAULT_DURATIONS))
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--pitch-engine', default='piptrack')
+    run_parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    run_parser.add_argument('--out', default='bench_results.json')
+
+    compare_parser = commands.add_parser('compare', help="Flag stages that got slower between two runs")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help="Allowed relative slow-down")
+    compare_parser.add_argument('--min-delta-ms', type=float, default=1.0, help="Ignore smaller absolute changes")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        durations = [int(d) if float(d).is_integer() else d for d in args.durations]
+        report = run_benchmarks(durations, args.repeats, args.pitch_engine, args.stages)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📦 Wrote {len(report['results'])} timings to {args.out}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold, args.min_delta_ms)
+    print(f"{'stage':<40} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for row in rows:
+        flag = "  ❌ REGRESSION" if row['regression'] else ""
+        print(f"{row['stage']:<40} {row['baseline_ms']:9.2f}ms {row['current_ms']:9.2f}ms {row['ratio']:6.2f}x{flag}")
+
+    regressions = [row for row in rows if row['regression']]
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%}" if regressions else "✅ No regressions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
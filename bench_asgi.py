@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Slow-client benchmark: Flask under sync gunicorn vs the ASGI app under uvicorn
+Usage: python bench_asgi.py [--slow-clients 8] [--fast-clients 2] [--upload-kbps 16] [--duration 20]
+
+Starts each server in turn, then runs two groups of clients against
+/analyze_pronunciation for a fixed time:
+    slow clients trickle their multipart upload at --upload-kbps, like a phone on a poor link
+    fast clients send the whole upload at once, back to back
+Every upload is unique, so the result cache never answers.
+Reports completed requests per second and fast-client latency for each server.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+SERVERS = {
+    'flask+gunicorn': lambda port, workers: [
+        'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}', '--timeout', '120', '--workers', str(workers)],
+    'asgi+uvicorn': lambda port, workers: [
+        'uvicorn', 'asgi_app:app', '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+        '--log-level', 'warning'],
+}
+
+
+def make_clips(count, seconds=1.5, sr=16000):
+    """Voiced WAV clips at varied pitches"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    clips = []
+    for _ in range(count):
+        f0 = rng.uniform(150, 300)
+        tone = 0.3 * np.sin(2 * np.pi * f0 * t) * (1 + 0.1 * np.sin(2 * np.pi * 3 * t))
+        buffer = io.BytesIO()
+        sf.write(buffer, tone + 0.005 * rng.standard_normal(len(t)), sr, format='WAV')
+        clips.append(buffer.getvalue())
+    return clips
+
+
+def multipart_request(port, audio, target='अ'):
+    boundary = uuid.uuid4().hex
+    body = b''.join([
+        f'--{boundary}\r\nContent-Disposition: form-data; name="target"\r\n\r\n'.encode(), target.encode(), b'\r\n',
+        f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="clip.wav"\r\n'
+        f'Content-Type: audio/wav\r\n\r\n'.encode(), audio, b'\r\n',
+        f'--{boundary}--\r\n'.encode()
+    ])
+    head = (f'POST /analyze_pronunciation HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n'
+            f'Content-Type: multipart/form-data; boundary={boundary}\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n').encode()
+    return head + body
+
+
+def post(port, payload, bytes_per_second=None, timeout=180):
+    """Send one request, optionally trickled; returns the HTTP status code (0 on a connection error)"""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=timeout) as conn:
+            if bytes_per_second is None:
+                conn.sendall(payload)
+            else:
+                chunk = max(1, bytes_per_second // 10)
+                for start in range(0, len(payload), chunk):
+                    conn.sendall(payload[start:start + chunk])
+                    time.sleep(0.1)
+            response = b''
+            while b'\r\n' not in response:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                response += data
+            while conn.recv(65536):
+                pass
+        return int(response.split(b' ', 2)[1]) if response.startswith(b'HTTP/') else 0
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def wait_until_ready(port, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as conn:
+                conn.sendall(b'GET / HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+                if conn.recv(16).startswith(b'HTTP/1.1 200'):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+def run(name, args, clips):
+    env = dict(os.environ, ATTEMPT_STORE_DIR='', PROGRESS_DB_PATH='', RESULT_CACHE_DIR='')
+    process = subprocess.Popen(SERVERS[name](args.port, args.workers), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(args.port, process)
+        counter = iter(range(10 ** 9))
+        lock = threading.Lock()
+        outcomes = {'slow': [], 'fast': []}
+        deadline = time.perf_counter() + args.duration
+
+        def client(kind):
+            rate = args.upload_kbps * 1024 if kind == 'slow' else None
+            while time.perf_counter() < deadline:
+                with lock:
+                    n = next(counter)
+                # The last two samples carry the request number, so every upload is unique
+                audio = clips[n % len(clips)][:-4] + n.to_bytes(4, 'little')
+                start = time.perf_counter()
+                status = post(args.port, multipart_request(args.port, audio), rate)
+                finished = time.perf_counter()
+                if finished <= deadline:
+                    outcomes[kind].append((status, finished - start))
+
+        threads = [threading.Thread(target=client, args=('slow',)) for _ in range(args.slow_clients)]
+        threads += [threading.Thread(target=client, args=('fast',)) for _ in range(args.fast_clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Flask+gunicorn and ASGI+uvicorn under slow uploads")
+    parser.add_argument('--slow-clients', type=int, default=8)
+    parser.add_argument('--fast-clients', type=int, default=2)
+    parser.add_argument('--upload-kbps', type=int, default=16, help="slow clients' upload rate in KiB/s")
+    parser.add_argument('--duration', type=float, default=20.0, help="seconds of load per server")
+    parser.add_argument('--workers', type=int, default=1, help="server worker processes (Procfile uses 1)")
+    parser.add_argument('--port', type=int, default=8701)
+    parser.add_argument('--servers', nargs='+', default=list(SERVERS), choices=list(SERVERS))
+    args = parser.parse_args()
+
+    clips = make_clips(16)
+    print(f"{args.slow_clients} slow clients at {args.upload_kbps} KiB/s + {args.fast_clients} fast clients, "
+          f"{args.duration:g}s per server, {len(clips[0]) // 1024} KiB clips, {args.workers} worker(s)")
+    print(f"{'server':<16} {'req/s':>7} {'slow ok':>8} {'fast ok':>8} {'fast p50':>9} {'fast p99':>9} {'errors':>7}")
+
+    for name in args.servers:
+        if shutil.which(SERVERS[name](args.port, args.workers)[0]) is None:
+            print(f"{name:<16} skipped ({SERVERS[name](args.port, args.workers)[0]} not installed)")
+            continue
+        outcomes = run(name, args, clips)
+        ok = {kind: [seconds for status, seconds in results if status == 200] for kind, results in outcomes.items()}
+        errors = sum(1 for results in outcomes.values() for status, _ in results if status != 200)
+        fast = np.array(ok['fast']) * 1000 if ok['fast'] else np.array([np.nan])
+        total = len(ok['slow']) + len(ok['fast'])
+        print(f"{name:<16} {total / args.duration:>7.2f} {len(ok['slow']):>8} {len(ok['fast']):>8} "
+              f"{np.percentile(fast, 50):>7.0f}ms {np.percentile(fast, 99):>7.0f}ms {errors:>7}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: dtw_engine.dtw_distance against fastdtw on pitch-like contours
+Usage: python bench_dtw.py [--lengths 100 500 1000 2000 5000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from dtw_engine import dtw_distance
+
+try:
+    from fastdtw import fastdtw
+    FASTDTW_AVAILABLE = True
+except ImportError:
+    print("fastdtw not available. Install with: pip install fastdtw")
+    FASTDTW_AVAILABLE = False
+
+
+def pitch_contour(length, seed):
+    """Slowly drifting contour around 250 Hz with frame-level jitter"""
+    rng = np.random.default_rng(seed)
+    drift = np.cumsum(rng.normal(0, 2, length))
+    return 250 + drift + rng.normal(0, 5, length)
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DTW implementations")
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--radius', type=float, default=0.1, help="Sakoe-Chiba radius as a fraction of length")
+    args = parser.parse_args()
+
+    header = f"{'frames':>7} {'fastdtw':>10} {'full':>10} {'sakoe':>10} {'itakura':>10} {'abandon':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for length in args.lengths:
+        child = pitch_contour(length, 0)
+        ref = pitch_contour(int(length * 1.1), 1)
+        radius = max(1, int(length * args.radius))
+
+        if FASTDTW_AVAILABLE:
+            t_fast, (d_fast, _) = best_time(
+                lambda: fastdtw(child.tolist(), ref.tolist(), dist=lambda x, y: abs(x - y)), args.repeat)
+        else:
+            t_fast, d_fast = float('nan'), float('nan')
+
+        t_full, d_full = best_time(lambda: dtw_distance(child, ref), args.repeat)
+        t_band, d_band = best_time(
+            lambda: dtw_distance(child, ref, window='sakoe_chiba', radius=radius), args.repeat)
+        t_ita, d_ita = best_time(lambda: dtw_distance(child, ref, window='itakura'), args.repeat)
+        # Cutoff at which the analyzer's dtw_similarity saturates to 0
+        t_cut, _ = best_time(lambda: dtw_distance(child, ref, cutoff=1000), args.repeat)
+
+        print(f"{length:>7} {t_fast * 1000:>8.1f}ms {t_full * 1000:>8.1f}ms {t_band * 1000:>8.1f}ms "
+              f"{t_ita * 1000:>8.1f}ms {t_cut * 1000:>8.1f}ms")
+        print(f"{'':>7} distance: fastdtw={d_fast:.1f} full={d_full:.1f} "
+              f"sakoe={d_band:.1f} itakura={d_ita:.1f}")
+
+
+if __name__ == "__main__":
+    main()
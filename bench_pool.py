@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the warm analysis process pool
+Usage: python bench_pool.py [--max-workers N] [--clips 48]
+
+Decodes the reference recordings once, then pushes the same batch of clips
+through AnalysisPool with 1..N workers and reports clips per second.
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import librosa
+
+from analysis_pool import AnalysisPool
+
+HINDI_LETTERS = {
+    'A': 'अ', 'Aaa': 'आ', 'e': 'इ', 'eee': 'ई', 'u': 'उ', 'Uuu': 'ऊ', 'Ea': 'ए',
+    'Eaa': 'ऐ', 'O': 'ओ', 'Oo': 'औ', 'angg': 'अं', 'rii': 'री', 'hahaa': 'हहा'
+}
+
+
+def load_clips(data_dir, count, sr=16000):
+    paths = sorted(glob.glob(os.path.join(data_dir, '*.mpeg')))
+    decoded = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        audio, _ = librosa.load(path, sr=sr, mono=True)
+        decoded.append((HINDI_LETTERS.get(name, name), audio))
+    return [decoded[i % len(decoded)] for i in range(count)]
+
+
+def run(pool_size, clips):
+    pool = AnalysisPool(pool_size, analyzer_kwargs={'reference_csv_path': 'hindi_pitch_dataset.csv'})
+    start = time.perf_counter()
+    pool.start()
+    warmup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pool_size * 2) as clients:
+        results = list(clients.map(lambda clip: pool.analyze(*clip), clips))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    failures = sum(1 for r in results if not r.get('success'))
+    return warmup, elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis pool scaling")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--clips', type=int, default=48)
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    clips = load_clips(args.data_dir, args.clips)
+    print(f"{len(clips)} clips, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'warm-up':>9} {'elapsed':>9} {'clips/s':>9} {'speed-up':>9}")
+
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        warmup, elapsed, failures = run(workers, clips)
+        throughput = len(clips) / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>7} {warmup:>8.2f}s {elapsed:>8.2f}s {throughput:>9.2f} {throughput / baseline:>8.2f}x"
+              + (f"  ({failures} failed)" if failures else ""))
+
+
+if __name__ == "__main__":
+    main()
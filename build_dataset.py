@@ -0,0 +1,198 @@
+"""
+Builds hindi_pitch_dataset.csv from the reference recordings.
+
+    python build_dataset.py --data-dir data --out hindi_pitch_dataset.csv
+
+Each recording's file name (without extension) is the letter it is the
+reference for, so two files with the same name in different subdirectories
+are refused. Files are processed in parallel across a process pool. A
+manifest of content hashes is kept next to the CSV, so a rebuild only
+re-extracts recordings that were added or changed since the last run
+(--force re-extracts everything).
+Alongside the CSV the same rows plus extra statistics and provenance are
+written as Parquet when pyarrow is installed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    print("pyarrow not available, skipping Parquet output. Install with: pip install pyarrow")
+    PARQUET_AVAILABLE = False
+
+# Bump when extraction changes so old manifest entries are not reused
+BUILDER_VERSION = 1
+
+AUDIO_EXTENSIONS = ('.mpeg', '.mp3', '.wav', '.flac', '.ogg', '.m4a')
+
+# Columns read by EnhancedPitchAnalyzer; the Parquet file adds the rest
+CSV_COLUMNS = ["Alphabet", "Avg_Pitch_Hz", "Min_Pitch", "Max_Pitch", "Duration_s"]
+PARQUET_COLUMNS = CSV_COLUMNS + ["Median_Pitch", "Std_Pitch", "Voiced_Ratio", "Frames", "Source", "Sha256"]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_recordings(data_dir):
+    """Every audio file under data_dir, as paths relative to it, in a stable order"""
+    found = []
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), data_dir))
+    return sorted(found)
+
+
+def alphabet_label(source):
+    """The letter a recording is the reference for: its file name without the extension"""
+    return os.path.splitext(os.path.basename(source))[0]
+
+
+def check_unique_labels(sources):
+    """Refuse recordings in different directories that would claim the same letter"""
+    claimed = {}
+    for source in sources:
+        claimed.setdefault(alphabet_label(source), []).append(source)
+    clashes = {label: paths for label, paths in claimed.items() if len(paths) > 1}
+    if clashes:
+        details = '; '.join(f"'{label}': {', '.join(paths)}" for label, paths in sorted(clashes.items()))
+        raise ValueError(f"Several recordings for the same letter: {details}")
+
+
+def pitch_statistics(y, sr, fmin=75, fmax=300):
+    """pYIN statistics of one clip; the classifier computes its features with this too"""
+    import librosa
+
+    duration = librosa.get_duration(y=y, sr=sr)
+
+    f0, _, _ = librosa.pyin(y, fmin=fmin, fmax=fmax, sr=sr)
+    voiced = f0[~np.isnan(f0)]
+
+    if len(voiced) > 0:
+        avg, minp, maxp = np.mean(voiced), np.min(voiced), np.max(voiced)
+        median, std = np.median(voiced), np.std(voiced)
+    else:
+        avg = minp = maxp = median = std = 0
+
+    return {
+        "Avg_Pitch_Hz": float(avg),
+        "Min_Pitch": float(minp),
+        "Max_Pitch": float(maxp),
+        "Duration_s": float(duration),
+        "Median_Pitch": float(median),
+        "Std_Pitch": float(std),
+        "Voiced_Ratio": float(len(voiced) / max(len(f0), 1)),
+        "Frames": int(len(f0))
+    }
+
+
+def extract_row(path, sr=22050, fmin=75, fmax=300):
+    """pYIN statistics for one recording; runs in a worker process"""
+    import librosa
+
+    y, sr = librosa.load(path, sr=sr, mono=True)
+    return dict(Alphabet=alphabet_label(path), **pitch_statistics(y, sr, fmin, fmax))
+
+
+def manifest_path(out_csv):
+    return os.path.splitext(out_csv)[0] + '.manifest.json'
+
+
+def load_manifest(path, settings):
+    """Previous build's entries, or {} if missing or built with different settings"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('settings') != settings:
+        print("🔄 Extraction settings changed, rebuilding every recording")
+        return {}
+    return manifest.get('files', {})
+
+
+def build_dataset(data_dir='data', out_csv='hindi_pitch_dataset.csv', jobs=None, sr=22050,
+                  fmin=75, fmax=300, force=False):
+    """Extract new/changed recordings in parallel, reuse the rest, and write CSV (+ Parquet)"""
+    start_time = time.time()
+    settings = {'builder': BUILDER_VERSION, 'sr': sr, 'fmin': fmin, 'fmax': fmax}
+    previous = {} if force else load_manifest(manifest_path(out_csv), settings)
+
+    sources = find_recordings(data_dir)
+    check_unique_labels(sources)
+
+    entries, pending = {}, {}
+    for source in sources:
+        sha256 = file_sha256(os.path.join(data_dir, source))
+        cached = previous.get(source)
+        if cached is not None and cached['sha256'] == sha256:
+            entries[source] = cached
+        else:
+            pending[source] = sha256
+
+    print(f"🔍 {len(entries) + len(pending)} recordings: {len(pending)} to extract, {len(entries)} unchanged")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            futures = {
+                executor.submit(extract_row, os.path.join(data_dir, source), sr, fmin, fmax): source
+                for source in pending
+            }
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"⚠️ Skipping {source}: {e}")
+                    continue
+                entries[source] = {'sha256': pending[source], 'row': row}
+                print(f"✅ {source}: mean {row['Avg_Pitch_Hz']:.1f} Hz over {row['Duration_s']:.2f}s")
+
+    rows = [dict(entries[source]['row'], Source=source, Sha256=entries[source]['sha256'])
+            for source in sorted(entries)]
+    df = pd.DataFrame(rows, columns=PARQUET_COLUMNS)
+
+    df[CSV_COLUMNS].to_csv(out_csv, index=False)
+    if PARQUET_AVAILABLE:
+        df.to_parquet(os.path.splitext(out_csv)[0] + '.parquet', index=False)
+
+    manifest = {'settings': settings, 'files': entries}
+    tmp_path = manifest_path(out_csv) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path(out_csv))
+
+    print(f"📦 Wrote {len(df)} rows to {out_csv} in {time.time() - start_time:.1f}s")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reference pitch dataset CSV")
+    parser.add_argument('--data-dir', default='data', help="Directory scanned recursively for recordings")
+    parser.add_argument('--out', default='hindi_pitch_dataset.csv', help="Output CSV (Parquet and manifest go next to it)")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--sr', type=int, default=22050, help="Sample rate recordings are loaded at")
+    parser.add_argument('--fmin', type=float, default=75)
+    parser.add_argument('--fmax', type=float, default=300)
+    parser.add_argument('--force', action='store_true', help="Ignore the manifest and re-extract everything")
+    args = parser.parse_args()
+    build_dataset(args.data_dir, args.out, args.jobs, args.sr, args.fmin, args.fmax, args.force)
+
+
+if __name__ == "__main__":
+    main()
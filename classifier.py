@@ -0,0 +1,147 @@
+"""
+Letter classifier serving: export format, load-once loader and batched inference.
+
+A bundle is a single uncompressed joblib file holding the fitted sklearn
+Pipeline (feature selector, scaler, model), the feature columns it expects,
+the class labels and the pitch-extraction settings used to build the training
+CSV. Uncompressed, its numpy arrays (tree node tables, support vectors) are
+memory-mapped on load, so every worker on a host shares one copy of the pages.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Bump when the bundle layout changes; old bundles are then refused
+MODEL_BUNDLE_VERSION = 1
+
+DEFAULT_MODEL_PATH = os.path.join('models', 'letter_classifier.joblib')
+
+# Must match build_dataset's defaults for bundles trained on its CSV
+DEFAULT_FEATURE_SETTINGS = {'sr': 22050, 'fmin': 75, 'fmax': 300}
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+
+class ClassifierUnavailable(Exception):
+    """Raised when no usable model bundle exists at the configured path"""
+
+
+def export_model_bundle(path, pipeline, feature_columns, classes, feature_settings=None, metadata=None):
+    """Write a fitted sklearn Pipeline and what is needed to feed it to `path`"""
+    import joblib
+
+    bundle = {
+        'version': MODEL_BUNDLE_VERSION,
+        'pipeline': pipeline,
+        'feature_columns': list(feature_columns),
+        'classes': [str(label) for label in classes],
+        'feature_settings': dict(DEFAULT_FEATURE_SETTINGS, **(feature_settings or {})),
+        'metadata': dict(metadata or {}, exported_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    # No compression: compressed arrays cannot be memory-mapped
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model_bundle(path):
+    """Memory-mapped bundle, loaded once per process (again only if the file changes)"""
+    import joblib
+
+    try:
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    except OSError as e:
+        raise ClassifierUnavailable(f"No classifier model at {path}") from e
+
+    with _bundles_lock:
+        bundle = _bundles.get(key)
+        if bundle is None:
+            start = time.perf_counter()
+            bundle = joblib.load(path, mmap_mode='r')
+            if bundle.get('version') != MODEL_BUNDLE_VERSION:
+                raise ClassifierUnavailable(
+                    f"{path} has bundle version {bundle.get('version')}, expected {MODEL_BUNDLE_VERSION}")
+            _bundles.clear()
+            _bundles[key] = bundle
+            logger.info(f"🧠 Loaded letter classifier ({len(bundle['classes'])} classes) "
+                        f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return bundle
+
+
+class LetterClassifier:
+    """
+    Predicts which letter a clip sounds like.
+
+    features() runs on the caller's thread; predict() hands the feature row
+    to a micro-batcher so concurrent requests share one predict_proba call.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, max_batch_size=16, max_wait=0.005):
+        self.model_path = model_path
+        self._batcher = MicroBatcher(self.predict_batch, max_batch_size, max_wait, name='classifier-batcher')
+
+    @property
+    def available(self):
+        return os.path.exists(self.model_path)
+
+    @property
+    def bundle(self):
+        return load_model_bundle(self.model_path)
+
+    @property
+    def sample_rate(self):
+        return self.bundle['feature_settings']['sr']
+
+    @property
+    def batches(self):
+        return self._batcher.batches
+
+    @property
+    def mean_batch_size(self):
+        return self._batcher.items / self._batcher.batches if self._batcher.batches else 0.0
+
+    def load(self):
+        return self.bundle
+
+    def features(self, audio):
+        """Feature row for a clip at sample_rate, in the bundle's column order"""
+        from build_dataset import pitch_statistics
+
+        settings = self.bundle['feature_settings']
+        statistics = pitch_statistics(np.asarray(audio, dtype=np.float32), settings['sr'],
+                                      settings['fmin'], settings['fmax'])
+        return np.array([statistics[column] for column in self.bundle['feature_columns']], dtype=np.float64)
+
+    def predict(self, features, timeout=None):
+        """Prediction for one feature row, batched with rows from other threads"""
+        return self._batcher.run(features, timeout)
+
+    def predict_batch(self, rows):
+        """One predict_proba call for every row; returns a prediction dict per row"""
+        import pandas as pd
+
+        bundle = self.bundle
+        X = pd.DataFrame(np.vstack(rows), columns=bundle['feature_columns'])
+        probabilities = bundle['pipeline'].predict_proba(X)
+        classes = bundle['classes']
+
+        predictions = []
+        for row in probabilities:
+            best = int(np.argmax(row))
+            predictions.append({
+                'letter': classes[best],
+                'confidence': float(row[best]),
+                'probabilities': {label: float(p) for label, p in zip(classes, row)}
+            })
+        return predictions
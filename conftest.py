@@ -0,0 +1,34 @@
+"""
+Fixtures and helpers shared by the test modules.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SR = 16000
+
+
+def synthetic_vowel(seconds=2.0, f0=220.0, sr=SR):
+    """Harmonic tone with silent gaps and a little noise so the YIN fallback is exercised"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 0.75 * t) > -0.3).astype(float)
+    audio = tone * envelope + 0.01 * rng.standard_normal(len(t))
+    return (audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+@pytest.fixture()
+def dataset_csv(tmp_path):
+    """Small, well-separated build_dataset-style CSV with three letters"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for label, centre in (("A", 120.0), ("O", 180.0), ("e", 240.0)):
+        for _ in range(30):
+            pitch = centre + rng.normal(0, 10)
+            rows.append({"Alphabet": label, "Avg_Pitch_Hz": pitch, "Min_Pitch": pitch - 20 + rng.normal(0, 5),
+                         "Max_Pitch": pitch + 20 + rng.normal(0, 5), "Duration_s": rng.uniform(1, 3)})
+    path = tmp_path / "dataset.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
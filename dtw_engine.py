@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def sakoe_chiba_window(n, m, radius):
+    """Per-row [lo, hi) column bounds of a Sakoe-Chiba band around the scaled diagonal"""
+    rows = np.arange(n)
+    centre = rows * (m - 1) / max(n - 1, 1)
+    lo = np.clip(np.ceil(centre - radius), 0, m - 1).astype(np.int64)
+    hi = np.clip(np.floor(centre + radius), 0, m - 1).astype(np.int64) + 1
+    return _make_contiguous(lo, hi, m)
+
+
+def itakura_window(n, m, max_slope=2.0):
+    """Per-row [lo, hi) column bounds of an Itakura parallelogram"""
+    rows = np.arange(n, dtype=np.float64)
+    last_row, last_col = max(n - 1, 1), max(m - 1, 1)
+    x = rows / last_row
+    lower = np.maximum(x / max_slope, 1 - max_slope * (1 - x))
+    upper = np.minimum(x * max_slope, 1 - (1 - x) / max_slope)
+    lo = np.clip(np.ceil(lower * last_col - 1e-9), 0, m - 1).astype(np.int64)
+    hi = np.clip(np.floor(upper * last_col + 1e-9), 0, m - 1).astype(np.int64) + 1
+    return _make_contiguous(lo, hi, m)
+
+
+def _make_contiguous(lo, hi, m):
+    """Widen a window so it starts at (0, 0), ends at (n-1, m-1) and rows connect"""
+    lo = lo.copy()
+    hi = hi.copy()
+    lo[0] = 0
+    hi[-1] = m
+    hi = np.maximum.accumulate(np.maximum(hi, lo + 1))
+    lo = np.minimum.accumulate(lo[::-1])[::-1]
+    # Row i must start no later than row i - 1 ends, or no step can join them
+    lo[1:] = np.minimum(lo[1:], hi[:-1])
+    return lo, hi
+
+
+def _band_values(values, values_start, start, stop):
+    """Values of a banded row at columns [start, stop), inf where the row has no cells"""
+    out = np.full(stop - start, np.inf)
+    a = max(start, values_start)
+    b = min(stop, values_start + len(values))
+    if a < b:
+        out[a - start:b - start] = values[a - values_start:b - values_start]
+    return out
+
+
+def dtw_distance(x, y, window=None, radius=None, max_slope=2.0, cutoff=None):
+    """
+    Dynamic time warping distance with |x - y| as the local cost.
+
+    Same distance semantics as fastdtw(x, y, dist=lambda a, b: abs(a - b))
+    but exact, and evaluated one row at a time with NumPy.
+
+    window: None for the full matrix, 'sakoe_chiba' (needs radius, in frames)
+            or 'itakura' (parallelogram with the given max_slope).
+    cutoff: abandon as soon as every path is known to cost more than this;
+            the returned value is then a lower bound greater than cutoff.
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    n, m = len(x), len(y)
+    if n == 0 or m == 0:
+        raise ValueError("DTW needs two non-empty sequences")
+
+    if window is None:
+        lo = np.zeros(n, dtype=np.int64)
+        hi = np.full(n, m, dtype=np.int64)
+    elif window == 'sakoe_chiba':
+        if radius is None:
+            raise ValueError("A Sakoe-Chiba window needs a radius")
+        lo, hi = sakoe_chiba_window(n, m, radius)
+    elif window == 'itakura':
+        lo, hi = itakura_window(n, m, max_slope)
+    else:
+        raise ValueError(f"Unknown DTW window '{window}'")
+
+    # Only the band of the previous row is kept: previous covers columns [previous_start, ...)
+    previous, previous_start = None, 0
+    for i in range(n):
+        start, stop = lo[i], hi[i]
+        cost = np.abs(y[start:stop] - x[i])
+        running = np.cumsum(cost)
+
+        if previous is None:
+            row = running
+        else:
+            # Best predecessor from the row above: vertical (i-1, j) or diagonal (i-1, j-1)
+            above = np.minimum(_band_values(previous, previous_start, start, stop),
+                               _band_values(previous, previous_start, start - 1, stop - 1))
+            # Horizontal moves inside the row: D[j] = C[j] + min_{k<=j}(above[k] + cost[k] - C[k])
+            row = running + np.minimum.accumulate(above + cost - running)
+
+        # Every path crosses every row, so the row minimum bounds the final distance
+        if cutoff is not None:
+            row_min = row.min()
+            if row_min > cutoff:
+                return float(row_min)
+
+        previous, previous_start = row, start
+
+    return float(previous[m - 1 - previous_start])
@@ -0,0 +1,88 @@
+"""
+Import-time report for the serving path.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and lists
+the slowest imports, so regressions in worker boot time are easy to spot:
+    python import_report.py --top 20
+    python import_report.py --budget-ms 1500   # exit 1 if over budget
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Never needed to answer a request; loading any of them at startup is a regression
+FORBIDDEN_MODULES = ('matplotlib', 'sklearn', 'tensorflow', 'seaborn', 'torch', 'whisper')
+
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', 1500))
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure_imports(module='app', cwd=None):
+    """
+    Import `module` in a fresh interpreter; returns (wall_ms, imports) where
+    imports is a list of dicts with name, self_ms, cumulative_ms and depth.
+    """
+    env = dict(os.environ, ANALYZER_WARMUP='0', ANALYSIS_POOL_SIZE='0')
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd or os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            imports.append({
+                'name': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': len(match.group(3)) // 2
+            })
+    return wall_ms, imports
+
+
+def forbidden_imports(imports):
+    """Top-level packages from FORBIDDEN_MODULES that were loaded"""
+    loaded = {entry['name'].split('.')[0] for entry in imports}
+    return sorted(loaded.intersection(FORBIDDEN_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the serving path")
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=int, default=None,
+                        help=f"Fail when the import takes longer (test default {IMPORT_BUDGET_MS})")
+    args = parser.parse_args()
+
+    wall_ms, imports = measure_imports(args.module)
+    total = next((e['cumulative_ms'] for e in imports if e['name'] == args.module and e['depth'] == 0), None)
+
+    print(f"⏱️  import {args.module}: {total or 0:.0f} ms importing, {wall_ms:.0f} ms wall incl. interpreter start")
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    for entry in sorted(imports, key=lambda e: e['cumulative_ms'], reverse=True)[:args.top]:
+        print(f"{entry['cumulative_ms']:9.1f}ms {entry['self_ms']:7.1f}ms  {'  ' * entry['depth']}{entry['name']}")
+
+    failed = False
+    forbidden = forbidden_imports(imports)
+    if forbidden:
+        print(f"❌ Loaded at startup but not needed for serving: {', '.join(forbidden)}")
+        failed = True
+    if args.budget_ms is not None and wall_ms > args.budget_ms:
+        print(f"❌ Over budget: {wall_ms:.0f} ms > {args.budget_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
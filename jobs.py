@@ -0,0 +1,141 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    """Raised when the job runner already has its maximum number of pending jobs"""
+
+
+class Job:
+    __slots__ = ('job_id', 'status', 'payload', 'status_code', 'created_at', 'finished_at')
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.status = 'queued'
+        self.payload = None
+        self.status_code = None
+        self.created_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+
+class JobStore:
+    """
+    In-process job table with expiry.
+
+    Finished jobs are dropped `ttl` seconds after they finish; jobs that never
+    finish are dropped `ttl` seconds after `max_runtime`. wait() blocks until a
+    job finishes, which is what the long-poll endpoint uses.
+    """
+
+    def __init__(self, ttl=300, max_runtime=300):
+        self.ttl = ttl
+        self.max_runtime = max_runtime
+        self._jobs = {}
+        self._changed = threading.Condition()
+
+    def create(self):
+        job = Job(uuid.uuid4().hex)
+        with self._changed:
+            self._purge_expired()
+            self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id):
+        with self._changed:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def mark_running(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.status = 'running'
+
+    def finish(self, job_id, payload, status_code):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.payload = payload
+            job.status_code = status_code
+            job.status = 'done' if status_code < 400 else 'failed'
+            job.finished_at = time.monotonic()
+            self._changed.notify_all()
+
+    def wait(self, job_id, timeout):
+        """Block for up to `timeout` seconds until the job finishes; returns the job or None"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            job = self._jobs.get(job_id)
+            while job is not None and not job.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+                job = self._jobs.get(job_id)
+            return job
+
+    def __len__(self):
+        with self._changed:
+            return len(self._jobs)
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if (job.finished_at is not None and now - job.finished_at > self.ttl)
+            or now - job.created_at > self.max_runtime + self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class JobRunner:
+    """Bounded thread pool that runs jobs and records their (payload, status_code) result"""
+
+    def __init__(self, store, max_workers=2, max_pending=32):
+        self.store = store
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs), which must return (payload, status_code); returns the Job"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} analysis jobs already pending")
+            self._pending += 1
+
+        job = self.store.create()
+        try:
+            self._executor.submit(self._run, job.job_id, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            self.store.mark_running(job_id)
+            payload, status_code = fn(*args, **kwargs)
+        except Exception as e:
+            payload, status_code = {"success": False, "message": f"Server error: {str(e)}"}, 500
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self.store.finish(job_id, payload, status_code)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -1,28 +1,64 @@
 import librosa
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from fastdtw import fastdtw
-from scipy import signal, stats
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error
+import csv
 import os
 import warnings
 import json
+import hashlib
+from pitch_engines import get_pitch_engine
+from pitch_track import PitchTrack
+from metrics import StageTimer
+from vad import trim_silence
+from reference_store import ReferenceStore
+from dtw_engine import dtw_distance
 warnings.filterwarnings('ignore')
 
+# pandas, scipy.signal/stats and matplotlib are imported inside the methods that
+# use them so that importing the server stays fast; see import_report.py
+
+# Bump whenever a change to the analysis pipeline changes its output
+ANALYZER_VERSION = "5"
+
+PREEMPHASIS = 0.97
+
+# librosa res_type for uploads on the serving path; offline builds keep the default "soxr_hq"
+FAST_RESAMPLE_TYPE = "soxr_lq"
+
+# Length of the downsampled pitch contour returned with each result (kept for progress history)
+CONTOUR_POINTS = 64
+
 class EnhancedPitchAnalyzer:
-    def __init__(self, reference_csv_path="hindi_pitch_dataset.csv"):
+    def __init__(self, reference_csv_path="hindi_pitch_dataset.csv", pitch_engine="piptrack",
+                 reference_store_path="reference_store", dtw_window=None, dtw_radius=None,
+                 dtw_cutoff=None, vad=True, vad_padding=0.15, vad_threshold_db=-35.0,
+                 resample_type="soxr_hq"):
         """
         Enhanced pitch analyzer with multiple improvements:
         - Adaptive thresholds
         - Multiple similarity metrics
         - Noise filtering
         - Statistical analysis
+        - Selectable pitch engine (see pitch_engines.py)
+        - Real reference contours from a memory-mapped store (see reference_store.py)
+        - Banded, early-abandoning DTW (see dtw_engine.py)
+        - Silence trimming before the expensive stages (see vad.py)
         """
-        self.reference_table = pd.read_csv(reference_csv_path)
+        self.reference_csv_path = reference_csv_path
+        self.reference_store_path = reference_store_path
+        self._load_references()
         self.sr = 16000
         self.hop_length = 160 
+        self.pitch_engine = get_pitch_engine(pitch_engine)
+        self._pitch_engines = {pitch_engine: self.pitch_engine}
+        self.dtw_window = dtw_window
+        self.dtw_radius = dtw_radius
+        self.dtw_cutoff = dtw_cutoff
+        self.vad = vad
+        self.vad_padding = vad_padding
+        self.vad_threshold_db = vad_threshold_db
+        self.resample_type = resample_type
+        self._lowpass_sos = self._preprocess_sos = None
+        self.version = self._compute_version()
         
         # Hindi to English character mapping for dataset lookup
         self.hindi_to_english = {
@@ -41,104 +77,207 @@ class EnhancedPitchAnalyzer:
             'हहा': 'hahaa'
         } 
         
+    def _load_references(self):
+        """(Re)load the reference CSV and store, remembering the files' modification stamps"""
+        with open(self.reference_csv_path, 'rb') as f:
+            self._reference_csv_bytes = f.read()
+        rows = csv.DictReader(self._reference_csv_bytes.decode('utf-8-sig').splitlines())
+        # The CSV lists some letters more than once; the first row wins, as it did with pandas
+        self.reference_table = {}
+        for row in rows:
+            self.reference_table.setdefault(row['Alphabet'], row)
+        self.reference_store = ReferenceStore.open(self.reference_store_path) if self.reference_store_path else None
+        self._reference_cache = {}
+        self._reference_stamp = self._reference_files_stamp()
+    
+    def _reference_files_stamp(self):
+        paths = [self.reference_csv_path]
+        if self.reference_store_path:
+            paths.append(os.path.join(self.reference_store_path, 'index.json'))
+        stamp = []
+        for path in paths:
+            try:
+                info = os.stat(path)
+                stamp.append((path, info.st_mtime_ns, info.st_size))
+            except OSError:
+                stamp.append((path, None, None))
+        return tuple(stamp)
+    
+    def _compute_version(self):
+        """Identifies the analyzer build plus the reference data it scores against"""
+        digest = hashlib.sha256(ANALYZER_VERSION.encode('utf-8'))
+        digest.update(self.pitch_engine.name.encode('utf-8'))
+        digest.update(repr((self.dtw_window, self.dtw_radius, self.dtw_cutoff)).encode('utf-8'))
+        digest.update(repr((self.vad, self.vad_padding, self.vad_threshold_db)).encode('utf-8'))
+        digest.update(self.resample_type.encode('utf-8'))
+        digest.update(self._reference_csv_bytes)
+        if self.reference_store is not None:
+            digest.update(self.reference_store.version.encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    def refresh_references(self):
+        """Reload reference data if its files changed on disk; returns the current version"""
+        if self._reference_files_stamp() != self._reference_stamp:
+            print("🔄 Reference data changed on disk, reloading")
+            self._load_references()
+            self.version = self._compute_version()
+        return self.version
+    
     def load_and_preprocess_audio(self, audio_path):
         """Enhanced audio preprocessing with noise reduction"""
         try:
             
-            audio, _ = librosa.load(audio_path, sr=self.sr, mono=True)
-            
-           
-            audio = signal.lfilter([1, -0.97], [1], audio)
+            audio, _ = librosa.load(audio_path, sr=self.sr, mono=True, res_type=self.resample_type)
+            audio, _ = self.trim_silence(audio)
             
-          
-            audio = librosa.util.normalize(audio)
+            return self.preprocess_audio(audio)
+        except Exception as e:
+            print(f"❌ Error loading audio: {e}")
+            return None
+    
+    def trim_silence(self, audio, sr=None):
+        """Drop the silence around voiced regions; returns (audio, report with original/trimmed duration)"""
+        sr = sr or self.sr
+        if not self.vad:
+            duration = len(audio) / sr
+            return audio, {'original_duration': duration, 'trimmed_duration': duration, 'regions': None}
+        return trim_silence(audio, sr, padding=self.vad_padding, threshold_db=self.vad_threshold_db)
+    
+    def preprocess_audio(self, audio, sr=None):
+        """
+        Pre-emphasis, normalisation and low-pass filtering of an in-memory signal,
+        all in float32. Both filters run as one cascaded SOS pass; since they are
+        linear, normalising by the pre-emphasised peak afterwards gives the same
+        signal as normalising in between.
+        """
+        from scipy import signal
+        try:
+            audio = np.asarray(audio, dtype=np.float32)
+            if sr is not None and sr != self.sr:
+                audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sr, res_type=self.resample_type)
             
-           
-            nyquist = self.sr // 2
-            cutoff = min(4000, nyquist - 100) 
-            sos = signal.butter(5, cutoff / nyquist, btype='low', output='sos')
-            audio = signal.sosfilt(sos, audio)
+            peak = self.preemphasis_peak(audio)
+            audio = signal.sosfilt(self.preprocess_sos, audio)
+            if peak > np.finfo(np.float32).tiny:
+                audio /= peak
             
             return audio
         except Exception as e:
-            print(f"❌ Error loading audio: {e}")
+            print(f"❌ Error preprocessing audio: {e}")
             return None
     
-    def extract_pitch_features(self, audio):
+    @staticmethod
+    def preemphasis_peak(audio, previous=0.0):
+        """max |pre-emphasised audio| without materialising the filtered signal's history"""
+        if len(audio) == 0:
+            return 0.0
+        head = abs(float(audio[0]) - PREEMPHASIS * previous)
+        if len(audio) == 1:
+            return head
+        return max(head, float(np.max(np.abs(audio[1:] - PREEMPHASIS * audio[:-1]))))
+    
+    @property
+    def preprocess_sos(self):
+        """Pre-emphasis + low-pass cascade as float32 SOS, designed on first use"""
+        if self._preprocess_sos is None:
+            self._design_filters()
+        return self._preprocess_sos
+    
+    def _design_filters(self):
+        """Filter coefficients are designed once per analyzer, not per request"""
+        from scipy import signal
+        nyquist = self.sr // 2
+        cutoff = min(4000, nyquist - 100) 
+        self._lowpass_sos = signal.butter(5, cutoff / nyquist, btype='low', output='sos')
+        # Pre-emphasis (1 - 0.97 z^-1) as an extra first-order section ahead of the low-pass
+        preemphasis = np.array([[1.0, -PREEMPHASIS, 0.0, 1.0, 0.0, 0.0]])
+        self._preprocess_sos = np.vstack([preemphasis, self._lowpass_sos]).astype(np.float32)
+    
+    @property
+    def lowpass_sos(self):
+        """5th-order Butterworth low-pass used after pre-emphasis"""
+        if self._lowpass_sos is None:
+            self._design_filters()
+        return self._lowpass_sos
+    
+    def warm_up(self):
+        """Load the DSP imports and run one short clip through the pipeline so the first request is not slow"""
+        t = np.arange(self.sr) / self.sr
+        audio = self.preprocess_audio(np.sin(2 * np.pi * 220 * t).astype(np.float32))
+        self.extract_pitch_features(audio)
+    
+    def get_pitch_engine(self, name=None):
+        """Return the analyzer's default engine, or a cached instance of the named one"""
+        if name is None:
+            return self.pitch_engine
+        if name not in self._pitch_engines:
+            self._pitch_engines[name] = get_pitch_engine(name)
+        return self._pitch_engines[name]
+    
+    def extract_pitch_features(self, audio, pitch_engine=None, as_dataframe=False):
         """Enhanced pitch extraction using librosa instead of CREPE"""
         try:
-            # Use librosa's piptrack for pitch extraction
-            pitches, magnitudes = librosa.piptrack(y=audio, sr=self.sr, threshold=0.1, fmin=80, fmax=1000)
+            engine = self.get_pitch_engine(pitch_engine)
+            times, frequency, confidence = engine.track(audio, self.sr)
+            return self.filter_pitch_track(times, frequency, confidence, engine, as_dataframe)
             
-            # Extract the most prominent pitch at each time step
-            times = librosa.frames_to_time(np.arange(pitches.shape[1]), sr=self.sr, hop_length=512)
-            frequency = []
-            confidence = []
-            
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:, t].argmax()
-                pitch = pitches[index, t]
-                
-                if pitch > 0:
-                    frequency.append(pitch)
-                    confidence.append(magnitudes[index, t])
-                else:
-                    # Use harmonic analysis as fallback
-                    f0 = librosa.yin(audio, fmin=80, fmax=1000, sr=self.sr, frame_length=2048, hop_length=512)
-                    if t < len(f0) and f0[t] > 0:
-                        frequency.append(f0[t])
-                        confidence.append(0.8)  # Default confidence for YIN
-                    else:
-                        frequency.append(0)
-                        confidence.append(0)
-            
-            # Create DataFrame
-            df = pd.DataFrame({
-                "Time (s)": times[:len(frequency)],
-                "Pitch (Hz)": frequency,
-                "Confidence": confidence
-            })
-            
-            # Filter by confidence
-            conf_threshold = max(0.5, np.percentile(df["Confidence"], 50))  # Lowered for librosa
-            df = df[df["Confidence"] > conf_threshold]
+        except Exception as e:
+            print(f"❌ Error in pitch extraction: {e}")
+            return None, None
+    
+    def filter_pitch_track(self, times, frequency, confidence, engine=None, as_dataframe=False):
+        """
+        Confidence, outlier and smoothing filters over a raw per-frame pitch track.
+        Returns (PitchTrack, features), or a DataFrame in place of the track if as_dataframe.
+        """
+        from scipy import signal
+        try:
+            engine = engine or self.pitch_engine
+            # Masks are computed at the engine's precision so float32 rounding
+            # cannot move a frame across a threshold; only the kept track is float32
+            frequency = np.asarray(frequency, dtype=np.float64)
+            confidence = np.asarray(confidence, dtype=np.float64)
             
-            # Remove zero pitches
-            df = df[df["Pitch (Hz)"] > 0]
+            # Filter by confidence and remove zero pitches
+            keep = engine.confident_frames(confidence) & (frequency > 0)
             
             # Outlier removal
-            if not df.empty:
-                pitch_median = df["Pitch (Hz)"].median()
-                pitch_std = df["Pitch (Hz)"].std()
+            pitch = frequency[keep]
+            if len(pitch):
+                pitch_median = np.median(pitch)
+                pitch_std = np.std(pitch, ddof=1) if len(pitch) > 1 else np.nan
                 
                 min_pitch = max(80, pitch_median - 3 * pitch_std)
                 max_pitch = min(1000, pitch_median + 3 * pitch_std)
                 
-                df = df[(df["Pitch (Hz)"] >= min_pitch) & (df["Pitch (Hz)"] <= max_pitch)]
+                keep[keep] = (pitch >= min_pitch) & (pitch <= max_pitch)
             
-            if df.empty:
+            if not keep.any():
                 return None, None
             
             # IQR-based outlier removal
-            Q1 = df["Pitch (Hz)"].quantile(0.25)
-            Q3 = df["Pitch (Hz)"].quantile(0.75)
+            pitch = frequency[keep]
+            Q1, Q3 = np.percentile(pitch, [25, 75])
             IQR = Q3 - Q1
             lower_bound = Q1 - 1.5 * IQR
             upper_bound = Q3 + 1.5 * IQR
-            df = df[(df["Pitch (Hz)"] >= lower_bound) & (df["Pitch (Hz)"] <= upper_bound)]
+            keep[keep] = (pitch >= lower_bound) & (pitch <= upper_bound)
             
             # Apply median filter for smoothing
-            df["Pitch (Hz)"] = signal.medfilt(df["Pitch (Hz)"], kernel_size=5)
+            track = PitchTrack(times, frequency, confidence).compress(keep)
+            track.f0 = signal.medfilt(track.f0, kernel_size=5)
             
-            return df, self._extract_advanced_features(df)
+            features = self._extract_advanced_features(track)
+            return (track.to_dataframe() if as_dataframe else track), features
             
         except Exception as e:
-            print(f"❌ Error in pitch extraction: {e}")
+            print(f"❌ Error filtering pitch track: {e}")
             return None, None
     
-    def _extract_advanced_features(self, df):
+    def _extract_advanced_features(self, track):
         """Extract comprehensive pitch features"""
-        pitch_values = df["Pitch (Hz)"].values
+        from scipy import stats
+        pitch_values = track.f0.astype(np.float64)
         
         features = {
             'mean_pitch': float(np.mean(pitch_values)),
@@ -148,20 +287,21 @@ class EnhancedPitchAnalyzer:
             'pitch_variance': float(np.var(pitch_values)),
             'pitch_skewness': float(stats.skew(pitch_values)),
             'pitch_kurtosis': float(stats.kurtosis(pitch_values)),
-            'pitch_slope': float(self._calculate_pitch_slope(df)),
+            'pitch_slope': float(self._calculate_pitch_slope(pitch_values)),
             'jitter': float(self._calculate_jitter(pitch_values)),
             'shimmer': float(self._calculate_shimmer(pitch_values)),
-            'voiced_frames_ratio': float(len(df) / max(len(df), 1))
+            'voiced_frames_ratio': float(len(track) / max(len(track), 1))
         }
         
         return features
     
-    def _calculate_pitch_slope(self, df):
+    def _calculate_pitch_slope(self, pitch_values):
         """Calculate overall pitch trend"""
-        if len(df) < 2:
+        if len(pitch_values) < 2:
             return 0
-        x = np.arange(len(df))
-        slope, _, _, _, _ = stats.linregress(x, df["Pitch (Hz)"])
+        from scipy import stats
+        x = np.arange(len(pitch_values))
+        slope, _, _, _, _ = stats.linregress(x, pitch_values)
         return slope
     
     def _calculate_jitter(self, pitch_values):
@@ -179,15 +319,27 @@ class EnhancedPitchAnalyzer:
         pitch_diffs = np.abs(np.diff(pitch_values))
         return np.mean(pitch_diffs) / np.mean(pitch_values) * 100  # Percentage
     
-    def advanced_similarity_analysis(self, child_features, ref_features, child_pitch, ref_pitch_contour):
+    def advanced_similarity_analysis(self, child_features, ref_features, child_pitch, ref_pitch_contour,
+                                     timer=None):
         """Multiple similarity metrics for comprehensive analysis"""
+        timer = timer or StageTimer()
         similarities = {}
         
         # DTW analysis
-        dtw_distance, _ = fastdtw(child_pitch.tolist(), ref_pitch_contour.tolist(), 
-                                 dist=lambda x, y: abs(x - y))
-        similarities['dtw_distance'] = float(dtw_distance)
-        similarities['dtw_similarity'] = float(max(0, 100 - (dtw_distance / 10)))
+        with timer.stage('dtw'):
+            distance = dtw_distance(child_pitch, ref_pitch_contour, window=self.dtw_window,
+                                    radius=self.dtw_radius, cutoff=self.dtw_cutoff)
+        similarities['dtw_distance'] = float(distance)
+        similarities['dtw_similarity'] = float(max(0, 100 - (distance / 10)))
+        
+        with timer.stage('similarity'):
+            similarities.update(self._contour_similarities(child_features, ref_features, child_pitch,
+                                                           ref_pitch_contour))
+        return similarities
+    
+    def _contour_similarities(self, child_features, ref_features, child_pitch, ref_pitch_contour):
+        """Feature distance, correlation and RMSE between the child's and the reference contour"""
+        similarities = {}
         
         # Feature-based similarity
         feature_keys = ['mean_pitch', 'std_pitch', 'pitch_range', 'jitter', 'shimmer']
@@ -203,10 +355,10 @@ class EnhancedPitchAnalyzer:
         
         similarities['feature_similarity'] = float(max(0, 100 - np.mean(feature_distances) * 100))
         
-        # Correlation analysis
+        # Correlation and RMSE need contours of equal length
         if len(child_pitch) == len(ref_pitch_contour):
-            correlation = np.corrcoef(child_pitch, ref_pitch_contour)[0, 1]
-            similarities['correlation'] = float(correlation if not np.isnan(correlation) else 0)
+            child_resampled = child_pitch
+            ref_resampled = ref_pitch_contour
         else:
             # Resample to same length
             from scipy.interpolate import interp1d
@@ -217,12 +369,16 @@ class EnhancedPitchAnalyzer:
             
             child_resampled = child_interp(np.linspace(0, 1, target_length))
             ref_resampled = ref_interp(np.linspace(0, 1, target_length))
-            
+        
+        # Correlation analysis
+        if len(child_resampled) > 1:
             correlation = np.corrcoef(child_resampled, ref_resampled)[0, 1]
-            similarities['correlation'] = float(correlation if not np.isnan(correlation) else 0)
+        else:
+            correlation = np.nan
+        similarities['correlation'] = float(correlation if not np.isnan(correlation) else 0)
         
         # RMSE analysis
-        rmse = np.sqrt(mean_squared_error(child_pitch, ref_pitch_contour[:len(child_pitch)]))
+        rmse = np.sqrt(np.mean((child_resampled - ref_resampled) ** 2))
         similarities['rmse'] = float(rmse)
         similarities['rmse_similarity'] = float(max(0, 100 - rmse / 5))  # Scale RMSE to 0-100
         
@@ -287,46 +443,27 @@ class EnhancedPitchAnalyzer:
         
         return feedback
     
-    def analyze_pronunciation(self, target_alphabet, audio_path=None):
-        """Main analysis function with comprehensive evaluation"""
+    def analyze_pronunciation(self, target_alphabet, audio_path=None, pitch_engine=None):
+        """
+        Main analysis function with comprehensive evaluation.
+        The result's 'timings' maps each pipeline stage to the seconds it took.
+        """
         print(f"🎯 Analyzing pronunciation for: '{target_alphabet}'")
-        
+        timer = StageTimer()
+        result = self._analyze_file(target_alphabet, audio_path, pitch_engine, timer)
+        result['timings'] = timer.durations
+        return result
+    
+    def _analyze_file(self, target_alphabet, audio_path, pitch_engine, timer):
         try:
-            # Map Hindi character to English equivalent for dataset lookup
-            lookup_alphabet = self.hindi_to_english.get(target_alphabet, target_alphabet)
-            print(f"📋 Looking up reference data for: '{lookup_alphabet}'")
-            
-            # Find reference data
-            ref_row = self.reference_table[self.reference_table["Alphabet"] == lookup_alphabet]
-            if ref_row.empty:
-                print(f"❌ No reference data found for '{lookup_alphabet}' (original: '{target_alphabet}')")
-                return {
-                    'success': False,
-                    'error': f"No reference data found for '{target_alphabet}' (mapped to '{lookup_alphabet}')",
-                    'similarities': {},
-                    'feedback': {
-                        'overall': f"No reference data available for '{target_alphabet}'",
-                        'composite_score': 0,
-                        'level': 'Error'
-                    }
-                }
-            
-            ref_avg_pitch = ref_row["Avg_Pitch_Hz"].values[0]
-            ref_duration = ref_row["Duration_s"].values[0]
-            
-            # Create reference features
-            ref_features = {
-                'mean_pitch': float(ref_avg_pitch),
-                'std_pitch': float(ref_avg_pitch * 0.1),  
-                'pitch_range': float(ref_avg_pitch * 0.3),
-                'jitter': 1.0,  # Default jitter value
-                'shimmer': 2.0  # Default shimmer value
-            }
-            
-            print(f"📊 Reference: {ref_avg_pitch:.1f} Hz, Duration: {ref_duration:.2f}s")
+            with timer.stage('reference'):
+                reference = self._lookup_reference(target_alphabet)
+            if not reference['success']:
+                return reference
             
             # Validate audio path
             if not audio_path or not os.path.exists(audio_path):
+                lookup_alphabet = self.hindi_to_english.get(target_alphabet, target_alphabet)
                 # Try multiple fallback paths
                 fallback_paths = [
                     f"uploads/{target_alphabet}.wav",
@@ -344,82 +481,164 @@ class EnhancedPitchAnalyzer:
                 
                 if not audio_path:
                     print(f"❌ Audio file not found in any of: {fallback_paths}")
-                    return {
-                        'success': False,
-                        'error': f"Audio file not found for '{target_alphabet}'",
-                        'similarities': {},
-                        'feedback': {
-                            'overall': 'Audio file not found',
-                            'composite_score': 0,
-                            'level': 'Error'
-                        }
-                    }
+                    return self._failure(f"Audio file not found for '{target_alphabet}'",
+                                         'Audio file not found')
 
-            audio = self.load_and_preprocess_audio(audio_path)
+            with timer.stage('load'):
+                audio, _ = librosa.load(audio_path, sr=self.sr, mono=True, res_type=self.resample_type)
+            audio, vad_report = self._trim_and_preprocess(audio, None, timer)
             if audio is None:
                 print("❌ Failed to load audio")
-                return {
-                    'success': False,
-                    'error': 'Failed to load audio file',
-                    'similarities': {},
-                    'feedback': {
-                        'overall': 'Failed to process audio file',
-                        'composite_score': 0,
-                        'level': 'Error'
-                    }
-                }
+                return self._failure('Failed to load audio file', 'Failed to process audio file')
 
-            df, child_features = self.extract_pitch_features(audio)
-            if df is None or child_features is None:
-                print("❌ Could not extract reliable pitch features")
-                return {
-                    'success': False,
-                    'error': 'Could not extract pitch features from audio',
-                    'similarities': {},
-                    'feedback': {
-                        'overall': 'Could not analyze audio - please try speaking louder and clearer',
-                        'composite_score': 0,
-                        'level': 'Analysis Failed'
-                    }
-                }
-            
-            # Perform analysis
-            child_pitch = df["Pitch (Hz)"].values
-            ref_pitch_contour = np.full_like(child_pitch, ref_avg_pitch)
-            
-            similarities = self.advanced_similarity_analysis(
-                child_features, ref_features, child_pitch, ref_pitch_contour
-            )
+            return dict(self._analyze_preprocessed(audio, reference, pitch_engine, timer), vad=vad_report)
             
-            feedback = self.get_comprehensive_feedback(similarities, child_features, ref_features)
+        except Exception as e:
+            print(f"❌ Error during analysis: {str(e)}")
+            return self._failure(str(e), f'Analysis failed: {str(e)}')
+    
+    def _trim_and_preprocess(self, audio, sr, timer):
+        """VAD trim, then preprocess; returns (audio or None, VAD report)"""
+        with timer.stage('vad'):
+            audio, vad_report = self.trim_silence(audio, sr)
+        if vad_report['trimmed_duration'] < vad_report['original_duration']:
+            print(f"✂️ Trimmed silence: {vad_report['original_duration']:.2f}s -> {vad_report['trimmed_duration']:.2f}s")
+        with timer.stage('preprocess'):
+            audio = self.preprocess_audio(audio, sr)
+        return audio, vad_report
+    
+    def analyze_pronunciation_audio(self, target_alphabet, audio, sr=None, pitch_engine=None):
+        """Same evaluation as analyze_pronunciation, for a decoded in-memory signal"""
+        print(f"🎯 Analyzing pronunciation for: '{target_alphabet}'")
+        timer = StageTimer()
+        result = self._analyze_audio(target_alphabet, audio, sr, pitch_engine, timer)
+        result['timings'] = timer.durations
+        return result
+    
+    def _analyze_audio(self, target_alphabet, audio, sr, pitch_engine, timer):
+        try:
+            with timer.stage('reference'):
+                reference = self._lookup_reference(target_alphabet)
+            if not reference['success']:
+                return reference
             
-            # Display results for debugging (optional)
-            if os.getenv('DEBUG', 'false').lower() == 'true':
-                self._display_results(similarities, feedback, child_features, ref_features)
+            audio, vad_report = self._trim_and_preprocess(audio, sr, timer)
+            if audio is None:
+                print("❌ Failed to preprocess audio")
+                return self._failure('Failed to process audio data', 'Failed to process audio file')
             
-            # Return JSON-compatible result
-            return {
-                'success': True,
-                'similarities': similarities,
-                'feedback': feedback,
-                'features': child_features,
-                'reference_features': ref_features,
-                'audio_duration': float(df["Time (s)"].max()),
-                'pitch_points': len(df)
-            }
+            return dict(self._analyze_preprocessed(audio, reference, pitch_engine, timer), vad=vad_report)
             
         except Exception as e:
             print(f"❌ Error during analysis: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'similarities': {},
-                'feedback': {
-                    'overall': f'Analysis failed: {str(e)}',
-                    'composite_score': 0,
-                    'level': 'Error'
-                }
+            return self._failure(str(e), f'Analysis failed: {str(e)}')
+    
+    def _failure(self, error, overall, level='Error'):
+        """Result dict for an analysis that could not be completed"""
+        return {
+            'success': False,
+            'error': error,
+            'similarities': {},
+            'feedback': {
+                'overall': overall,
+                'composite_score': 0,
+                'level': level
+            }
+        }
+    
+    def _lookup_reference(self, target_alphabet):
+        """Reference pitch and features for a target letter, cached per letter"""
+        # Map Hindi character to English equivalent for dataset lookup
+        lookup_alphabet = self.hindi_to_english.get(target_alphabet, target_alphabet)
+        print(f"📋 Looking up reference data for: '{lookup_alphabet}'")
+        
+        if lookup_alphabet in self._reference_cache:
+            return self._reference_cache[lookup_alphabet]
+        
+        # Find reference data
+        ref_row = self.reference_table.get(lookup_alphabet)
+        if ref_row is None:
+            print(f"❌ No reference data found for '{lookup_alphabet}' (original: '{target_alphabet}')")
+            return self._failure(
+                f"No reference data found for '{target_alphabet}' (mapped to '{lookup_alphabet}')",
+                f"No reference data available for '{target_alphabet}'"
+            )
+        
+        ref_avg_pitch = float(ref_row["Avg_Pitch_Hz"])
+        ref_duration = float(ref_row["Duration_s"])
+        
+        if self.reference_store is not None and lookup_alphabet in self.reference_store:
+            # Contour and features measured from the reference recording itself
+            ref_features = self.reference_store.features(lookup_alphabet)
+            ref_contour = self.reference_store.contour(lookup_alphabet)
+            print(f"📊 Reference: {ref_features['mean_pitch']:.1f} Hz, {len(ref_contour)} pitch points")
+        else:
+            # Fall back to a flat contour built from the CSV average
+            ref_features = {
+                'mean_pitch': float(ref_avg_pitch),
+                'std_pitch': float(ref_avg_pitch * 0.1),  
+                'pitch_range': float(ref_avg_pitch * 0.3),
+                'jitter': 1.0,  # Default jitter value
+                'shimmer': 2.0  # Default shimmer value
             }
+            ref_contour = None
+            print(f"📊 Reference: {ref_avg_pitch:.1f} Hz, Duration: {ref_duration:.2f}s")
+        
+        reference = {
+            'success': True,
+            'avg_pitch': ref_avg_pitch,
+            'features': ref_features,
+            'contour': ref_contour
+        }
+        self._reference_cache[lookup_alphabet] = reference
+        return reference
+    
+    def _analyze_preprocessed(self, audio, reference, pitch_engine=None, timer=None):
+        """Pitch extraction, similarity scoring and feedback for a preprocessed signal"""
+        timer = timer or StageTimer()
+        with timer.stage('pitch_tracking'):
+            track, child_features = self.extract_pitch_features(audio, pitch_engine)
+        if track is None or child_features is None:
+            print("❌ Could not extract reliable pitch features")
+            return self._failure('Could not extract pitch features from audio',
+                                 'Could not analyze audio - please try speaking louder and clearer',
+                                 level='Analysis Failed')
+        
+        return self.score_pitch(track, child_features, reference, timer)
+    
+    def score_pitch(self, track, child_features, reference, timer=None):
+        """Similarity metrics and feedback for a filtered pitch track against a reference"""
+        timer = timer or StageTimer()
+        ref_features = reference['features']
+        
+        # Perform analysis
+        child_pitch = track.f0
+        ref_pitch_contour = reference['contour']
+        if ref_pitch_contour is None:
+            ref_pitch_contour = np.full_like(child_pitch, reference['avg_pitch'])
+        
+        similarities = self.advanced_similarity_analysis(
+            child_features, ref_features, child_pitch, ref_pitch_contour, timer
+        )
+        
+        with timer.stage('feedback'):
+            feedback = self.get_comprehensive_feedback(similarities, child_features, ref_features)
+        
+        # Display results for debugging (optional)
+        if os.getenv('DEBUG', 'false').lower() == 'true':
+            self._display_results(similarities, feedback, child_features, ref_features)
+        
+        # Return JSON-compatible result
+        return {
+            'success': True,
+            'similarities': similarities,
+            'feedback': feedback,
+            'features': child_features,
+            'reference_features': ref_features,
+            'audio_duration': track.duration,
+            'pitch_points': len(track),
+            'contour': track.downsampled(CONTOUR_POINTS).tolist()
+        }
     
     def _display_results(self, similarities, feedback, child_features, ref_features):
         """Display comprehensive analysis results"""
@@ -448,6 +667,9 @@ class EnhancedPitchAnalyzer:
     
     def _plot_enhanced_analysis(self, df, ref_avg_pitch, target_alphabet, similarities):
         """Create enhanced visualization with multiple subplots"""
+        import matplotlib.pyplot as plt
+        if isinstance(df, PitchTrack):
+            df = df.to_dataframe()
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
         
         time_series = df["Time (s)"]
@@ -506,11 +728,11 @@ class EnhancedPitchAnalyzer:
         plt.show()
 
 
-    def analyze_pronunciation_json(self, target_alphabet, audio_path=None):
+    def analyze_pronunciation_json(self, target_alphabet, audio_path=None, pitch_engine=None):
         """
         Wrapper method that returns JSON string for easy integration
         """
-        result = self.analyze_pronunciation(target_alphabet, audio_path)
+        result = self.analyze_pronunciation(target_alphabet, audio_path, pitch_engine)
         return json.dumps(result, indent=2, ensure_ascii=False)
 
 def main():
@@ -0,0 +1,200 @@
+import librosa
+import numpy as np
+
+# All engines share the same framing so their contours line up frame-for-frame
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+PITCH_ENGINES = {}
+
+
+def register_pitch_engine(cls):
+    """Class decorator that makes an engine selectable by its name"""
+    PITCH_ENGINES[cls.name] = cls
+    return cls
+
+
+def get_pitch_engine(name, **kwargs):
+    """Instantiate a registered pitch engine by name"""
+    if name not in PITCH_ENGINES:
+        raise ValueError(f"Unknown pitch engine '{name}'. Available: {', '.join(sorted(PITCH_ENGINES))}")
+    return PITCH_ENGINES[name](**kwargs)
+
+
+def available_pitch_engines():
+    """Name and cost profile of every registered engine"""
+    return {name: cls.cost_profile for name, cls in sorted(PITCH_ENGINES.items())}
+
+
+class PitchEngine:
+    """
+    Base class for pitch trackers.
+
+    track() returns (times, frequency, confidence) as float64 arrays with one
+    entry per frame. Unvoiced frames have frequency 0 and confidence 0.
+    """
+    name = None
+    cost_profile = {}
+    confidence_floor = 0.5
+
+    def __init__(self, fmin=80, fmax=1000):
+        self.fmin = fmin
+        self.fmax = fmax
+
+    def track(self, audio, sr):
+        raise NotImplementedError
+
+    def confident_frames(self, confidence):
+        """Mask of frames whose confidence is above both the floor and the clip median"""
+        if len(confidence) == 0:
+            return np.zeros(0, dtype=bool)
+        return confidence > max(self.confidence_floor, np.percentile(confidence, 50))
+
+    def _frame_times(self, n_frames, sr):
+        return librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=HOP_LENGTH)
+
+
+@register_pitch_engine
+class PiptrackEngine(PitchEngine):
+    """Spectral peak picking with a single YIN pass for frames piptrack leaves empty"""
+    name = 'piptrack'
+    cost_profile = {
+        'relative_cost': 1.0,
+        'accuracy': 'medium',
+        'description': 'STFT peak picking plus one YIN pass as fallback'
+    }
+
+    def track(self, audio, sr):
+        pitches, magnitudes = librosa.piptrack(y=audio, sr=sr, threshold=0.1, fmin=self.fmin, fmax=self.fmax,
+                                               n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH)
+        n_frames = pitches.shape[1]
+        frames = np.arange(n_frames)
+
+        # Most prominent pitch at each time step
+        index = magnitudes.argmax(axis=0)
+        frequency = pitches[index, frames].astype(np.float64)
+        confidence = magnitudes[index, frames].astype(np.float64)
+
+        # Harmonic analysis as fallback, computed once for the whole clip
+        unvoiced = frequency <= 0
+        if unvoiced.any():
+            f0 = librosa.yin(audio, fmin=self.fmin, fmax=self.fmax, sr=sr,
+                             frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)
+            f0_aligned = np.zeros(n_frames)
+            n_common = min(n_frames, len(f0))
+            f0_aligned[:n_common] = f0[:n_common]
+
+            fallback = unvoiced & (f0_aligned > 0)
+            frequency[unvoiced] = 0
+            confidence[unvoiced] = 0
+            frequency[fallback] = f0_aligned[fallback]
+            confidence[fallback] = 0.8  # Default confidence for YIN
+
+        return self._frame_times(n_frames, sr), frequency, confidence
+
+
+@register_pitch_engine
+class YinEngine(PitchEngine):
+    """Plain YIN; every frame with a positive estimate gets the default YIN confidence"""
+    name = 'yin'
+    cost_profile = {
+        'relative_cost': 0.6,
+        'accuracy': 'medium',
+        'description': 'Time-domain YIN, no voicing decision'
+    }
+
+    def track(self, audio, sr):
+        f0 = librosa.yin(audio, fmin=self.fmin, fmax=self.fmax, sr=sr,
+                         frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH).astype(np.float64)
+        voiced = f0 > 0
+        frequency = np.where(voiced, f0, 0.0)
+        confidence = np.where(voiced, 0.8, 0.0)
+        return self._frame_times(len(f0), sr), frequency, confidence
+
+    def confident_frames(self, confidence):
+        # YIN gives no per-frame confidence, so keep every voiced frame
+        return confidence > 0
+
+
+@register_pitch_engine
+class PyinEngine(PitchEngine):
+    """Probabilistic YIN, the algorithm the reference dataset was built with"""
+    name = 'pyin'
+    cost_profile = {
+        'relative_cost': 25.0,
+        'accuracy': 'high',
+        'description': 'Probabilistic YIN with HMM voicing (slow)'
+    }
+
+    def __init__(self, fmin=75, fmax=300):
+        super().__init__(fmin=fmin, fmax=fmax)
+
+    def track(self, audio, sr):
+        f0, voiced_flag, voiced_prob = librosa.pyin(audio, fmin=self.fmin, fmax=self.fmax, sr=sr,
+                                                    frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)
+        voiced = voiced_flag & ~np.isnan(f0)
+        frequency = np.where(voiced, f0, 0.0)
+        confidence = np.where(voiced, voiced_prob, 0.0)
+        return self._frame_times(len(f0), sr), frequency, confidence
+
+    def confident_frames(self, confidence):
+        # Voicing probabilities saturate on clean input, so ties at the median are kept
+        voiced = confidence > 0
+        if not voiced.any():
+            return voiced
+        return voiced & (confidence >= np.percentile(confidence[voiced], 50))
+
+
+@register_pitch_engine
+class AutocorrelationEngine(PitchEngine):
+    """FFT autocorrelation over all frames at once, using NumPy only"""
+    name = 'autocorr'
+    cost_profile = {
+        'relative_cost': 0.3,
+        'accuracy': 'low',
+        'description': 'Normalised autocorrelation peak, NumPy only'
+    }
+
+    def __init__(self, fmin=80, fmax=1000, voicing_threshold=0.3):
+        super().__init__(fmin=fmin, fmax=fmax)
+        self.voicing_threshold = voicing_threshold
+        self.confidence_floor = voicing_threshold
+
+    def track(self, audio, sr):
+        audio = np.asarray(audio, dtype=np.float64)
+        # Centre frames the same way librosa does so frame indices agree across engines
+        padded = np.pad(audio, FRAME_LENGTH // 2, mode='constant')
+        n_frames = 1 + (len(padded) - FRAME_LENGTH) // HOP_LENGTH
+        frames = np.lib.stride_tricks.sliding_window_view(padded, FRAME_LENGTH)[::HOP_LENGTH][:n_frames]
+        frames = (frames - frames.mean(axis=1, keepdims=True)) * np.hanning(FRAME_LENGTH)
+
+        spectrum = np.fft.rfft(frames, n=2 * FRAME_LENGTH, axis=1)
+        acf = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :FRAME_LENGTH]
+
+        min_lag = max(1, int(sr / self.fmax))
+        max_lag = min(FRAME_LENGTH - 2, int(sr / self.fmin))
+        energy = acf[:, 0]
+        rows = np.arange(n_frames)
+
+        # Ignore the lobe around lag 0: only search past the first zero crossing
+        first_negative = np.argmax(acf < 0, axis=1)
+        candidate_lags = np.arange(min_lag, max_lag + 1)
+        search = np.where(candidate_lags[None, :] >= first_negative[:, None],
+                          acf[:, min_lag:max_lag + 1], -np.inf)
+        lags = min_lag + np.argmax(search, axis=1)
+        peak = acf[rows, lags]
+
+        # Parabolic interpolation around the peak for sub-sample lag resolution
+        left = acf[rows, lags - 1]
+        right = acf[rows, lags + 1]
+        denom = left - 2 * peak + right
+        shift = np.where(denom != 0, 0.5 * (left - right) / np.where(denom != 0, denom, 1), 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(energy > 0, peak / energy, 0.0)
+        confidence = np.clip(confidence, 0.0, 1.0)
+        voiced = confidence >= self.voicing_threshold
+
+        frequency = np.where(voiced, sr / (lags + shift), 0.0)
+        confidence = np.where(voiced, confidence, 0.0)
+        return self._frame_times(n_frames, sr), frequency, confidence
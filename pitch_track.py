@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class PitchTrack:
+    """
+    Per-frame pitch track as three contiguous float32 arrays.
+
+    This is what the analysis pipeline passes around; filtering is done with
+    boolean masks and a single compress() instead of a chain of DataFrame
+    copies. Use to_dataframe() where a pandas table is actually wanted.
+    """
+
+    __slots__ = ('times', 'f0', 'confidence')
+
+    COLUMNS = ("Time (s)", "Pitch (Hz)", "Confidence")
+
+    def __init__(self, times, f0, confidence):
+        self.times = np.ascontiguousarray(times, dtype=np.float32)
+        self.f0 = np.ascontiguousarray(f0, dtype=np.float32)
+        self.confidence = np.ascontiguousarray(confidence, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.f0)
+
+    @property
+    def duration(self):
+        """Time of the last frame, in seconds"""
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def compress(self, mask):
+        """New track holding only the frames where mask is True"""
+        return PitchTrack(self.times[mask], self.f0[mask], self.confidence[mask])
+
+    def downsampled(self, points):
+        """f0 linearly resampled to `points` values spread evenly over the frames"""
+        if len(self.f0) == 0:
+            return np.zeros(0, dtype=np.float32)
+        positions = np.linspace(0, len(self.f0) - 1, points)
+        return np.interp(positions, np.arange(len(self.f0)), self.f0).astype(np.float32)
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(dict(zip(self.COLUMNS, (self.times, self.f0, self.confidence))))
@@ -0,0 +1,135 @@
+"""
+Per-child progress in SQLite: every scored attempt plus per-letter aggregates.
+
+The database runs in WAL mode so dashboard reads never wait for the writer.
+Each thread of each worker process keeps its own connection. Recording an
+attempt inserts the row and updates that letter's aggregates (attempt count,
+best, last and exponential moving average score) in one transaction, so
+progress reads are primary-key lookups that never scan history.
+"""
+
+import sqlite3
+import threading
+import time
+
+# Weight of the newest score in the moving average
+EMA_ALPHA = 0.3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    child_id TEXT NOT NULL,
+    letter TEXT NOT NULL,
+    score REAL NOT NULL,
+    level TEXT NOT NULL DEFAULT '',
+    attempt_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_child_letter_time ON attempts (child_id, letter, created_at);
+
+CREATE TABLE IF NOT EXISTS letter_progress (
+    child_id TEXT NOT NULL,
+    letter TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    best_score REAL NOT NULL,
+    last_score REAL NOT NULL,
+    ema_score REAL NOT NULL,
+    first_at REAL NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (child_id, letter)
+) WITHOUT ROWID;
+"""
+
+# The moving average starts at the first score and then moves EMA_ALPHA of the way to each new one
+_UPSERT_PROGRESS = """
+INSERT INTO letter_progress (child_id, letter, attempts, best_score, last_score, ema_score, first_at, last_at)
+VALUES (:child_id, :letter, 1, :score, :score, :score, :created_at, :created_at)
+ON CONFLICT (child_id, letter) DO UPDATE SET
+    attempts = attempts + 1,
+    best_score = max(best_score, excluded.best_score),
+    last_score = excluded.last_score,
+    ema_score = :alpha * excluded.last_score + (1 - :alpha) * ema_score,
+    last_at = excluded.last_at
+"""
+
+_PROGRESS_COLUMNS = "letter, attempts, best_score, last_score, ema_score, first_at, last_at"
+
+
+class ProgressDB:
+    """Thread-safe handle to the progress database; one SQLite connection per thread"""
+
+    def __init__(self, path, ema_alpha=EMA_ALPHA, busy_timeout=5.0):
+        self.path = path
+        self.ema_alpha = ema_alpha
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self):
+        """This thread's connection, opened and configured on first use (the file is created lazily too)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL only syncs at checkpoints; a crash can lose the last commits, never corrupt
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                # Servers that start a thread per request would otherwise leak one connection each
+                stale = [c for thread, c in self._connections if not thread.is_alive()]
+                self._connections = [(thread, c) for thread, c in self._connections if thread.is_alive()]
+                self._connections.append((threading.current_thread(), conn))
+                for old in stale:
+                    old.close()
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def record(self, child_id, letter, score, level='', attempt_id=None, timestamp=None):
+        """Insert one attempt and update the letter's aggregates atomically"""
+        params = {
+            'child_id': child_id,
+            'letter': letter,
+            'score': float(score),
+            'level': level or '',
+            'attempt_id': attempt_id,
+            'created_at': time.time() if timestamp is None else timestamp,
+            'alpha': self.ema_alpha
+        }
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO attempts (child_id, letter, score, level, attempt_id, created_at) "
+                "VALUES (:child_id, :letter, :score, :level, :attempt_id, :created_at)", params)
+            conn.execute(_UPSERT_PROGRESS, params)
+
+    def child_progress(self, child_id):
+        """Aggregates for every letter the child has attempted"""
+        rows = self.connection().execute(
+            f"SELECT {_PROGRESS_COLUMNS} FROM letter_progress WHERE child_id = ? ORDER BY letter", (child_id,))
+        return [dict(row) for row in rows]
+
+    def letter_progress(self, child_id, letter):
+        """Aggregates for one letter, or None if it was never attempted"""
+        row = self.connection().execute(
+            f"SELECT {_PROGRESS_COLUMNS} FROM letter_progress WHERE child_id = ? AND letter = ?",
+            (child_id, letter)).fetchone()
+        return dict(row) if row else None
+
+    def recent_attempts(self, child_id, letter, limit=20):
+        """Newest attempts for one letter first; served from the (child, letter, time) index"""
+        rows = self.connection().execute(
+            "SELECT score, level, attempt_id, created_at FROM attempts "
+            "WHERE child_id = ? AND letter = ? ORDER BY created_at DESC LIMIT ?", (child_id, letter, limit))
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
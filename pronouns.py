@@ -1,79 +1,86 @@
-'''import whisper
-import re
-from Levenshtein import distance
+"""
+Pronunciation check from the command line: transcribe and compare with the expected text.
 
-model = whisper.load_model("medium")
+    python pronouns.py                          # record from the microphone, repeat until 'q'
+    python pronouns.py --expected aa a.wav b.wav
 
-audio_path = "../data/audio/wav/Aaa.wav"
-expected_text = "aa"
+The recognizer is loaded once per run; files given on the command line are
+transcribed together in one batch.
+"""
 
-def normalize(text):
-    return re.sub(r'[^a-z]', '', text.strip().lower())
-
-result = model.transcribe(audio_path)
-predicted_text = normalize(result["text"])
-
-expected_text = normalize(expected_text)
-print(f"\n🔊 Transcribed Text: {predicted_text}")
-print(f"🎯 Expected Text:    {expected_text}")
-
-tolerance_threshold = 1
-
-if distance(predicted_text, expected_text) <= tolerance_threshold:
-    print("✅ Pronunciation is correct or close enough.")
-else:
-    print("❌ Pronunciation mismatch.")'''
+import argparse
+import os
 
+import numpy as np
 
+from recognizer import SAMPLE_RATE, RecognizerService, get_recognizer_backend
 
-import whisper
-import re
-import sounddevice as sd
-import scipy.io.wavfile as wav
-import os
-from Levenshtein import distance
+DURATION = 3
 
-SAMPLE_RATE = 16000  
-DURATION = 3     
 
-def normalize(text):
-    return re.sub(r'[^a-z]', '', text.strip().lower())
+def record_audio(duration=DURATION):
+    """Record `duration` seconds of mono float32 audio from the default microphone"""
+    import sounddevice as sd
 
-def record_audio(file_path):
-    print(f"\n🎙️ Recording for {DURATION} seconds...")
-    audio = sd.rec(int(SAMPLE_RATE * DURATION), samplerate=SAMPLE_RATE, channels=1, dtype='int16')
+    print(f"\n🎙️ Recording for {duration} seconds...")
+    audio = sd.rec(int(SAMPLE_RATE * duration), samplerate=SAMPLE_RATE, channels=1, dtype='float32')
     sd.wait()
-    wav.write(file_path, SAMPLE_RATE, audio)
-    print(f"✅ Audio saved to {file_path}")
+    return audio[:, 0]
 
-def main():
-    expected_text = input("\nEnter the expected pronunciation word (default = 'aa'): ").strip().lower() or "aa"
 
-    output_path = "user_input.wav"
+def load_clip(path):
+    import librosa
 
-    record_audio(output_path)
+    audio, _ = librosa.load(path, sr=SAMPLE_RATE, mono=True)
+    return audio.astype(np.float32)
 
-    print("🧠 Loading Whisper model...")
-    model = whisper.load_model("medium")
 
-    print("🔍 Transcribing...")
-    result = model.transcribe(output_path)
-    predicted_text = normalize(result["text"])
-    expected_text = normalize(expected_text)
-
-    # Output transcription
-    print(f"\n🗣️  Transcribed Text: {predicted_text}")
-    print(f"🎯 Expected Text:    {expected_text}")
-
-    tolerance_threshold = 1
-    if distance(predicted_text, expected_text) <= tolerance_threshold:
+def print_result(result, label=None):
+    if label:
+        print(f"\n📁 {label}")
+    print(f"\n🗣️  Transcribed Text: {result['transcript']}")
+    print(f"🎯 Expected Text:    {result['expected']}")
+    if result['correct']:
         print("✅ Pronunciation is correct or close enough.")
     else:
         print("❌ Pronunciation mismatch.")
 
-    if os.path.exists(output_path):
-        os.remove(output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check pronunciation against expected text with Whisper")
+    parser.add_argument('files', nargs='*', help="Recordings to check (default: record from the microphone)")
+    parser.add_argument('--expected', default=None, help="Expected pronunciation (default: prompt, or 'aa')")
+    parser.add_argument('--tolerance', type=int, default=1, help="Allowed edit distance")
+    parser.add_argument('--backend', default=os.environ.get('RECOGNIZER_BACKEND', 'whisper'))
+    parser.add_argument('--model', default=os.environ.get('RECOGNIZER_MODEL', 'medium'))
+    args = parser.parse_args()
+
+    service = RecognizerService(get_recognizer_backend(args.backend, model_name=args.model))
+    print("🧠 Loading recognizer model...")
+    service.load()
+
+    if args.files:
+        expected = args.expected or "aa"
+        print(f"🔍 Transcribing {len(args.files)} file(s)...")
+        results = service.check_batch([load_clip(path) for path in args.files], [expected] * len(args.files),
+                                      args.tolerance)
+        for path, result in zip(args.files, results):
+            print_result(result, path)
+        return
+
+    while True:
+        expected = args.expected or input("\nEnter the expected pronunciation word (default = 'aa', q to quit): ")
+        expected = expected.strip().lower() or "aa"
+        if expected == 'q':
+            break
+
+        audio = record_audio()
+        print("🔍 Transcribing...")
+        print_result(service.check_batch([audio], [expected], args.tolerance)[0])
+
+        if args.expected and input("\nPress Enter to try again, q to quit: ").strip().lower() == 'q':
+            break
+
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,186 @@
+"""
+Speech recognition service for the pronunciation (transcript) check.
+
+The model is loaded once per process, on first use, and concurrent requests
+are coalesced into batches so several clips share one forward pass. Backends
+are pluggable through RECOGNIZER_BACKENDS; the default is Whisper, and tests
+register a small local stand-in instead.
+"""
+
+import logging
+import re
+import threading
+import time
+
+import numpy as np
+
+from batching import MicroBatcher
+
+try:
+    from Levenshtein import distance as _levenshtein_distance
+    LEVENSHTEIN_AVAILABLE = True
+except ImportError:
+    LEVENSHTEIN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Whisper's front end expects 16 kHz mono
+SAMPLE_RATE = 16000
+
+RECOGNIZER_BACKENDS = {}
+
+
+class RecognizerUnavailable(Exception):
+    """Raised when the configured backend cannot be loaded (e.g. whisper not installed)"""
+
+
+def register_recognizer_backend(cls):
+    """Class decorator that makes a backend selectable by its name"""
+    RECOGNIZER_BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_recognizer_backend(name, **kwargs):
+    """Instantiate a registered recognizer backend by name"""
+    if name not in RECOGNIZER_BACKENDS:
+        raise ValueError(f"Unknown recognizer backend '{name}'. Available: {', '.join(sorted(RECOGNIZER_BACKENDS))}")
+    return RECOGNIZER_BACKENDS[name](**kwargs)
+
+
+def normalize(text):
+    """Lower-case latin letters only, so punctuation and spacing never count as errors"""
+    return re.sub(r'[^a-z]', '', text.strip().lower())
+
+
+def levenshtein(a, b):
+    """Edit distance; uses python-Levenshtein when installed"""
+    if LEVENSHTEIN_AVAILABLE:
+        return _levenshtein_distance(a, b)
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class RecognizerBackend:
+    """
+    Base class for speech recognizers.
+
+    load() does the expensive set-up and is called once; transcribe_batch()
+    takes a list of float32 clips at SAMPLE_RATE and returns one string each.
+    """
+    name = None
+
+    def load(self):
+        pass
+
+    def transcribe_batch(self, clips):
+        raise NotImplementedError
+
+
+@register_recognizer_backend
+class WhisperBackend(RecognizerBackend):
+    """OpenAI Whisper; every clip in a batch is decoded in a single forward pass"""
+    name = 'whisper'
+
+    def __init__(self, model_name='medium', device=None, language=None):
+        self.model_name = model_name
+        self.device = device
+        self.language = language
+        self.model = None
+
+    def load(self):
+        try:
+            import whisper
+        except ImportError as e:
+            raise RecognizerUnavailable("whisper is not installed. Install with: pip install openai-whisper") from e
+        self.model = whisper.load_model(self.model_name, device=self.device)
+
+    def transcribe_batch(self, clips):
+        import torch
+        import whisper
+
+        # Every clip is padded/trimmed to Whisper's 30 s window, so the mels stack into one tensor
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(np.asarray(clip, dtype=np.float32))),
+                                        n_mels=self.model.dims.n_mels)
+            for clip in clips
+        ]).to(self.model.device)
+        options = whisper.DecodingOptions(language=self.language, without_timestamps=True,
+                                          fp16=self.model.device.type == 'cuda')
+        return [result.text for result in whisper.decode(self.model, mels, options)]
+
+
+class RecognizerService:
+    """
+    One loaded backend shared by the whole process.
+
+    transcribe() queues a clip for the batching thread, which waits up to
+    `max_wait` seconds for more clips and runs up to `max_batch_size` of them
+    together. transcribe_batch() runs a list of clips directly. A queued
+    clip waits at most `timeout` seconds (None waits forever) before
+    transcribe() raises TimeoutError.
+    """
+
+    def __init__(self, backend, max_batch_size=8, max_wait=0.02, timeout=None):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._batcher = MicroBatcher(self.transcribe_batch, max_batch_size, max_wait, name='recognizer-batcher')
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def load(self):
+        """Load the backend's model once; later calls return immediately"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self.backend.load()
+                self._loaded = True
+                logger.info(f"🧠 Loaded {self.backend.name} recognizer in {time.perf_counter() - start:.1f}s")
+
+    def transcribe_batch(self, clips):
+        """Transcripts for `clips`, in order, at most max_batch_size per forward pass"""
+        self.load()
+        transcripts = []
+        for start in range(0, len(clips), self.max_batch_size):
+            transcripts.extend(self.backend.transcribe_batch(clips[start:start + self.max_batch_size]))
+            self.batches += 1
+        return transcripts
+
+    def transcribe(self, audio, timeout=None):
+        """Transcript of one clip, batched with any clips queued by other threads"""
+        return self._batcher.run(audio, self.timeout if timeout is None else timeout)
+
+    def check(self, audio, expected, tolerance=1, timeout=None):
+        """Transcribe `audio` and compare it with the expected text"""
+        return self.score(self.transcribe(audio, timeout), expected, tolerance)
+
+    def check_batch(self, clips, expected, tolerance=1):
+        transcripts = self.transcribe_batch(clips)
+        return [self.score(transcript, text, tolerance) for transcript, text in zip(transcripts, expected)]
+
+    @staticmethod
+    def score(transcript, expected, tolerance=1):
+        predicted, expected = normalize(transcript), normalize(expected)
+        edits = levenshtein(predicted, expected)
+        return {
+            'transcript': predicted,
+            'expected': expected,
+            'distance': edits,
+            'tolerance': tolerance,
+            'correct': edits <= tolerance
+        }
@@ -0,0 +1,84 @@
+"""
+Reference clips for the Listen button, held in memory.
+
+Optional smaller variants are pre-transcoded offline:
+    python reference_audio.py --data-dir data --out data/variants --bitrate 24k
+A format with no transcoded copy is answered with 406 by /audio/<letter>,
+never with the clip in another format.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+
+# format name -> (file extension, MIME type)
+AUDIO_FORMATS = {
+    'mpeg': ('.mpeg', 'audio/mpeg'),
+    'opus': ('.opus', 'audio/ogg; codecs=opus'),
+}
+
+
+class ReferenceClip:
+    __slots__ = ('data', 'mimetype', 'etag')
+
+    def __init__(self, data, mimetype):
+        self.data = data
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+
+
+class ReferenceAudioLibrary:
+    """Every reference clip and its pre-transcoded variants, loaded once at startup"""
+
+    def __init__(self, data_dir='data', variants_dir=None):
+        self.data_dir = data_dir
+        self.variants_dir = variants_dir or os.path.join(data_dir, 'variants')
+        self._clips = {}
+
+        for audio_format, (extension, mimetype) in AUDIO_FORMATS.items():
+            directory = self.data_dir if audio_format == 'mpeg' else self.variants_dir
+            for path in glob.glob(os.path.join(directory, f"*{extension}")):
+                name = os.path.splitext(os.path.basename(path))[0]
+                with open(path, 'rb') as f:
+                    self._clips.setdefault(name, {})[audio_format] = ReferenceClip(f.read(), mimetype)
+
+    def __contains__(self, name):
+        return name in self._clips
+
+    def __len__(self):
+        return len(self._clips)
+
+    def formats(self, name):
+        return sorted(self._clips.get(name, {}))
+
+    def get(self, name, audio_format='mpeg'):
+        """The clip in the requested format, or None if that letter/format is not available"""
+        return self._clips.get(name, {}).get(audio_format)
+
+
+def transcode_variants(data_dir='data', out_dir=None, bitrate='24k'):
+    """Write a low-bitrate Opus copy of every reference clip (needs ffmpeg with libopus)"""
+    from pydub import AudioSegment
+
+    out_dir = out_dir or os.path.join(data_dir, 'variants')
+    os.makedirs(out_dir, exist_ok=True)
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.mpeg'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(out_dir, f"{name}.opus")
+        segment = AudioSegment.from_file(path).set_channels(1)
+        segment.export(target, format='opus', codec='libopus', bitrate=bitrate)
+        print(f"✅ {name}: {os.path.getsize(path)} -> {os.path.getsize(target)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-transcode reference clips to low-bitrate Opus")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--out', default=None, help="Defaults to <data-dir>/variants")
+    parser.add_argument('--bitrate', default='24k')
+    args = parser.parse_args()
+    transcode_variants(args.data_dir, args.out, args.bitrate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Precomputed reference pitch contours and features.
+
+Build once from the reference recordings:
+    python reference_store.py --data-dir data --out reference_store
+
+The store is a directory holding
+    contours.npy  - every reference contour concatenated (float32)
+    features.npy  - one row of FEATURE_KEYS per reference (float64)
+    index.json    - names, contour offsets and build metadata
+and is memory-mapped read-only, so all gunicorn workers share one copy
+through the page cache.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+FEATURE_KEYS = [
+    'mean_pitch', 'median_pitch', 'std_pitch', 'pitch_range', 'pitch_variance',
+    'pitch_skewness', 'pitch_kurtosis', 'pitch_slope', 'jitter', 'shimmer',
+    'voiced_frames_ratio'
+]
+
+CONTOURS_FILE = 'contours.npy'
+FEATURES_FILE = 'features.npy'
+INDEX_FILE = 'index.json'
+
+
+class ReferenceStore:
+    """Read-only, memory-mapped view of a built reference store"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+
+        self.path = path
+        self.names = index['names']
+        self.offsets = np.asarray(index['offsets'], dtype=np.int64)
+        self.feature_keys = index['feature_keys']
+        self.pitch_engine = index.get('pitch_engine')
+        self.version = index['version']
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+        self._contours = np.load(os.path.join(path, CONTOURS_FILE), mmap_mode='r')
+        self._features = np.load(os.path.join(path, FEATURES_FILE), mmap_mode='r')
+
+    @classmethod
+    def open(cls, path):
+        """Load a store if one has been built at `path`, otherwise return None"""
+        if not os.path.exists(os.path.join(path, INDEX_FILE)):
+            return None
+        return cls(path)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __len__(self):
+        return len(self.names)
+
+    def contour(self, name):
+        """Reference pitch contour; a read-only view into the mapped file"""
+        i = self._positions[name]
+        return self._contours[self.offsets[i]:self.offsets[i + 1]]
+
+    def features(self, name):
+        """Reference feature dict in the same shape _extract_advanced_features returns"""
+        row = self._features[self._positions[name]]
+        return {key: float(value) for key, value in zip(self.feature_keys, row)}
+
+
+def build_reference_store(data_dir='data', out_dir='reference_store', analyzer=None,
+                          pattern='*.mpeg'):
+    """Extract contours and features for every reference recording and write the store"""
+    if analyzer is None:
+        from pitch import EnhancedPitchAnalyzer
+        analyzer = EnhancedPitchAnalyzer(reference_store_path=None)
+
+    names, contours, feature_rows, sources = [], [], [], {}
+
+    for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        audio = analyzer.load_and_preprocess_audio(path)
+        if audio is None:
+            print(f"⚠️ Skipping {path}: could not load audio")
+            continue
+
+        track, features = analyzer.extract_pitch_features(audio)
+        if track is None:
+            print(f"⚠️ Skipping {path}: no reliable pitch")
+            continue
+
+        names.append(name)
+        contours.append(track.f0.copy())
+        feature_rows.append([features[key] for key in FEATURE_KEYS])
+        with open(path, 'rb') as f:
+            sources[name] = hashlib.sha256(f.read()).hexdigest()
+        print(f"✅ {name}: {len(contours[-1])} pitch points, mean {features['mean_pitch']:.1f} Hz")
+
+    offsets = np.zeros(len(contours) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(c) for c in contours])
+    all_contours = np.concatenate(contours) if contours else np.zeros(0, dtype=np.float32)
+    all_features = np.asarray(feature_rows, dtype=np.float64).reshape(len(feature_rows), len(FEATURE_KEYS))
+
+    digest = hashlib.sha256()
+    digest.update(all_contours.tobytes())
+    digest.update(all_features.tobytes())
+    digest.update(json.dumps(names).encode('utf-8'))
+
+    index = {
+        'names': names,
+        'offsets': offsets.tolist(),
+        'feature_keys': FEATURE_KEYS,
+        'pitch_engine': analyzer.pitch_engine.name,
+        'sources': sources,
+        'version': digest.hexdigest()[:16]
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, CONTOURS_FILE), all_contours)
+    np.save(os.path.join(out_dir, FEATURES_FILE), all_features)
+    with open(os.path.join(out_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+
+    print(f"📦 Wrote {len(names)} references to {out_dir} (version {index['version']})")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reference pitch-contour store")
+    parser.add_argument('--data-dir', default='data', help="Directory with reference recordings")
+    parser.add_argument('--out', default='reference_store', help="Output store directory")
+    parser.add_argument('--pattern', default='*.mpeg', help="Glob for reference files")
+    parser.add_argument('--pitch-engine', default='piptrack', help="Pitch engine used for extraction")
+    args = parser.parse_args()
+
+    from pitch import EnhancedPitchAnalyzer
+    analyzer = EnhancedPitchAnalyzer(reference_store_path=None, pitch_engine=args.pitch_engine)
+    build_reference_store(args.data_dir, args.out, analyzer, args.pattern)
+
+
+if __name__ == "__main__":
+    main()
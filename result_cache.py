@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(audio_bytes, target, version, pitch_engine=None):
+    """Content address for one analysis: audio bytes, target letter, engine and analyzer version"""
+    digest = hashlib.sha256()
+    digest.update(audio_bytes)
+    for part in (target, pitch_engine or '', version):
+        digest.update(b'\0')
+        digest.update(str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of finished analysis payloads with a TTL.
+
+    With `disk_dir` set, entries are also written there as JSON so they
+    survive restarts. `version` names the analyzer/reference build the
+    entries belong to; changing it drops everything cached for the old one.
+    """
+
+    def __init__(self, max_entries=512, ttl=3600, disk_dir=None, version=''):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(self._disk_version_dir(), exist_ok=True)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, entry)
+            return entry[1]
+
+    def put(self, key, payload):
+        entry = (time.time(), payload)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def set_version(self, version):
+        """Switch to a new analyzer/reference version, discarding entries for the old one"""
+        with self._lock:
+            if version == self.version:
+                return
+            old_dir = self._disk_version_dir() if self.disk_dir else None
+            self.version = version
+            self._entries.clear()
+        if old_dir:
+            # Best effort: other threads or workers may still be writing to, or removing, the same files
+            shutil.rmtree(old_dir, ignore_errors=True)
+        if self.disk_dir:
+            os.makedirs(self._disk_version_dir(), exist_ok=True)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'disk': bool(self.disk_dir),
+                'version': self.version
+            }
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_version_dir(self):
+        return os.path.join(self.disk_dir, self.version or 'default')
+
+    def _disk_path(self, key):
+        return os.path.join(self._disk_version_dir(), f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - stored['created_at'] > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return stored['created_at'], stored['payload']
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        # Write then rename so concurrent workers never read a half-written file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'created_at': entry[0], 'payload': entry[1]}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
@@ -0,0 +1,223 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from pitch_engines import FRAME_LENGTH, HOP_LENGTH
+
+
+class StreamingPreprocessor:
+    """
+    Chunk-by-chunk version of EnhancedPitchAnalyzer.preprocess_audio.
+
+    The fused pre-emphasis + low-pass cascade carries its state across chunks,
+    so the concatenated output equals one pass over the whole signal.
+    Normalisation needs the pre-emphasised peak of the full clip; since the
+    filters are linear it is applied afterwards, using the running peak.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.sos = analyzer.preprocess_sos
+        self._zi = np.zeros((self.sos.shape[0], 2), dtype=self.sos.dtype)
+        self._previous = 0.0
+        self.peak = 0.0
+
+    def process(self, chunk):
+        """Filter one chunk; returns the un-normalised output"""
+        from scipy import signal
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if len(chunk):
+            self.peak = max(self.peak, self.analyzer.preemphasis_peak(chunk, self._previous))
+            self._previous = float(chunk[-1])
+        filtered, self._zi = signal.sosfilt(self.sos, chunk, zi=self._zi)
+        return filtered
+
+
+# Bytes per sample for each accepted raw PCM format
+PCM_SAMPLE_WIDTHS = {'s16le': 2, 'f32le': 4}
+
+
+def pcm_sample_width(sample_format):
+    if sample_format not in PCM_SAMPLE_WIDTHS:
+        raise ValueError(f"Unsupported PCM format '{sample_format}' (use s16le or f32le)")
+    return PCM_SAMPLE_WIDTHS[sample_format]
+
+
+def decode_pcm(data, sample_format='s16le'):
+    """Raw little-endian PCM bytes, a whole number of samples, to float32 samples in [-1, 1]"""
+    if len(data) % pcm_sample_width(sample_format):
+        raise ValueError(f"{len(data)} bytes is not a whole number of {sample_format} samples")
+    if sample_format == 's16le':
+        return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    return np.frombuffer(data, dtype='<f4').astype(np.float32)
+
+
+class StreamSession:
+    """
+    One child's in-progress recording: raw PCM, filtered signal and partial pitch track.
+
+    The running score filters and scores the whole track so far, so it is
+    recomputed only once every `score_every` seconds of new audio; the
+    updates in between repeat the last score.
+    """
+
+    def __init__(self, analyzer, target, pitch_engine=None, max_seconds=60, score_every=0.5):
+        self.session_id = uuid.uuid4().hex
+        self.analyzer = analyzer
+        self.target = target
+        self.pitch_engine = pitch_engine
+        self.max_samples = int(max_seconds * analyzer.sr)
+        self.score_every_frames = max(1, int(score_every * analyzer.sr / HOP_LENGTH))
+        self.touched_at = time.monotonic()
+        self.lock = threading.Lock()
+
+        self._preprocessor = StreamingPreprocessor(analyzer)
+        self._raw = []
+        self._n_samples = 0
+        # Filtered samples not yet consumed by every frame, starting at sample _tail_start
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._tail_start = 0
+        self._frames_done = 0
+        self._times, self._frequency, self._confidence = [], [], []
+        # Bytes of a sample split across two PCM chunks, put in front of the next one
+        self._partial = b''
+        self._score = None
+        self._scored_frames = 0
+
+    @property
+    def n_samples(self):
+        return self._n_samples
+
+    def add_pcm(self, data, sample_format='s16le'):
+        """
+        Append raw PCM bytes. A chunk may end partway through a sample; the
+        leftover bytes are kept and completed by the next chunk.
+        """
+        data = self._partial + data
+        usable = len(data) - len(data) % pcm_sample_width(sample_format)
+        update = self.add_chunk(decode_pcm(data[:usable], sample_format))
+        self._partial = data[usable:]
+        return update
+
+    def add_chunk(self, chunk):
+        """
+        Append float32 samples at the analyzer rate; returns the frames that
+        became complete with this chunk plus the latest running score.
+        """
+        if self.n_samples + len(chunk) > self.max_samples:
+            raise ValueError(f"Stream longer than {self.max_samples / self.analyzer.sr:.0f}s")
+
+        self.touched_at = time.monotonic()
+        self._raw.append(np.asarray(chunk, dtype=np.float32))
+        self._tail = np.concatenate([self._tail, self._preprocessor.process(chunk)])
+        self._n_samples += len(chunk)
+
+        times, frequency, confidence = self._track_new_frames()
+        self._times.append(times)
+        self._frequency.append(frequency)
+        self._confidence.append(confidence)
+
+        return {
+            'frames': [
+                {'time': float(t), 'pitch': float(f), 'confidence': float(c)}
+                for t, f, c in zip(times, frequency, confidence)
+            ],
+            'duration': self.n_samples / self.analyzer.sr,
+            **self._running_score()
+        }
+
+    def audio(self):
+        """Every raw sample received so far"""
+        return np.concatenate(self._raw) if self._raw else np.zeros(0, dtype=np.float32)
+
+    def finish(self):
+        """Full analysis of everything received, identical to analyzing the whole clip at once"""
+        return self.analyzer.analyze_pronunciation_audio(self.target, self.audio(), pitch_engine=self.pitch_engine)
+
+    def _track_new_frames(self):
+        """Pitch for every centred frame whose full window is now available"""
+        half = FRAME_LENGTH // 2
+        last_frame = (self.n_samples - half) // HOP_LENGTH
+        first_frame = self._frames_done
+        if last_frame < first_frame or self._preprocessor.peak == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+
+        # Window starting a whole number of hops before the first new frame's centre
+        start = max(0, first_frame * HOP_LENGTH - half)
+        stop = last_frame * HOP_LENGTH + half
+        window = self._tail[start - self._tail_start:stop - self._tail_start] / self._preprocessor.peak
+
+        engine = self.analyzer.get_pitch_engine(self.pitch_engine)
+        times, frequency, confidence = engine.track(window, self.analyzer.sr)
+        offset = (first_frame * HOP_LENGTH - start) // HOP_LENGTH
+        count = last_frame - first_frame + 1
+
+        self._frames_done = last_frame + 1
+        # Drop samples that no future frame window can reach
+        keep_from = max(0, self._frames_done * HOP_LENGTH - half)
+        self._tail = self._tail[keep_from - self._tail_start:]
+        self._tail_start = keep_from
+
+        frame_times = np.arange(first_frame, last_frame + 1) * HOP_LENGTH / self.analyzer.sr
+        return frame_times, frequency[offset:offset + count], confidence[offset:offset + count]
+
+    def _running_score(self):
+        if self._score is None or self._frames_done - self._scored_frames >= self.score_every_frames:
+            self._score = self._score_track()
+            self._scored_frames = self._frames_done
+        return self._score
+
+    def _score_track(self):
+        if not self._frames_done:
+            return {'pitch_points': 0, 'running_score': None, 'level': None}
+
+        reference = self.analyzer._lookup_reference(self.target)
+        track, features = self.analyzer.filter_pitch_track(
+            np.concatenate(self._times), np.concatenate(self._frequency), np.concatenate(self._confidence),
+            self.analyzer.get_pitch_engine(self.pitch_engine)
+        )
+        if not reference['success'] or track is None:
+            return {'pitch_points': 0, 'running_score': None, 'level': None}
+
+        result = self.analyzer.score_pitch(track, features, reference)
+        return {
+            'pitch_points': result['pitch_points'],
+            'running_score': result['feedback']['composite_score'],
+            'level': result['feedback']['level']
+        }
+
+
+class StreamSessionStore:
+    """Open stream sessions, dropped after `idle_timeout` seconds without a chunk"""
+
+    def __init__(self, idle_timeout=60):
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._purge_idle()
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._purge_idle()
+            return self._sessions.get(session_id)
+
+    def pop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _purge_idle(self):
+        now = time.monotonic()
+        idle = [sid for sid, s in self._sessions.items() if now - s.touched_at > self.idle_timeout]
+        for sid in idle:
+            del self._sessions[sid]
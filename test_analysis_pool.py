@@ -0,0 +1,50 @@
+"""
+Tests for the warm analysis process pool.
+Usage: python -m pytest -q test_analysis_pool.py
+"""
+
+import os
+import signal
+import time
+
+import pytest
+
+from analysis_pool import AnalysisPool, _ping
+from pitch import EnhancedPitchAnalyzer
+from conftest import synthetic_vowel
+
+ANALYZER_KWARGS = {'reference_csv_path': 'hindi_pitch_dataset.csv'}
+
+
+@pytest.fixture()
+def pool():
+    pool = AnalysisPool(1, analyzer_kwargs=ANALYZER_KWARGS)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_matches_in_process_analysis(pool):
+    audio = synthetic_vowel(f0=220.0)
+    expected = EnhancedPitchAnalyzer(**ANALYZER_KWARGS).analyze_pronunciation_audio("अ", audio)
+
+    assert pool.submit("अ", audio).result(timeout=120)["feedback"] == expected["feedback"]
+    assert pool.analyze("अ", audio)["similarities"] == expected["similarities"]
+
+
+def test_pool_recovers_from_a_dead_worker(pool):
+    pool.start()
+    os.kill(pool._executor.submit(_ping).result(timeout=60), signal.SIGKILL)
+    time.sleep(0.5)
+
+    result = pool.analyze("अ", synthetic_vowel(f0=220.0), timeout=120)
+    assert result["success"]
+
+
+def test_workers_are_recycled_after_max_jobs():
+    pool = AnalysisPool(1, max_jobs_per_worker=2, analyzer_kwargs=ANALYZER_KWARGS)
+    try:
+        pool.start()
+        pids = {pool._executor.submit(_ping).result(timeout=120) for _ in range(5)}
+        assert len(pids) > 1
+    finally:
+        pool.shutdown()
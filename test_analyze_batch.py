@@ -0,0 +1,82 @@
+"""
+Tests for /analyze_batch: request validation and per-clip failure isolation.
+Usage: python -m pytest -q test_analyze_batch.py
+"""
+
+import io
+
+import pytest
+import soundfile as sf
+
+from conftest import synthetic_vowel
+
+
+def _wav_bytes():
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(seconds=1.5, f0=220.0), 16000, format='WAV')
+    return buffer.getvalue()
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "attempt_store", None)
+    monkeypatch.setattr(app, "progress_db", None)
+    return app.app.test_client()
+
+
+def _post(client, clips, targets):
+    return client.post('/analyze_batch', data={
+        "audio": [(io.BytesIO(data), f'clip{i}.wav') for i, data in enumerate(clips)],
+        "target": targets
+    }, content_type='multipart/form-data')
+
+
+def test_batch_needs_one_target_per_clip_and_respects_the_size_cap(client, monkeypatch):
+    import app
+    audio = _wav_bytes()
+
+    assert _post(client, [audio, audio], ["अ"]).status_code == 400
+    assert _post(client, [], []).status_code == 400
+
+    monkeypatch.setattr(app, "BATCH_MAX_ITEMS", 2)
+    too_many = _post(client, [audio] * 3, ["अ"] * 3)
+    assert too_many.status_code == 400
+    assert "maximum 2" in too_many.get_json()["message"]
+
+
+def test_one_bad_clip_does_not_fail_the_batch(client, monkeypatch):
+    import app
+    analyze_upload = app._analyze_upload
+
+    def exploding_for_o(audio_bytes, target, *args, **kwargs):
+        if target == "ओ":
+            raise RuntimeError("worker crashed")
+        return analyze_upload(audio_bytes, target, *args, **kwargs)
+    monkeypatch.setattr(app, "_analyze_upload", exploding_for_o)
+
+    audio = _wav_bytes()
+    response = _post(client, [audio, b"GIF89a" + bytes(100), audio], ["अ", "आ", "ओ"])
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body["count"] == 3 and body["succeeded"] == 1
+    assert [item["status"] for item in body["results"]] == [200, 415, 500]
+    assert [item["index"] for item in body["results"]] == [0, 1, 2]
+    assert body["results"][0]["success"] and "score" in body["results"][0]
+    assert "worker crashed" in body["results"][2]["message"]
+
+
+def test_batch_items_are_validated_like_single_uploads(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 10 ** 6)
+    audio = _wav_bytes()
+
+    response = _post(client, [b"", audio, bytes(10 ** 6 + 1)], ["अ", "आ", "ओ"])
+    statuses = [item["status"] for item in response.get_json()["results"]]
+    assert statuses == [400, 200, 413]
+
+    single = client.post('/analyze_pronunciation', content_type='multipart/form-data',
+                         data={"audio": (io.BytesIO(b""), "a.wav"), "target": "अ"})
+    assert single.status_code == 400
+    assert response.get_json()["results"][0]["message"] == single.get_json()["message"]
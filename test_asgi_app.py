@@ -0,0 +1,97 @@
+"""
+Tests for the ASGI variant of the API: same routes and payloads as app.py, work off the event loop.
+Usage: python -m pytest -q test_asgi_app.py
+"""
+
+import io
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+
+def _wav_bytes(seconds=1.2, sr=16000, f0=200.0):
+    t = np.arange(int(seconds * sr)) / sr
+    buffer = io.BytesIO()
+    sf.write(buffer, 0.3 * np.sin(2 * np.pi * f0 * t) * (1 + 0.1 * np.sin(2 * np.pi * 3 * t)), sr, format='WAV')
+    return buffer.getvalue()
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    import app
+    import asgi_app
+    monkeypatch.setattr(app, "attempt_store", None)
+    monkeypatch.setattr(app, "progress_db", None)
+    monkeypatch.setattr(app.result_cache, "get", lambda key: None)
+    with TestClient(asgi_app.app) as test_client:
+        yield test_client
+
+
+def test_analysis_matches_flask_and_runs_on_the_executor(client, monkeypatch):
+    import app
+
+    threads = []
+    analyze_upload = app._analyze_upload
+
+    def recording(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return analyze_upload(*args, **kwargs)
+    monkeypatch.setattr(app, "_analyze_upload", recording)
+
+    audio = _wav_bytes()
+    response = client.post('/analyze_pronunciation', files={"audio": ("a.wav", audio)}, data={"target": "अ"})
+    assert response.status_code == 200
+    assert threads and threads[0].startswith('asgi-analysis')
+
+    expected = app.app.test_client().post('/analyze_pronunciation', content_type='multipart/form-data',
+                                          data={"audio": (io.BytesIO(audio), "a.wav"), "target": "अ"})
+    assert response.json()["score"] == pytest.approx(expected.get_json()["score"])
+
+
+def test_batch_and_flask_fallback_routes(client):
+    audio = _wav_bytes()
+    response = client.post('/analyze_batch', files=[("audio", ("a.wav", audio)), ("audio", ("b.wav", audio))],
+                           data={"target": ["अ", "आ"]})
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 2
+    assert [item["target"] for item in response.json()["results"]] == ["अ", "आ"]
+
+    # Read-only routes are served by the Flask app unchanged
+    assert client.get('/').json()["status"] == "healthy"
+    assert client.get('/cache/stats').status_code == 200
+    assert 'endpoint="analyze_batch"' in client.get('/metrics').text
+
+
+def test_app_can_be_started_again_after_shutdown(monkeypatch):
+    import app
+    import asgi_app
+    monkeypatch.setattr(app, "attempt_store", None)
+    monkeypatch.setattr(app, "progress_db", None)
+    for f0 in (200.0, 210.0):
+        with TestClient(asgi_app.app) as test_client:
+            response = test_client.post('/analyze_pronunciation', files={"audio": ("a.wav", _wav_bytes(f0=f0))},
+                                        data={"target": "अ"})
+            assert response.status_code == 200
+
+
+def test_uploads_are_refused_early(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 1000)
+
+    too_big = client.post('/analyze_pronunciation', files={"audio": ("a.wav", _wav_bytes())}, data={"target": "अ"})
+    assert too_big.status_code == 413
+
+    assert client.post('/classify', json={"audio": "nope"}).status_code == 415
+    assert client.post('/analyze_pronunciation', files={"audio": ("a.wav", b"GIF89a" + bytes(100))},
+                       data={"target": "अ"}).status_code == 415
+    assert client.post('/check_pronunciation', data={"expected": "aa"}).status_code == 400
+    assert client.post('/classify', content=b'x', headers={"Content-Type": "multipart/form-data; boundary=b",
+                                                          "Content-Length": "many"}).status_code == 400
@@ -0,0 +1,129 @@
+"""
+Tests for the partitioned Parquet attempt store and /attempts.
+Usage: python -m pytest -q test_attempt_store.py
+"""
+
+import io
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from attempt_store import FEATURE_COLUMNS, AttemptStore, decode_contour, safe_id
+from conftest import synthetic_vowel
+
+FEATURES = {name: float(i) for i, name in enumerate(FEATURE_COLUMNS)}
+
+
+def test_reads_only_requested_partitions_and_columns(tmp_path):
+    store = AttemptStore(str(tmp_path), flush_rows=100)
+    contour = np.linspace(180, 260, 64)
+    for i in range(3):
+        store.append("kid-1", "A", 50 + i, FEATURES, contour, timestamp=1000 + i)
+    store.append("kid-1", "O", 90, FEATURES, contour, timestamp=1010)
+    store.append("kid-2", "A", 10, FEATURES, contour, timestamp=1005)
+
+    table = store.read("kid-1", "A", columns=['score', 'contour'])
+    assert table.column_names == ['score', 'contour']
+    assert table['score'].to_pylist() == [50, 51, 52]
+    np.testing.assert_allclose(decode_contour(table['contour'][0].as_py()), contour, rtol=1e-3)
+
+    everything = store.read("kid-1")
+    assert sorted(everything['letter'].to_pylist()) == ["A", "A", "A", "O"]
+    assert store.read("kid-1", since=1002, limit=1)['score'].to_pylist() == [90]
+    assert store.read("kid-3").num_rows == 0
+    store.flush()
+    assert sorted(os.listdir(tmp_path)) == ["child=kid-1", "child=kid-2"]
+
+
+def test_small_segments_are_compacted(tmp_path):
+    store = AttemptStore(str(tmp_path), flush_rows=1, compact_segments=4)
+    for i in range(9):
+        store.append("kid", "A", i, FEATURES, [200.0] * 8, timestamp=2000 - i)
+
+    files = [name for name in os.listdir(tmp_path / "child=kid" / "letter=A") if name.endswith('.parquet')]
+    assert len(files) < 4
+    assert store.read("kid", "A", columns=['score'])['score'].to_pylist() == list(range(8, -1, -1))
+
+
+
+def test_reads_during_compaction_do_not_duplicate_attempts(tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    store = AttemptStore(str(tmp_path), flush_rows=1, compact_segments=100)
+    for i in range(3):
+        store.append("kid", "A", i, FEATURES, [200.0] * 8, timestamp=3000 + i)
+
+    # The moment between compact() writing the merged file and removing its inputs
+    directory = tmp_path / "child=kid" / "letter=A"
+    segments = sorted(str(path) for path in directory.glob("seg-*.parquet"))
+    merged = pa.concat_tables([pq.read_table(path, schema=store.schema) for path in segments])
+    pq.write_table(merged, str(directory / f"cmp-{os.path.basename(segments[-1])[4:]}"))
+
+    assert store.read("kid", "A", columns=['score'])['score'].to_pylist() == [0, 1, 2]
+    assert store.read("kid")['attempt_id'].to_pylist() == merged['attempt_id'].to_pylist()
+
+
+def test_reads_racing_compaction_retry_then_fail_loudly(tmp_path):
+    store = AttemptStore(str(tmp_path), flush_rows=1, compact_segments=100)
+    store.append("kid", "A", 7, FEATURES, [200.0] * 8, timestamp=4000)
+    segments = AttemptStore._segments
+    listings = []
+
+    def compacted_after_listing(directory):
+        # Every listing names a segment that compaction has already removed
+        listings.append(directory)
+        return segments(directory) + [os.path.join(directory, "seg-gone.parquet")]
+
+    store._segments = compacted_after_listing
+    with pytest.raises(FileNotFoundError):
+        store.read("kid", "A")
+    assert len(listings) == 3
+
+    # A listing that settles on the next try is read normally
+    def settles(directory):
+        listed = compacted_after_listing(directory)
+        return listed if len(listings) == 1 else listed[:-1]
+
+    listings.clear()
+    store._segments = settles
+    assert store.read("kid", "A", columns=['score'])['score'].to_pylist() == [7]
+    assert len(listings) == 2
+
+
+@pytest.mark.parametrize("bad", ["", "../etc", "a/b", "kid 1", "x" * 65, "अ"])
+def test_ids_are_sanitized(tmp_path, bad):
+    with pytest.raises(ValueError):
+        safe_id(bad)
+    with pytest.raises(ValueError):
+        AttemptStore(str(tmp_path)).append(bad, "A", 1, FEATURES, [])
+
+
+def test_analysis_with_child_id_is_recorded(tmp_path, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "attempt_store", AttemptStore(str(tmp_path)))
+    monkeypatch.setattr(app, "progress_db", None)
+    client = app.app.test_client()
+
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(seconds=1.5, f0=220.0), 16000, format='WAV')
+
+    def post(**form):
+        return client.post('/analyze_pronunciation', data=dict(
+            form, audio=(io.BytesIO(buffer.getvalue()), 'clip.wav'), target="अ"), content_type='multipart/form-data')
+
+    # An anonymous upload fills the result cache; the same clip from a child must still be recorded
+    assert post().status_code == 200
+    response = post(child_id="kid-7")
+    assert response.status_code == 200
+    assert post(child_id="kid-7").status_code == 200
+
+    history = client.get('/attempts/kid-7?contour=1').get_json()
+    assert history['count'] == 2
+    attempt = history['attempts'][0]
+    assert attempt['letter'] == "A" and attempt['score'] == pytest.approx(response.get_json()['score'], abs=0.01)
+    assert len(attempt['contour']) == 64 and set(attempt['features']) == set(FEATURE_COLUMNS)
+
+    assert client.get('/attempts/bad..id').status_code == 400
@@ -0,0 +1,188 @@
+"""
+Tests for the in-memory upload decoder.
+Usage: python -m pytest -q test_audio_decode.py
+"""
+
+import io
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import audio_decode
+from audio_decode import AudioDecodeError, UnsupportedAudioFormat, decode_audio, sniff_format
+
+
+def _wav_bytes(audio, sr, subtype='PCM_16'):
+    buf = io.BytesIO()
+    sf.write(buf, audio, sr, format='WAV', subtype=subtype)
+    return buf.getvalue()
+
+
+def test_wav_upload_skips_ffmpeg(monkeypatch):
+    def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("ffmpeg should not be used for WAV uploads")
+    monkeypatch.setattr(audio_decode, "_decode_with_ffmpeg", no_ffmpeg)
+
+    t = np.arange(16000) / 16000
+    tone = 0.5 * np.sin(2 * np.pi * 220 * t)
+    audio = decode_audio(_wav_bytes(tone, 16000), sr=16000)
+
+    assert audio.dtype == np.float32
+    assert len(audio) == 16000
+    np.testing.assert_allclose(audio, tone, atol=1e-4)
+
+
+def test_stereo_wav_is_downmixed_and_resampled():
+    t = np.arange(44100) / 44100
+    stereo = np.stack([np.sin(2 * np.pi * 220 * t), np.zeros_like(t)], axis=1) * 0.5
+    audio = decode_audio(_wav_bytes(stereo, 44100), sr=16000)
+
+    assert audio.ndim == 1
+    assert abs(len(audio) - 16000) <= 1
+
+
+def test_sniff_format():
+    assert sniff_format(b'RIFF\x00\x00\x00\x00WAVEfmt ') == 'wav'
+    assert sniff_format(b'\x1a\x45\xdf\xa3\x01\x00') == 'webm'
+    assert sniff_format(b'OggS\x00\x02') == 'ogg'
+    assert sniff_format(b'FORM\x00\x00\x00\x00AIFF') == 'aiff'
+    assert sniff_format(b'#!AMR\n') == 'amr'
+    assert sniff_format(b'hello world!') is None
+
+
+def test_empty_upload_is_rejected():
+    with pytest.raises(AudioDecodeError):
+        decode_audio(b'', sr=16000)
+
+
+def test_unknown_format_is_refused_without_ffmpeg(monkeypatch):
+    def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("unsupported uploads should not reach ffmpeg")
+    monkeypatch.setattr(audio_decode, "_decode_with_ffmpeg", no_ffmpeg)
+    with pytest.raises(UnsupportedAudioFormat):
+        decode_audio(b'<html>not audio</html>', sr=16000)
+
+
+def test_decoding_stops_at_max_duration():
+    long_clip = 0.1 * np.random.default_rng(0).standard_normal(10 * 8000)
+    audio = decode_audio(_wav_bytes(long_clip, 8000), sr=16000, max_duration=2.5)
+    assert abs(len(audio) - 40000) <= 1
+
+
+def test_ffmpeg_decode_stops_at_max_duration(monkeypatch):
+    import pydub.audio_segment
+
+    commands = []
+    sr = 8000
+    wav = _wav_bytes(0.1 * np.ones(10 * sr), sr)
+
+    class FakeFfmpeg:
+        """Records the command line and 'transcodes' by echoing a 10 s WAV"""
+        returncode = 0
+
+        def __init__(self, command, **kwargs):
+            commands.append(command)
+
+        def communicate(self, input=None):
+            return wav, b''
+
+    monkeypatch.setattr(pydub.audio_segment.subprocess, "Popen", FakeFfmpeg)
+    monkeypatch.setattr(pydub.audio_segment, "mediainfo_json", lambda *args, **kwargs: None)
+
+    # An MP3 header sends the upload down the ffmpeg path
+    audio = decode_audio(b'ID3' + bytes(64), sr=sr, max_duration=2.5)
+
+    command = commands[0]
+    assert command.index('-t') < command.index('-')
+    assert command[command.index('-t') + 1] == '2.5'
+    assert len(audio) == int(2.5 * sr)
+
+
+def _fake_ffmpeg(monkeypatch, output):
+    """Make pydub's ffmpeg call 'transcode' any upload into `output`"""
+    import pydub.audio_segment
+
+    class FakeFfmpeg:
+        returncode = 0
+
+        def __init__(self, command, **kwargs):
+            pass
+
+        def communicate(self, input=None):
+            return output, b''
+
+    monkeypatch.setattr(pydub.audio_segment.subprocess, "Popen", FakeFfmpeg)
+    monkeypatch.setattr(pydub.audio_segment, "mediainfo_json", lambda *args, **kwargs: None)
+
+
+@pytest.mark.parametrize("subtype", ['PCM_U8', 'PCM_16', 'PCM_24', 'PCM_32'])
+def test_ffmpeg_output_sample_widths(monkeypatch, subtype):
+    sr = 8000
+    tone = 0.5 * np.sin(2 * np.pi * 200 * np.arange(sr) / sr)
+    _fake_ffmpeg(monkeypatch, _wav_bytes(tone, sr, subtype=subtype))
+
+    audio = decode_audio(b'ID3' + bytes(64), sr=sr)
+    # 8-bit audio is unsigned in WAV; read as signed it would sit at a DC offset and wrap
+    np.testing.assert_allclose(audio, tone, atol=1.5 / 128)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize("container,codec", [('webm', 'libopus'), ('mp4', 'aac'), ('mp3', 'libmp3lame')])
+def test_real_ffmpeg_decode(container, codec):
+    sr = 48000
+    tone = 0.3 * np.sin(2 * np.pi * 220 * np.arange(2 * sr) / sr)
+    encoded = subprocess.run(
+        ['ffmpeg', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0', '-ac', '2', '-c:a', codec,
+         '-f', container, *(['-movflags', 'frag_keyframe+empty_moov'] if container == 'mp4' else []), 'pipe:1'],
+        input=_wav_bytes(tone, sr), capture_output=True, check=True
+    ).stdout
+    assert sniff_format(encoded) == container
+
+    audio = decode_audio(encoded, sr=16000, max_duration=1.0)
+    assert abs(len(audio) - 16000) <= 1600
+    spectrum = np.abs(np.fft.rfft(audio))
+    assert abs(np.argmax(spectrum) * 16000 / len(audio) - 220) < 5
+
+
+def test_app_rejects_oversize_and_unsupported_uploads(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 1000)
+    client = app.app.test_client()
+
+    too_big = client.post('/analyze_pronunciation', data={
+        "audio": (io.BytesIO(_wav_bytes(np.zeros(4000), 16000)), 'clip.wav'), "target": "अ"},
+        content_type='multipart/form-data')
+    assert too_big.status_code == 413
+    assert too_big.get_json()["success"] is False
+
+    not_audio = client.post('/analyze_pronunciation', data={
+        "audio": (io.BytesIO(b'GIF89a' + b'\x00' * 100), 'clip.wav'), "target": "अ"},
+        content_type='multipart/form-data')
+    assert not_audio.status_code == 415
+
+    not_multipart = client.post('/check_pronunciation', data=b'{}', content_type='application/json')
+    assert not_multipart.status_code == 415
+
+
+def test_app_caps_chunked_uploads_without_content_length(monkeypatch):
+    from werkzeug.test import EnvironBuilder
+    from werkzeug.wrappers import Response
+    import app
+    monkeypatch.setattr(app, "letter_classifier", app.LetterClassifier("missing-model.joblib"))
+
+    def post_chunked(path):
+        environ = EnvironBuilder(path=path, method='POST', data={
+            "audio": (io.BytesIO(_wav_bytes(np.zeros(4000), 16000)), 'clip.wav'), "target": "अ"}).get_environ()
+        body = environ.pop('wsgi.input').read()
+        del environ['CONTENT_LENGTH']
+        environ.update({'wsgi.input': io.BytesIO(body), 'wsgi.input_terminated': True})
+        return Response.from_app(app.app, environ)
+
+    # Within the limit the form parses normally (503: no classifier model), past it the body is refused
+    assert post_chunked('/classify').status_code == 503
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 1000)
+    assert post_chunked('/classify').status_code == 413
+    assert post_chunked('/analyze_pronunciation').status_code == 413
@@ -0,0 +1,49 @@
+"""
+Tests for the classifier training pipeline's search modes and fit cache.
+Usage: python -m pytest -q test_audiopitch.py
+"""
+
+import pytest
+
+import audiopitch
+from audiopitch import AudioClassificationPipeline
+
+
+def train(dataset_csv, cache_dir, search):
+    pipeline = AudioClassificationPipeline(dataset_csv, search=search, search_budget=2, cache_dir=cache_dir)
+    pipeline.load_and_preprocess_data()
+    X = pipeline.feature_selection(method='rfe', k=3)
+    results, _, _, use_holdout = pipeline.train_models(X, pipeline.y_encoded)
+    return pipeline, results, use_holdout
+
+
+@pytest.mark.parametrize("search", ["halving", "random"])
+def test_budgeted_search_trains_every_model(dataset_csv, tmp_path, search):
+    pipeline, results, use_holdout = train(dataset_csv, str(tmp_path / "cache"), search)
+
+    assert use_holdout
+    assert {"Random Forest", "SVM", "Logistic Regression"} <= set(results)
+    assert max(result['cv_mean'] for result in results.values()) > 0.9
+    assert pipeline.best_model is not None
+
+
+def test_rerun_is_served_from_the_cache(dataset_csv, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    _, first, _ = train(dataset_csv, cache_dir, "random")
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("refitted instead of using the cache")
+    for estimator in (audiopitch.RandomForestClassifier, audiopitch.SVC, audiopitch.LogisticRegression):
+        monkeypatch.setattr(estimator, "fit", refuse)
+
+    _, second, _ = train(dataset_csv, cache_dir, "random")
+    assert {name: r['best_params'] for name, r in second.items()} == \
+        {name: r['best_params'] for name, r in first.items()}
+
+
+def test_feature_selection_clamps_k(dataset_csv, tmp_path):
+    pipeline = AudioClassificationPipeline(dataset_csv, cache_dir=None)
+    pipeline.load_and_preprocess_data()
+
+    assert pipeline.feature_selection(method='rfe', k=50).shape == (90, 4)
+    assert pipeline.feature_selector is None
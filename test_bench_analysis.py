@@ -0,0 +1,39 @@
+"""
+Tests for the synthetic corpus and run comparison in bench_analysis.py.
+Usage: python -m pytest -q test_bench_analysis.py
+"""
+
+import numpy as np
+
+from bench_analysis import build_corpus, compare_reports, formant_vowel
+
+
+def test_corpus_is_deterministic():
+    first, second = build_corpus((1, 2)), build_corpus((1, 2))
+    assert [c['name'] for c in first] == [c['name'] for c in second]
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a['audio'], b['audio'])
+    assert len(first[1]['audio']) == 2 * 16000
+
+
+def test_formant_vowel_has_expected_pitch():
+    import librosa
+
+    audio = formant_vowel(2, f0=250.0, vowel='o')
+    assert audio.dtype == np.float32 and np.max(np.abs(audio)) <= 0.8 + 1e-6
+    f0, _, _ = librosa.pyin(audio, fmin=75, fmax=400, sr=16000)
+    # Declination lowers the pitch by up to 10% over the clip
+    assert 215 < np.nanmedian(f0) < 255
+
+
+def test_compare_flags_only_real_slowdowns():
+    def report(**medians):
+        return {'results': {k: {'median_ms': v} for k, v in medians.items()}}
+
+    rows = compare_reports(
+        report(fast=0.2, slow=100.0, same=50.0),
+        report(fast=0.5, slow=130.0, same=51.0),
+        threshold=0.15, min_delta_ms=1.0
+    )
+    flagged = {row['stage'] for row in rows if row['regression']}
+    assert flagged == {'slow'}
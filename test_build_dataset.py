@@ -0,0 +1,55 @@
+"""
+Tests for the incremental reference dataset builder.
+Usage: python -m pytest -q test_build_dataset.py
+"""
+
+import pandas as pd
+import pytest
+import soundfile as sf
+
+import build_dataset
+from conftest import synthetic_vowel
+
+
+def write_vowel(path, f0):
+    sf.write(str(path), synthetic_vowel(seconds=1.0, f0=f0), 16000)
+
+
+def test_build_then_rebuild_only_changed(tmp_path, capsys):
+    data_dir = tmp_path / "data"
+    (data_dir / "wav").mkdir(parents=True)
+    write_vowel(data_dir / "A.wav", 150.0)
+    write_vowel(data_dir / "wav" / "O.wav", 200.0)
+    out_csv = str(tmp_path / "dataset.csv")
+
+    df = build_dataset.build_dataset(str(data_dir), out_csv, jobs=1)
+    written = pd.read_csv(out_csv)
+    assert list(written.columns) == build_dataset.CSV_COLUMNS
+    assert sorted(written["Alphabet"]) == ["A", "O"]
+    by_name = df.set_index("Alphabet")
+    assert abs(by_name.loc["A", "Avg_Pitch_Hz"] - 150.0) < 5
+    assert abs(by_name.loc["O", "Avg_Pitch_Hz"] - 200.0) < 5
+
+    capsys.readouterr()
+    build_dataset.build_dataset(str(data_dir), out_csv, jobs=1)
+    assert "0 to extract, 2 unchanged" in capsys.readouterr().out
+
+    write_vowel(data_dir / "A.wav", 180.0)
+    df = build_dataset.build_dataset(str(data_dir), out_csv, jobs=1)
+    assert "1 to extract, 1 unchanged" in capsys.readouterr().out
+    assert abs(df.set_index("Alphabet").loc["A", "Avg_Pitch_Hz"] - 180.0) < 5
+
+    if build_dataset.PARQUET_AVAILABLE:
+        parquet = pd.read_parquet(str(tmp_path / "dataset.parquet"))
+        assert list(parquet.columns) == build_dataset.PARQUET_COLUMNS
+        assert parquet["Sha256"].str.len().eq(64).all()
+
+
+def test_same_letter_in_two_directories_is_refused(tmp_path):
+    data_dir = tmp_path / "data"
+    (data_dir / "mpeg").mkdir(parents=True)
+    write_vowel(data_dir / "A.wav", 150.0)
+    write_vowel(data_dir / "mpeg" / "A.wav", 200.0)
+
+    with pytest.raises(ValueError, match="A.wav"):
+        build_dataset.build_dataset(str(data_dir), str(tmp_path / "dataset.csv"), jobs=1)
@@ -0,0 +1,77 @@
+"""
+Tests for exporting, loading and serving the letter classifier.
+Usage: python -m pytest -q test_classifier.py
+"""
+
+import io
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from audiopitch import AudioClassificationPipeline
+from classifier import LetterClassifier, load_model_bundle
+from conftest import synthetic_vowel
+
+
+@pytest.fixture()
+def model_path(dataset_csv, tmp_path):
+    pipeline = AudioClassificationPipeline(dataset_csv, search='random', search_budget=2, cache_dir=None)
+    pipeline.load_and_preprocess_data()
+    X = pipeline.feature_selection(method='rfe', k=3)
+    pipeline.train_models(X, pipeline.y_encoded)
+    return pipeline.export_model(str(tmp_path / "models" / "letters.joblib"))
+
+
+def test_bundle_is_loaded_once_and_predicts_in_batches(model_path):
+    bundle = load_model_bundle(model_path)
+    assert load_model_bundle(model_path) is bundle
+    assert bundle['classes'] == ["A", "O", "e"]
+    assert bundle['feature_columns'] == ["Avg_Pitch_Hz", "Min_Pitch", "Max_Pitch", "Duration_s"]
+
+    classifier = LetterClassifier(model_path, max_batch_size=8, max_wait=0.2)
+    rows = [np.array([pitch, pitch - 20, pitch + 20, 2.0]) for pitch in (120.0, 180.0, 240.0) * 2]
+    expected = [prediction['letter'] for prediction in classifier.predict_batch(rows)]
+    assert expected == ["A", "O", "e"] * 2
+
+    results = [None] * len(rows)
+    def predict(i):
+        results[i] = classifier.predict(rows[i], timeout=5)['letter']
+    threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == expected
+    assert classifier.batches < len(rows)
+
+
+def test_classify_endpoint_and_latency_stats(model_path, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "letter_classifier", LetterClassifier(model_path))
+    client = app.app.test_client()
+
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(seconds=1.5, f0=180.0, sr=22050), 22050, format='WAV')
+    response = client.post('/classify', data={"audio": (io.BytesIO(buffer.getvalue()), 'clip.wav')}, content_type='multipart/form-data')
+    body = response.get_json()
+
+    assert response.status_code == 200, body
+    assert body['letter'] == "O" and body['target'] == "ओ"
+    assert abs(sum(body['probabilities'].values()) - 1) < 1e-6
+    assert set(body['latency_ms']) == {'decode', 'features', 'inference', 'total'}
+
+    stats = client.get('/classify/stats').get_json()
+    assert stats['available'] and stats['batches'] >= 1
+    assert stats['latency']['total']['p50_ms'] <= stats['latency']['total']['p99_ms']
+    assert 'voiceshiksha_classify_seconds{stage="total",quantile="0.99"}' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_classify_without_model_returns_503(tmp_path, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "letter_classifier", LetterClassifier(str(tmp_path / "missing.joblib")))
+    response = app.app.test_client().post('/classify', data={"audio": (io.BytesIO(b"RIFF"), 'clip.wav')},
+                                          content_type='multipart/form-data')
+    assert response.status_code == 503
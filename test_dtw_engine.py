@@ -0,0 +1,46 @@
+"""
+Tests for the NumPy DTW engine.
+Usage: python -m pytest -q test_dtw_engine.py
+"""
+
+import numpy as np
+import pytest
+
+from dtw_engine import dtw_distance
+
+
+def naive_dtw(x, y):
+    n, m = len(x), len(y)
+    D = np.full((n + 1, m + 1), np.inf)
+    D[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            D[i, j] = abs(x[i - 1] - y[j - 1]) + min(D[i - 1, j], D[i, j - 1], D[i - 1, j - 1])
+    return D[n, m]
+
+
+@pytest.mark.parametrize("n,m", [(1, 1), (1, 7), (7, 1), (20, 31), (40, 13)])
+def test_full_window_matches_naive(n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    x, y = rng.normal(250, 30, n), rng.normal(240, 30, m)
+    assert dtw_distance(x, y) == pytest.approx(naive_dtw(x, y))
+
+
+def test_windows_never_beat_the_full_matrix():
+    rng = np.random.default_rng(3)
+    x, y = rng.normal(250, 30, 60), rng.normal(240, 30, 45)
+    full = dtw_distance(x, y)
+
+    assert dtw_distance(x, y, window='sakoe_chiba', radius=4) >= full - 1e-9
+    assert dtw_distance(x, y, window='itakura') >= full - 1e-9
+    assert dtw_distance(x, y, window='sakoe_chiba', radius=100) == pytest.approx(full)
+
+
+def test_early_abandon_returns_lower_bound_above_cutoff():
+    rng = np.random.default_rng(4)
+    x, y = rng.normal(250, 30, 80), rng.normal(300, 30, 80)
+    full = dtw_distance(x, y)
+    bound = dtw_distance(x, y, cutoff=full / 4)
+
+    assert full / 4 < bound <= full
+    assert dtw_distance(x, y, cutoff=full * 2) == pytest.approx(full)
@@ -0,0 +1,23 @@
+"""
+Startup import budget for the serving path.
+Usage: python -m pytest -q test_import_budget.py
+"""
+
+from import_report import IMPORT_BUDGET_MS, forbidden_imports, measure_imports
+
+
+def test_serving_path_skips_plotting_and_ml_imports():
+    _, imports = measure_imports('app')
+    assert forbidden_imports(imports) == []
+
+
+def test_pitch_module_does_not_load_dsp_stack():
+    _, imports = measure_imports('pitch')
+    loaded = {entry['name'] for entry in imports}
+    assert not loaded.intersection({'pandas', 'scipy.signal', 'scipy.stats'})
+
+
+def test_app_import_within_budget():
+    # Best of three to keep a cold disk cache from failing the build
+    wall_ms = min(measure_imports('app')[0] for _ in range(3))
+    assert wall_ms <= IMPORT_BUDGET_MS, f"import app took {wall_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
@@ -0,0 +1,64 @@
+"""
+Tests for the async analysis job store and runner.
+Usage: python -m pytest -q test_jobs.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from jobs import JobQueueFull, JobRunner, JobStore
+
+
+def test_long_poll_returns_when_job_finishes():
+    store = JobStore()
+    runner = JobRunner(store, max_workers=1)
+    release = threading.Event()
+
+    def work():
+        release.wait(5)
+        return {"success": True, "score": 80.0}, 200
+
+    job = runner.submit(work)
+    assert store.wait(job.job_id, 0.05).status in ('queued', 'running')
+
+    release.set()
+    finished = store.wait(job.job_id, 5)
+    assert finished.status == 'done'
+    assert finished.payload == {"success": True, "score": 80.0}
+    runner.shutdown()
+
+
+def test_failures_and_exceptions_are_recorded():
+    store = JobStore()
+    runner = JobRunner(store, max_workers=1)
+
+    bad_input = runner.submit(lambda: ({"success": False}, 500))
+    crashed = runner.submit(lambda: 1 / 0)
+
+    assert store.wait(bad_input.job_id, 5).status == 'failed'
+    job = store.wait(crashed.job_id, 5)
+    assert job.status == 'failed' and job.status_code == 500
+    runner.shutdown()
+
+
+def test_queue_is_bounded():
+    store = JobStore()
+    runner = JobRunner(store, max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    runner.submit(lambda: (release.wait(5), 200))
+    with pytest.raises(JobQueueFull):
+        runner.submit(lambda: ({}, 200))
+
+    release.set()
+    runner.shutdown()
+
+
+def test_finished_jobs_expire():
+    store = JobStore(ttl=0.01)
+    job = store.create()
+    store.finish(job.job_id, {"success": True}, 200)
+    time.sleep(0.05)
+    assert store.get(job.job_id) is None
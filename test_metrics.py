@@ -0,0 +1,96 @@
+"""
+Tests for the metrics registry and the /metrics endpoint.
+Usage: python -m pytest -q test_metrics.py
+"""
+
+import io
+
+import pytest
+import soundfile as sf
+
+from metrics import MetricsRegistry, StageTimer
+from conftest import synthetic_vowel
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('latency_seconds', 'Latency', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage='dtw')
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="dtw",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="dtw",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{stage="dtw",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{stage="dtw"} 4.05' in text
+    assert 'latency_seconds_count{stage="dtw"} 4' in text
+
+
+def test_summary_reports_quantiles_of_recent_window():
+    registry = MetricsRegistry()
+    summary = registry.summary('classify_seconds', 'Latency', ('stage',), window=100)
+    assert summary.quantile(0.5, stage='total') is None
+    for value in range(1, 201):
+        summary.observe(value / 1000, stage='total')
+
+    # Only the latest 100 observations (0.101 .. 0.200) are kept for quantiles
+    assert summary.quantile(0.5, stage='total') == 0.15
+    assert summary.quantile(0.99, stage='total') == 0.199
+    assert summary.count(stage='total') == 200
+
+    text = registry.render()
+    assert '# TYPE classify_seconds summary' in text
+    assert 'classify_seconds{stage="total",quantile="0.5"} 0.15' in text
+    assert 'classify_seconds_count{stage="total"} 200' in text
+
+
+def test_counter_gauge_and_label_checks():
+    registry = MetricsRegistry()
+    counter = registry.counter('requests_total', 'Requests', ('status',))
+    counter.inc(status=200)
+    counter.inc(2, status=200)
+    registry.gauge('queue_depth', 'Queue').set_function(lambda: 7)
+
+    text = registry.render()
+    assert 'requests_total{status="200"} 3' in text
+    assert 'queue_depth 7' in text
+    with pytest.raises(ValueError):
+        counter.inc(code=200)
+    with pytest.raises(ValueError):
+        registry.counter('requests_total', 'Duplicate')
+
+
+def test_stage_timer_accumulates():
+    timer = StageTimer()
+    with timer.stage('dtw'):
+        pass
+    timer.add('dtw', 0.5)
+    assert 0.5 <= timer.durations['dtw'] < 0.6
+
+
+def test_analyzer_reports_stage_timings():
+    from pitch import EnhancedPitchAnalyzer
+
+    result = EnhancedPitchAnalyzer().analyze_pronunciation_audio('अ', synthetic_vowel())
+    assert result['success']
+    assert {'reference', 'preprocess', 'pitch_tracking', 'dtw', 'similarity', 'feedback'} <= set(result['timings'])
+
+
+def test_metrics_endpoint_labels_stages_letters_and_outcomes():
+    import app
+
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(f0=233.0), 16000, format='WAV')
+    client = app.app.test_client()
+    for target in ('आ', 'not-a-letter'):
+        client.post('/analyze_pronunciation', data={
+            'audio': (io.BytesIO(buffer.getvalue()), 'clip.wav'), 'target': target
+        })
+
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    text = response.data.decode()
+    assert 'voiceshiksha_analysis_stage_seconds_count{stage="dtw",letter="Aaa",outcome="success"}' in text
+    assert 'voiceshiksha_analyses_total{letter="other",outcome="analysis_failed"}' in text
+    assert 'not-a-letter' not in text
+    assert 'voiceshiksha_http_requests_in_flight{endpoint="get_metrics"} 1' in text
@@ -0,0 +1,144 @@
+"""
+Tests for the pitch engines used by EnhancedPitchAnalyzer.
+Usage: python -m pytest -q test_pitch_tracker.py
+"""
+
+import os
+
+import librosa
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SR, synthetic_vowel
+from pitch import EnhancedPitchAnalyzer
+from pitch_engines import available_pitch_engines, get_pitch_engine
+from pitch_track import PitchTrack
+
+
+def legacy_track_pitch(audio, sr=SR):
+    """The original per-frame piptrack loop, kept here as the reference output"""
+    pitches, magnitudes = librosa.piptrack(y=audio, sr=sr, threshold=0.1, fmin=80, fmax=1000)
+    times = librosa.frames_to_time(np.arange(pitches.shape[1]), sr=sr, hop_length=512)
+    frequency = []
+    confidence = []
+
+    for t in range(pitches.shape[1]):
+        index = magnitudes[:, t].argmax()
+        pitch = pitches[index, t]
+
+        if pitch > 0:
+            frequency.append(pitch)
+            confidence.append(magnitudes[index, t])
+        else:
+            f0 = librosa.yin(audio, fmin=80, fmax=1000, sr=sr, frame_length=2048, hop_length=512)
+            if t < len(f0) and f0[t] > 0:
+                frequency.append(f0[t])
+                confidence.append(0.8)
+            else:
+                frequency.append(0)
+                confidence.append(0)
+
+    return pd.DataFrame({
+        "Time (s)": times[:len(frequency)],
+        "Pitch (Hz)": frequency,
+        "Confidence": confidence
+    })
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return EnhancedPitchAnalyzer("hindi_pitch_dataset.csv")
+
+
+def _clips(analyzer):
+    yield "synthetic", synthetic_vowel()
+    reference = os.path.join("data", "A.mpeg")
+    if os.path.exists(reference):
+        yield "reference", analyzer.load_and_preprocess_audio(reference)
+
+
+def test_tracker_matches_legacy_loop(analyzer):
+    for name, audio in _clips(analyzer):
+        expected = legacy_track_pitch(audio)
+        times, frequency, confidence = get_pitch_engine("piptrack").track(audio, SR)
+
+        np.testing.assert_allclose(times, expected["Time (s)"].values, err_msg=name)
+        np.testing.assert_allclose(frequency, expected["Pitch (Hz)"].values, err_msg=name)
+        np.testing.assert_allclose(confidence, expected["Confidence"].values, err_msg=name)
+
+
+def test_extract_pitch_features_schema_unchanged(analyzer):
+    df, features = analyzer.extract_pitch_features(synthetic_vowel(), as_dataframe=True)
+
+    assert list(df.columns) == ["Time (s)", "Pitch (Hz)", "Confidence"]
+    assert set(features) == {
+        'mean_pitch', 'median_pitch', 'std_pitch', 'pitch_range', 'pitch_variance',
+        'pitch_skewness', 'pitch_kurtosis', 'pitch_slope', 'jitter', 'shimmer',
+        'voiced_frames_ratio'
+    }
+    assert abs(features['median_pitch'] - 220.0) < 15
+
+
+def test_fused_float32_preprocessing_matches_two_pass_chain(analyzer):
+    from scipy import signal
+
+    audio = synthetic_vowel() + 0.05 * np.random.default_rng(0).standard_normal(2 * SR)
+    expected = signal.lfilter([1, -0.97], [1], audio.astype(np.float64))
+    expected = signal.sosfilt(analyzer.lowpass_sos, librosa.util.normalize(expected))
+
+    processed = analyzer.preprocess_audio(audio)
+    assert processed.dtype == np.float32
+    np.testing.assert_allclose(processed, expected, atol=1e-5)
+
+    # Designed once, not per call
+    assert analyzer.lowpass_sos is analyzer.lowpass_sos
+
+
+def test_extract_pitch_features_returns_float32_track(analyzer):
+    track, features = analyzer.extract_pitch_features(synthetic_vowel())
+
+    assert isinstance(track, PitchTrack)
+    for values in (track.times, track.f0, track.confidence):
+        assert values.dtype == np.float32 and values.flags['C_CONTIGUOUS']
+        assert len(values) == len(track)
+    assert track.duration == pytest.approx(float(track.times.max()))
+
+    df = track.to_dataframe()
+    assert list(df.columns) == ["Time (s)", "Pitch (Hz)", "Confidence"]
+    assert features['median_pitch'] == pytest.approx(float(np.median(df["Pitch (Hz)"])))
+
+
+def test_every_engine_tracks_synthetic_vowel(analyzer):
+    audio = synthetic_vowel(f0=180.0)
+    for name, profile in available_pitch_engines().items():
+        assert 'relative_cost' in profile
+        df, features = analyzer.extract_pitch_features(audio, pitch_engine=name)
+        assert features is not None, name
+        assert abs(features['median_pitch'] - 180.0) < 15, name
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        get_pitch_engine("crepe")
+
+
+def test_file_and_upload_loads_use_the_same_resampler(monkeypatch, tmp_path):
+    import soundfile as sf
+
+    import pitch
+
+    loads = []
+    load = librosa.load
+
+    def recording(*args, **kwargs):
+        loads.append(kwargs.get('res_type'))
+        return load(*args, **kwargs)
+    monkeypatch.setattr(pitch.librosa, "load", recording)
+
+    path = tmp_path / "clip.wav"
+    sf.write(path, synthetic_vowel(sr=8000), 8000)
+    fast = EnhancedPitchAnalyzer("hindi_pitch_dataset.csv", resample_type="soxr_lq")
+    fast.load_and_preprocess_audio(str(path))
+    fast.analyze_pronunciation("अ", str(path))
+    assert loads == ["soxr_lq", "soxr_lq"]
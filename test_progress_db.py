@@ -0,0 +1,89 @@
+"""
+Tests for the SQLite progress database and the /progress endpoints.
+Usage: python -m pytest -q test_progress_db.py
+"""
+
+import io
+import threading
+
+import pytest
+import soundfile as sf
+
+from progress_db import ProgressDB
+from conftest import synthetic_vowel
+
+
+@pytest.fixture()
+def db(tmp_path):
+    database = ProgressDB(str(tmp_path / "progress.db"), ema_alpha=0.5)
+    yield database
+    database.close()
+
+
+def test_aggregates_are_maintained_per_letter(db):
+    for i, score in enumerate((40.0, 80.0, 60.0)):
+        db.record("kid", "A", score, "Good", timestamp=100 + i)
+    db.record("kid", "O", 90.0, "Excellent", timestamp=200)
+    db.record("other-kid", "A", 10.0, timestamp=300)
+
+    a = db.letter_progress("kid", "A")
+    assert a['attempts'] == 3 and a['best_score'] == 80.0 and a['last_score'] == 60.0
+    assert a['ema_score'] == pytest.approx(0.5 * 60 + 0.5 * (0.5 * 80 + 0.5 * 40))
+    assert (a['first_at'], a['last_at']) == (100, 102)
+
+    assert [row['letter'] for row in db.child_progress("kid")] == ["A", "O"]
+    assert [row['score'] for row in db.recent_attempts("kid", "A", limit=2)] == [60.0, 80.0]
+    assert db.letter_progress("kid", "e") is None
+
+
+def test_wal_mode_indexes_and_per_thread_connections(db):
+    conn = db.connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT score FROM attempts WHERE child_id = 'k' AND letter = 'A' "
+        "ORDER BY created_at DESC LIMIT 5"))
+    assert "idx_attempts_child_letter_time" in plan
+
+    others = []
+    def record(i):
+        db.record("kid", "A", i)
+        others.append(db.connection())
+    threads = [threading.Thread(target=record, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len({id(c) for c in others + [conn]}) == 9
+    assert db.letter_progress("kid", "A")['attempts'] == 8
+
+
+def test_analysis_updates_progress_endpoints(tmp_path, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "progress_db", ProgressDB(str(tmp_path / "progress.db")))
+    monkeypatch.setattr(app, "attempt_store", None)
+    client = app.app.test_client()
+
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(seconds=1.5, f0=220.0), 16000, format='WAV')
+    # The cache stays enabled: an anonymous upload of the same clip must not hide the child's attempts
+    anonymous = client.post('/analyze_pronunciation', data={
+        "audio": (io.BytesIO(buffer.getvalue()), 'clip.wav'), "target": "अ"}, content_type='multipart/form-data')
+    assert anonymous.status_code == 200
+    scores = []
+    for _ in range(2):
+        response = client.post('/analyze_pronunciation', data={
+            "audio": (io.BytesIO(buffer.getvalue()), 'clip.wav'), "target": "अ", "child_id": "kid-9"
+        }, content_type='multipart/form-data')
+        scores.append(response.get_json()['score'])
+
+    summary = client.get('/progress/kid-9').get_json()
+    assert summary['total_attempts'] == 2
+    assert summary['letters'][0]['letter'] == "A" and summary['letters'][0]['target'] == "अ"
+    assert summary['letters'][0]['best_score'] == pytest.approx(max(scores), abs=0.01)
+
+    detail = client.get('/progress/kid-9/अ?limit=1').get_json()
+    assert detail['attempts'] == 2 and len(detail['recent']) == 1
+
+    assert client.get('/progress/kid-9/O').status_code == 404
+    assert client.get('/progress/bad id').status_code == 400
@@ -0,0 +1,155 @@
+"""
+Tests for the speech recognition service and /check_pronunciation, using a local stand-in model.
+Usage: python -m pytest -q test_recognizer.py
+"""
+
+import io
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from batching import MicroBatcher
+from recognizer import SAMPLE_RATE, RecognizerBackend, RecognizerService, RecognizerUnavailable, levenshtein
+
+
+class ToneBackend(RecognizerBackend):
+    """Stand-in 'model': names the nearest known tone, one call per batch"""
+    name = 'tone'
+    WORDS = {220.0: "aa", 330.0: "ee", 440.0: "oo"}
+
+    def __init__(self, delay=None):
+        self.loads = 0
+        self.batch_sizes = []
+        self.delay = delay
+
+    def load(self):
+        self.loads += 1
+
+    def transcribe_batch(self, clips):
+        if self.delay is not None:
+            self.delay.wait(5)
+        self.batch_sizes.append(len(clips))
+        transcripts = []
+        for clip in clips:
+            spectrum = np.abs(np.fft.rfft(clip))
+            peak = np.fft.rfftfreq(len(clip), 1 / SAMPLE_RATE)[spectrum.argmax()]
+            tone = min(self.WORDS, key=lambda f: abs(f - peak))
+            transcripts.append(f" {self.WORDS[tone].capitalize()}.")
+        return transcripts
+
+
+def tone(frequency, seconds=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def test_levenshtein_and_tolerance():
+    assert levenshtein("kitten", "sitting") == 3
+    assert levenshtein("", "aa") == 2
+
+    close = RecognizerService.score(" Aah!", "aa", tolerance=1)
+    assert close['transcript'] == "aah" and close['distance'] == 1 and close['correct']
+    assert not RecognizerService.score("ooo", "aa", tolerance=1)['correct']
+
+
+def test_model_loads_once_and_concurrent_clips_share_a_batch():
+    release = threading.Event()
+    backend = ToneBackend(delay=release)
+    service = RecognizerService(backend, max_batch_size=8, max_wait=0.2)
+
+    results = [None] * 6
+    def check(i):
+        results[i] = service.check(tone([220.0, 330.0, 440.0][i % 3]), ["aa", "ee", "oo"][i % 3])
+
+    threads = [threading.Thread(target=check, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert all(result['correct'] for result in results)
+    assert backend.loads == 1
+    assert sum(backend.batch_sizes) == 6 and len(backend.batch_sizes) < 6
+
+
+def test_transcribe_batch_splits_by_max_batch_size():
+    backend = ToneBackend()
+    service = RecognizerService(backend, max_batch_size=2)
+
+    transcripts = service.transcribe_batch([tone(220.0), tone(330.0), tone(440.0)])
+    assert transcripts == [" Aa.", " Ee.", " Oo."]
+    assert backend.batch_sizes == [2, 1]
+
+
+def test_check_pronunciation_endpoint(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "recognizer", RecognizerService(ToneBackend()))
+    client = app.app.test_client()
+
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(220.0), SAMPLE_RATE, format='WAV')
+
+    def post(**form):
+        return client.post('/check_pronunciation', data=dict(form, audio=(io.BytesIO(buffer.getvalue()), 'a.wav')),
+                           content_type='multipart/form-data')
+
+    response = post(expected="aa")
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['success'] and body['correct'] and body['transcript'] == "aa" and body['backend'] == 'tone'
+
+    # No expected text: the latin spelling of the target letter is used
+    body = post(target="आ", tolerance="0").get_json()
+    assert body['expected'] == "aaa" and body['distance'] == 1 and not body['correct']
+
+    assert client.post('/check_pronunciation', data={"expected": "aa"}).status_code == 400
+
+
+def test_unavailable_backend_returns_503(monkeypatch):
+    import app
+
+    class MissingBackend(RecognizerBackend):
+        name = 'missing'
+
+        def load(self):
+            raise RecognizerUnavailable("model not installed")
+
+    monkeypatch.setattr(app, "recognizer", RecognizerService(MissingBackend()))
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(220.0), SAMPLE_RATE, format='WAV')
+    response = app.app.test_client().post('/check_pronunciation', data={
+        "expected": "aa", "audio": (io.BytesIO(buffer.getvalue()), 'a.wav')}, content_type='multipart/form-data')
+
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+
+
+def test_batcher_fails_every_item_when_results_are_missing():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=2, max_wait=0.5)
+    futures = [batcher.submit(1), batcher.submit(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+
+
+def test_check_times_out_and_returns_504(monkeypatch):
+    import app
+    stuck = threading.Event()
+    service = RecognizerService(ToneBackend(delay=stuck), timeout=0.2)
+    monkeypatch.setattr(app, "recognizer", service)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(220.0), SAMPLE_RATE, format='WAV')
+    response = app.app.test_client().post('/check_pronunciation', data={
+        "expected": "aa", "audio": (io.BytesIO(buffer.getvalue()), 'a.wav')}, content_type='multipart/form-data')
+    assert response.status_code == 504
+
+    # A clip queued behind the stuck batch is dropped once its caller gives up
+    with pytest.raises(TimeoutError):
+        service.transcribe(tone(330.0), timeout=0.1)
+    stuck.set()
+    assert service.check(tone(440.0), "oo", timeout=5)['correct']
+    assert service.backend.batch_sizes == [1, 1]
@@ -0,0 +1,63 @@
+"""
+Tests for in-memory reference audio serving.
+Usage: python -m pytest -q test_reference_audio.py
+"""
+
+import pytest
+
+from reference_audio import ReferenceAudioLibrary
+
+
+@pytest.fixture()
+def library_dir(tmp_path):
+    (tmp_path / "A.mpeg").write_bytes(b"ID3" + bytes(range(200)))
+    (tmp_path / "variants").mkdir()
+    (tmp_path / "variants" / "A.opus").write_bytes(b"OggS" + bytes(50))
+    return tmp_path
+
+
+def test_library_loads_originals_and_variants(library_dir):
+    library = ReferenceAudioLibrary(str(library_dir))
+
+    assert "A" in library and library.formats("A") == ["mpeg", "opus"]
+    assert library.get("A").mimetype == "audio/mpeg"
+    assert library.get("A", "opus").data.startswith(b"OggS")
+    assert library.get("A", "flac") is None
+    assert library.get("A").etag != library.get("A", "opus").etag
+
+
+def test_endpoint_validators_and_ranges(library_dir, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "reference_audio", ReferenceAudioLibrary(str(library_dir)))
+    client = app.app.test_client()
+
+    full = client.get("/audio/अ")
+    assert full.status_code == 200
+    assert "max-age" in full.headers["Cache-Control"]
+
+    assert client.get("/audio/अ", headers={"If-None-Match": full.headers["ETag"]}).status_code == 304
+
+    partial = client.get("/audio/अ", headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206 and partial.data == full.data[:10]
+
+    unsatisfiable = client.get("/audio/अ", headers={"Range": "bytes=99999999-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(full.data)}"
+
+    opus = client.get("/audio/अ?format=opus")
+    assert opus.mimetype == "audio/ogg" and opus.data.startswith(b"OggS")
+
+    assert client.get("/audio/आ").status_code == 404
+
+
+def test_missing_variant_is_refused_not_swapped(library_dir, monkeypatch):
+    import app
+    (library_dir / "variants" / "A.opus").unlink()
+    monkeypatch.setattr(app, "reference_audio", ReferenceAudioLibrary(str(library_dir)))
+    client = app.app.test_client()
+
+    for audio_format in ("opus", "flac"):
+        response = client.get(f"/audio/अ?format={audio_format}")
+        assert response.status_code == 406
+        assert response.get_json()["formats"] == ["mpeg"]
+    assert client.get("/audio/अ").status_code == 200
@@ -0,0 +1,61 @@
+"""
+Tests for the memory-mapped reference store.
+Usage: python -m pytest -q test_reference_store.py
+"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from pitch import EnhancedPitchAnalyzer
+from reference_store import FEATURE_KEYS, ReferenceStore, build_reference_store
+from conftest import synthetic_vowel
+
+
+@pytest.fixture(scope="module")
+def store_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    sf.write(str(data_dir / "A.wav"), synthetic_vowel(f0=200.0), 16000)
+    sf.write(str(data_dir / "Aaa.wav"), synthetic_vowel(f0=250.0), 16000)
+
+    out_dir = tmp_path_factory.mktemp("store")
+    analyzer = EnhancedPitchAnalyzer(reference_store_path=None)
+    build_reference_store(str(data_dir), str(out_dir), analyzer, pattern="*.wav")
+    return str(out_dir)
+
+
+def test_store_round_trip(store_dir):
+    store = ReferenceStore.open(store_dir)
+
+    assert len(store) == 2 and "A" in store and "Aaa" in store
+    assert set(store.features("A")) == set(FEATURE_KEYS)
+    assert abs(store.features("Aaa")["median_pitch"] - 250.0) < 15
+
+    contour = store.contour("A")
+    assert isinstance(contour.base, np.memmap) or isinstance(contour, np.memmap)
+    assert not contour.flags.writeable
+
+
+def test_analyzer_compares_against_stored_contour(store_dir):
+    analyzer = EnhancedPitchAnalyzer(reference_store_path=store_dir)
+    reference = analyzer._lookup_reference("अ")
+
+    assert reference["contour"] is not None
+    result = analyzer.analyze_pronunciation_audio("अ", synthetic_vowel(f0=200.0))
+    assert result["success"]
+    assert result["feedback"]["composite_score"] > 90
+
+
+def test_missing_store_falls_back_to_csv(tmp_path):
+    assert ReferenceStore.open(str(tmp_path)) is None
+    analyzer = EnhancedPitchAnalyzer(reference_store_path=str(tmp_path))
+    assert analyzer._lookup_reference("अ")["contour"] is None
+
+
+def test_duplicate_csv_letters_keep_the_first_row(tmp_path):
+    csv_path = tmp_path / "refs.csv"
+    csv_path.write_text("Alphabet,Avg_Pitch_Hz,Min_Pitch,Max_Pitch,Duration_s\n"
+                        "A,257.99,222.1,298.2,5.3\n"
+                        "A,257.95,222.1,298.2,5.3\n")
+    analyzer = EnhancedPitchAnalyzer(reference_csv_path=str(csv_path), reference_store_path=None)
+    assert analyzer.reference_table["A"]["Avg_Pitch_Hz"] == "257.99"
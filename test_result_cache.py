@@ -0,0 +1,94 @@
+"""
+Tests for the content-addressed analysis result cache.
+Usage: python -m pytest -q test_result_cache.py
+"""
+
+import shutil
+import time
+
+from result_cache import ResultCache, cache_key
+
+
+def test_key_depends_on_audio_target_and_version():
+    base = cache_key(b'audio', 'अ', 'v1')
+    assert base == cache_key(b'audio', 'अ', 'v1')
+    assert base != cache_key(b'audio!', 'अ', 'v1')
+    assert base != cache_key(b'audio', 'आ', 'v1')
+    assert base != cache_key(b'audio', 'अ', 'v2')
+    assert base != cache_key(b'audio', 'अ', 'v1', pitch_engine='yin')
+
+
+def test_lru_eviction_and_counters():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', {'score': 1})
+    cache.put('b', {'score': 2})
+    assert cache.get('a') == {'score': 1}
+    cache.put('c', {'score': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'score': 1}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 2)
+
+
+def test_entries_expire():
+    cache = ResultCache(ttl=0.01)
+    cache.put('a', {'score': 1})
+    time.sleep(0.05)
+    assert cache.get('a') is None
+
+
+def test_disk_tier_survives_restart_and_version_change_clears_it(tmp_path):
+    ResultCache(disk_dir=str(tmp_path), version='v1').put('a', {'score': 1})
+
+    restarted = ResultCache(disk_dir=str(tmp_path), version='v1')
+    assert restarted.get('a') == {'score': 1}
+
+    restarted.set_version('v2')
+    assert restarted.get('a') is None
+    assert not (tmp_path / 'v1').exists()
+
+
+def test_version_change_tolerates_a_busy_or_vanished_old_directory(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path), version='v1')
+    cache.put('a', {'score': 1})
+    # A file another thread is still writing, and a directory another worker already emptied
+    (tmp_path / 'v1' / 'partial.tmp').write_bytes(b'')
+    (tmp_path / 'v1' / 'nested').mkdir()
+    cache.set_version('v2')
+    assert not (tmp_path / 'v1').exists()
+
+    other = ResultCache(disk_dir=str(tmp_path), version='v2')
+    shutil.rmtree(tmp_path / 'v2')
+    other.set_version('v3')
+    assert (tmp_path / 'v3').is_dir()
+
+
+def test_failed_analyses_are_not_cached(monkeypatch, tmp_path):
+    import io
+
+    import soundfile as sf
+
+    import app
+    from conftest import synthetic_vowel
+
+    monkeypatch.setattr(app, "result_cache", ResultCache(disk_dir=str(tmp_path / "cache")))
+    monkeypatch.setattr(app, "attempt_store", None)
+    monkeypatch.setattr(app, "progress_db", None)
+    calls = []
+
+    def failing(target, audio, pitch_engine=None):
+        calls.append(target)
+        return app.analyzer._failure("No clear pitch detected", "Please speak louder")
+    monkeypatch.setattr(app.analyzer, "analyze_pronunciation_audio", failing)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_vowel(), 16000, format='WAV')
+    client = app.app.test_client()
+    for _ in range(2):
+        response = client.post('/analyze_pronunciation', content_type='multipart/form-data',
+                               data={"audio": (io.BytesIO(buffer.getvalue()), "a.wav"), "target": "अ"})
+        assert response.status_code == 422
+        assert response.get_json()["success"] is False
+        assert response.get_json()["feedback"] == "Please speak louder"
+    assert len(calls) == 2
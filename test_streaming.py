@@ -0,0 +1,140 @@
+"""
+Tests for chunked streaming analysis.
+Usage: python -m pytest -q test_streaming.py
+"""
+
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from pitch import EnhancedPitchAnalyzer
+from streaming import StreamSession, StreamSessionStore, decode_pcm
+from conftest import synthetic_vowel
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return EnhancedPitchAnalyzer("hindi_pitch_dataset.csv")
+
+
+def _stream(analyzer, audio, chunk_size=1600):
+    session = StreamSession(analyzer, "अ")
+    updates = [session.add_chunk(audio[i:i + chunk_size]) for i in range(0, len(audio), chunk_size)]
+    return session, updates
+
+
+def test_partial_pitch_matches_offline_tracker(analyzer):
+    audio = synthetic_vowel(seconds=3.0, f0=200.0)
+    session, updates = _stream(analyzer, audio)
+
+    streamed = np.array([frame['pitch'] for update in updates for frame in update['frames']])
+    _, offline, _ = analyzer.pitch_engine.track(analyzer.preprocess_audio(audio), analyzer.sr)
+
+    assert len(streamed) > 0
+    np.testing.assert_allclose(streamed, offline[:len(streamed)], atol=1e-6)
+    assert updates[-1]['running_score'] is not None
+
+
+def test_finish_matches_whole_clip_analysis(analyzer):
+    audio = synthetic_vowel(seconds=2.0, f0=240.0)
+    session, _ = _stream(analyzer, audio, chunk_size=777)
+
+    streamed, whole = session.finish(), analyzer.analyze_pronunciation_audio("अ", audio)
+    # Stage timings are wall-clock and differ between runs
+    streamed.pop('timings'), whole.pop('timings')
+    assert streamed == whole
+
+
+def test_stream_length_is_capped(analyzer):
+    session = StreamSession(analyzer, "अ", max_seconds=1)
+    with pytest.raises(ValueError):
+        session.add_chunk(np.zeros(2 * analyzer.sr, dtype=np.float32))
+
+
+def test_decode_pcm():
+    samples = np.array([0, 16384, -32768], dtype='<i2')
+    np.testing.assert_allclose(decode_pcm(samples.tobytes()), [0.0, 0.5, -1.0])
+    with pytest.raises(ValueError):
+        decode_pcm(b'', 'mulaw')
+    with pytest.raises(ValueError):
+        decode_pcm(samples.tobytes()[:-1])
+
+
+@pytest.mark.parametrize("sample_format,dtype", [("s16le", "<i2"), ("f32le", "<f4")])
+def test_samples_split_across_chunks_are_kept(analyzer, sample_format, dtype):
+    audio = synthetic_vowel(seconds=1.0, f0=200.0)
+    data = (audio * 32767).astype(dtype).tobytes() if dtype == "<i2" else audio.astype(dtype).tobytes()
+
+    session = StreamSession(analyzer, "अ")
+    for start in range(0, len(data), 1001):
+        session.add_pcm(data[start:start + 1001], sample_format)
+    np.testing.assert_array_equal(session.audio(), decode_pcm(data, sample_format))
+
+
+def test_running_score_is_not_recomputed_every_chunk(analyzer, monkeypatch):
+    calls = []
+    score_pitch = analyzer.score_pitch
+    monkeypatch.setattr(analyzer, "score_pitch", lambda *args: calls.append(1) or score_pitch(*args))
+
+    audio = synthetic_vowel(seconds=3.0, f0=200.0)
+    session, updates = _stream(analyzer, audio, chunk_size=512)
+    assert updates[-1]['running_score'] is not None
+    # One rescore per half second of audio, not one per chunk
+    assert 0 < len(calls) <= 3.0 / 0.5 + 1 < len(updates)
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "stream_sessions", StreamSessionStore(idle_timeout=60))
+    monkeypatch.setattr(app, "attempt_store", None)
+    monkeypatch.setattr(app, "progress_db", None)
+    return app.app.test_client()
+
+
+def test_stream_endpoints_match_analyze_pronunciation(client):
+    audio = synthetic_vowel(seconds=2.0, f0=240.0)
+    pcm = (audio * 32767).astype('<i2')
+
+    session = client.post('/stream/start', data={"target": "अ"}).get_json()
+    assert session["success"]
+    chunk_url, finish_url = session["chunk_url"], session["finish_url"]
+
+    assert client.post(f"{chunk_url}?format=mulaw", data=pcm[:1600].tobytes()).status_code == 400
+    for start in range(0, len(pcm), 1600):
+        update = client.post(chunk_url, data=pcm[start:start + 1600].tobytes())
+        assert update.status_code == 200
+    finished = client.post(finish_url)
+    assert finished.status_code == 200
+
+    # The same samples uploaded as a 16-bit WAV go through the normal decode path
+    buffer = io.BytesIO()
+    sf.write(buffer, pcm, 16000, format='WAV', subtype='PCM_16')
+    whole = client.post('/analyze_pronunciation', data={
+        "audio": (io.BytesIO(buffer.getvalue()), 'clip.wav'), "target": "अ"}, content_type='multipart/form-data')
+    assert finished.get_json() == whole.get_json()
+
+    # A finished session is gone
+    assert client.post(finish_url).status_code == 404
+    assert client.post(chunk_url, data=pcm[:1600].tobytes()).status_code == 404
+
+
+def test_stream_is_capped_at_the_upload_limit(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "MAX_AUDIO_SECONDS", 1.0)
+    chunk_url = client.post('/stream/start', data={"target": "अ"}).get_json()["chunk_url"]
+    second = np.zeros(16000, dtype='<i2').tobytes()
+    assert client.post(chunk_url, data=second).status_code == 200
+    assert client.post(chunk_url, data=second).status_code == 400
+
+
+def test_unknown_and_expired_streams_are_404(client, monkeypatch):
+    import app
+    assert client.post('/stream/nope/chunk', data=b'\x00\x00').status_code == 404
+    assert client.post('/stream/nope/finish').status_code == 404
+
+    monkeypatch.setattr(app, "stream_sessions", StreamSessionStore(idle_timeout=0))
+    chunk_url = client.post('/stream/start', data={"target": "अ"}).get_json()["chunk_url"]
+    assert client.post(chunk_url, data=b'\x00\x00').status_code == 404
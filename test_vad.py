@@ -0,0 +1,62 @@
+"""
+Tests for the energy / zero-crossing silence trimmer.
+Usage: python -m pytest -q test_vad.py
+"""
+
+import numpy as np
+
+from vad import trim_silence, voiced_regions
+from conftest import synthetic_vowel
+
+SR = 16000
+
+
+def padded_vowel(lead=2.0, vowel=1.0, tail=1.5, noise=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    audio = np.concatenate([np.zeros(int(lead * SR)), synthetic_vowel(vowel), np.zeros(int(tail * SR))])
+    return (audio + noise * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+def test_finds_the_vowel_and_pads_it():
+    trimmed, report = trim_silence(padded_vowel(), SR, padding=0.1)
+
+    assert report['original_duration'] == 4.5
+    assert len(report['regions']) == 1
+    start, end = report['regions'][0]
+    assert 1.8 < start < 2.0 and 2.7 < end < 3.2
+    assert abs(report['trimmed_duration'] - len(trimmed) / SR) < 1e-9
+
+
+def test_separate_utterances_are_kept_and_joined():
+    audio = np.concatenate([padded_vowel(1.0, 0.5, 1.0), padded_vowel(0.0, 0.5, 1.0, seed=1)])
+    trimmed, report = trim_silence(audio, SR, padding=0.05)
+
+    assert len(report['regions']) == 2
+    assert 1.0 < report['trimmed_duration'] < 1.4
+
+
+def test_noise_and_hiss_are_not_voiced():
+    rng = np.random.default_rng(0)
+    assert voiced_regions(np.zeros(SR), SR) == []
+    # Loud white noise: energy is high but so is the zero-crossing rate
+    assert voiced_regions(0.3 * rng.standard_normal(SR), SR) == []
+
+
+def test_nothing_voiced_returns_input_unchanged():
+    audio = np.zeros(SR, dtype=np.float32)
+    trimmed, report = trim_silence(audio, SR)
+    assert trimmed is audio
+    assert report['trimmed_duration'] == report['original_duration'] == 1.0
+
+
+def test_analyzer_reports_trimmed_duration():
+    from pitch import EnhancedPitchAnalyzer
+
+    result = EnhancedPitchAnalyzer().analyze_pronunciation_audio('अ', padded_vowel())
+    assert result['success']
+    assert result['vad']['original_duration'] == 4.5
+    assert result['vad']['trimmed_duration'] < 1.5
+    assert 'vad' in result['timings']
+
+    untrimmed = EnhancedPitchAnalyzer(vad=False).analyze_pronunciation_audio('अ', padded_vowel())
+    assert untrimmed['vad']['trimmed_duration'] == 4.5
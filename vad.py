@@ -0,0 +1,85 @@
+"""
+Energy / zero-crossing voice activity detection.
+
+Frames are voiced when their RMS is within `threshold_db` of the loudest
+frame, at least `noise_margin_db` above the estimated noise floor (a low
+percentile of frame RMS) and above an absolute floor, and their
+zero-crossing rate is low enough to rule out hiss and fricatives. Per-frame
+sums come from cumulative sums, so detection is a few passes over the
+signal and costs far less than the filtering and pitch tracking it saves.
+"""
+
+import numpy as np
+
+FRAME_LENGTH = 512
+HOP_LENGTH = 256
+
+
+def voiced_regions(audio, sr, threshold_db=-35.0, noise_margin_db=10.0, max_zcr=0.35, min_rms=1e-3,
+                   min_duration=0.05, merge_gap=0.15, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    """Voiced stretches of `audio` as a list of (start_sample, end_sample)"""
+    audio = np.asarray(audio, dtype=np.float64)
+    n_frames = 1 + (len(audio) - frame_length) // hop_length if len(audio) >= frame_length else 0
+    if n_frames <= 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    starts = np.arange(n_frames) * hop_length
+    ends = starts + frame_length
+
+    energy = np.concatenate([[0.0], np.cumsum(audio * audio)])
+    rms = np.sqrt(np.maximum(energy[ends] - energy[starts], 0) / frame_length)
+
+    crossings = np.concatenate([[0], np.cumsum(np.signbit(audio[1:]) != np.signbit(audio[:-1]))])
+    zcr = (crossings[ends - 1] - crossings[starts]) / frame_length
+
+    peak = rms.max()
+    if peak < min_rms:
+        return []
+    noise_floor = np.percentile(rms, 20)
+    threshold = max(min_rms, peak * 10 ** (threshold_db / 20), noise_floor * 10 ** (noise_margin_db / 20))
+    active = (rms >= threshold) & (zcr <= max_zcr)
+
+    # Runs of active frames -> sample ranges, bridging short gaps
+    edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+    regions = []
+    for first, last in zip(run_starts, run_ends):
+        start, end = int(starts[first]), int(ends[last])
+        if regions and start - regions[-1][1] <= merge_gap * sr:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [(start, end) for start, end in regions if end - start >= min_duration * sr]
+
+
+def trim_silence(audio, sr, padding=0.15, **detect_kwargs):
+    """
+    Keep only the voiced regions, each widened by `padding` seconds.
+    Returns (trimmed audio, report); the input is returned unchanged when
+    nothing voiced is found, so downstream stages fail or succeed as before.
+    """
+    audio = np.asarray(audio)
+    original_duration = len(audio) / sr
+    regions = voiced_regions(audio, sr, **detect_kwargs)
+
+    pad = int(padding * sr)
+    padded = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+
+    if padded:
+        trimmed = audio[padded[0][0]:padded[0][1]] if len(padded) == 1 else \
+            np.concatenate([audio[start:end] for start, end in padded])
+    else:
+        trimmed = audio
+
+    return trimmed, {
+        'original_duration': original_duration,
+        'trimmed_duration': len(trimmed) / sr,
+        'regions': [[start / sr, end / sr] for start, end in padded]
+    }